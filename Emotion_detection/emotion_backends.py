@@ -0,0 +1,198 @@
+"""
+Emotion model backends
+
+TensorFlow takes seconds to import, so no backend imports it until `load()`
+is called - tes.py runs that on a background thread while the camera opens.
+
+    CV_EMOTION_BACKEND=auto|keras|tflite|fused|remote
+        auto: remote when CV_MODEL_SERVER=1, else fused if best_model_fused/
+              exists, else tflite if best_model.tflite exists, else keras
+
+Build the TFLite model once with:
+
+    python Emotion_detection/emotion_backends.py convert
+
+and the fused-preprocessing model (uint8 crops in) with:
+
+    python Emotion_detection/export_fused_model.py
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from cv_common import model_server, threads
+
+MODEL_DIR = Path(__file__).resolve().parent
+KERAS_PATH = MODEL_DIR / "best_model.h5"
+TFLITE_PATH = MODEL_DIR / "best_model.tflite"
+FUSED_PATH = MODEL_DIR / "best_model_fused"
+
+
+class EmotionBackend:
+    """Interface: `load()` once, then `predict(batch)` -> (n, 7) probabilities
+
+    `predict_face(face)` takes one uint8 greyscale crop of any size; backends
+    whose graph does the preprocessing override it.
+    """
+
+    name = "base"
+    input_size = (224, 224)
+
+    def load(self):
+        return self
+
+    def predict(self, batch):
+        raise NotImplementedError
+
+    def predict_face(self, face):
+        roi_rgb = cv2.cvtColor(face, cv2.COLOR_GRAY2RGB)
+        roi_rgb = cv2.resize(roi_rgb, self.input_size)
+        return self.predict(np.expand_dims(roi_rgb.astype(np.float32), axis=0) / 255.0)
+
+
+class KerasBackend(EmotionBackend):
+    """The trained Keras model, run through TensorFlow"""
+
+    name = "keras"
+
+    def __init__(self, path=KERAS_PATH, model=None):
+        self.path = Path(path)
+        self.model = model
+
+    def load(self):
+        if self.model is None:
+            threads.configure_tensorflow()
+            from tensorflow.keras.models import load_model
+            self.model = load_model(str(self.path), compile=False)
+        return self
+
+    def predict(self, batch):
+        # Calling the model directly skips predict()'s per-call dataset setup
+        return np.asarray(self.model(batch, training=False))
+
+
+class TFLiteBackend(EmotionBackend):
+    """Converted model on the TFLite interpreter
+
+    Uses the small tflite_runtime package when installed, so TensorFlow is
+    never imported at all.
+    """
+
+    name = "tflite"
+
+    def __init__(self, path=TFLITE_PATH, num_threads=None):
+        self.path = Path(path)
+        self.num_threads = num_threads or threads.budget("tflite")
+        self.interpreter = None
+
+    def load(self):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+        self.interpreter = Interpreter(model_path=str(self.path), num_threads=self.num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]["index"]
+        self._output = self.interpreter.get_output_details()[0]["index"]
+        return self
+
+    def predict(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        if batch.shape[0] != 1:
+            return np.concatenate([self.predict(batch[i:i + 1]) for i in range(batch.shape[0])])
+        self.interpreter.set_tensor(self._input, batch)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self._output).copy()
+
+
+class FusedBackend(EmotionBackend):
+    """SavedModel from export_fused_model.py: resize, grey->RGB and rescale in-graph
+
+    `predict_face` hands the raw ROI to TensorFlow; nothing is resized or
+    converted to float on the NumPy side.
+    """
+
+    name = "fused"
+
+    def __init__(self, path=FUSED_PATH, module=None):
+        self.path = Path(path)
+        self.module = module
+
+    def load(self):
+        if self.module is None:
+            import tensorflow as tf
+            threads.configure_tensorflow()
+            self.module = tf.saved_model.load(str(self.path))
+        return self
+
+    def predict(self, batch):
+        return np.asarray(self.module.predict(np.asarray(batch, dtype=np.float32)))
+
+    def predict_face(self, face):
+        return np.asarray(self.module.face(face))
+
+
+class RemoteBackend(EmotionBackend):
+    """Model held by the shared model server (cv_common/model_server.py)"""
+
+    name = "remote"
+
+    def __init__(self, backend="auto"):
+        self.backend = backend
+        self.model = None
+
+    def load(self):
+        self.model = model_server.RemoteModel("emotion", backend=self.backend).load()
+        return self
+
+    def predict(self, batch):
+        return self.model.predict(np.asarray(batch, dtype=np.float32))
+
+    def predict_face(self, face):
+        # The uint8 crop is much smaller than the preprocessed float batch
+        return self.model.predict_face(face)
+
+
+BACKENDS = {
+    "keras": KerasBackend,
+    "tflite": TFLiteBackend,
+    "fused": FusedBackend,
+    "remote": RemoteBackend,
+}
+
+
+def select_backend(name=None):
+    """Backend from the argument or CV_EMOTION_BACKEND (not loaded yet)"""
+    name = (name or os.environ.get("CV_EMOTION_BACKEND", "auto")).lower()
+    if name == "auto":
+        if model_server.enabled():
+            name = "remote"
+        elif FUSED_PATH.exists():
+            name = "fused"
+        else:
+            name = "tflite" if TFLITE_PATH.exists() else "keras"
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown emotion backend {name!r}; choose from {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+def convert_to_tflite(keras_path=KERAS_PATH, tflite_path=TFLITE_PATH):
+    """Convert the Keras model to TFLite (needs full TensorFlow)"""
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(str(keras_path), compile=False)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    Path(tflite_path).write_bytes(converter.convert())
+    print(f"✓ Wrote {tflite_path}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["convert"]:
+        convert_to_tflite()
+    else:
+        print(__doc__)
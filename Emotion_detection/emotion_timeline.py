@@ -0,0 +1,316 @@
+"""
+Emotion timeline: every face's class probabilities over a session, on disk
+
+    CV_EMOTION_TIMELINE=timeline.db python Emotion_detection/tes.py       # SQLite
+    CV_EMOTION_TIMELINE=timeline.parquet python Emotion_detection/tes.py  # Parquet (pyarrow)
+
+    python Emotion_detection/emotion_timeline.py report timeline.db
+    python Emotion_detection/emotion_timeline.py report timeline.db --session 20261019-142501
+
+Faces get track IDs by box overlap between frames (FaceTracker). The frame
+loop only appends a tuple to a queue; a background thread batches records
+and writes them with executemany (SQLite in WAL mode) or as Parquet row
+groups, so hours of many faces don't slow the camera loop down.
+
+Row layout: session, ts (time.time()), track, x, y, w, h, p_<emotion> x 7
+"""
+
+import argparse
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+EMOTIONS = ['Angry', 'Disgust', 'Fear', 'Happy', 'Neutral', 'Sad', 'Surprise']
+COLUMNS = ["session", "ts", "track", "x", "y", "w", "h"] + [f"p_{e.lower()}" for e in EMOTIONS]
+
+
+# ---------------------------
+# Tracking
+# ---------------------------
+def iou_matrix(a, b):
+    """IoU between every pair of (x, y, w, h) boxes in a (n, 4) and b (m, 4)"""
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    ax2, ay2 = a[:, 0] + a[:, 2], a[:, 1] + a[:, 3]
+    bx2, by2 = b[:, 0] + b[:, 2], b[:, 1] + b[:, 3]
+    w = np.clip(np.minimum(ax2[:, None], bx2) - np.maximum(a[:, None, 0], b[:, 0]), 0, None)
+    h = np.clip(np.minimum(ay2[:, None], by2) - np.maximum(a[:, None, 1], b[:, 1]), 0, None)
+    inter = w * h
+    union = (a[:, 2] * a[:, 3])[:, None] + b[:, 2] * b[:, 3] - inter
+    return inter / np.maximum(union, 1e-9)
+
+
+class FaceTracker:
+    """Stable IDs for face boxes by greedy IoU matching with the last frame
+
+    A face that isn't matched for `max_missed` frames loses its ID.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_missed=15):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self._boxes = np.empty((0, 4))
+        self._ids = []
+        self._missed = []
+        self._next_id = 1
+
+    def update(self, boxes):
+        """Track IDs for this frame's (x, y, w, h) boxes, in the same order"""
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        ids = [None] * len(boxes)
+        matched = set()
+        if len(boxes) and len(self._boxes):
+            iou = iou_matrix(boxes, self._boxes)
+            for flat in np.argsort(iou, axis=None)[::-1]:
+                i, j = divmod(int(flat), iou.shape[1])
+                if iou[i, j] < self.iou_threshold:
+                    break
+                if ids[i] is None and j not in matched:
+                    ids[i] = self._ids[j]
+                    matched.add(j)
+
+        # Unmatched old tracks age; unmatched new boxes start tracks
+        keep = [j for j in range(len(self._ids)) if j not in matched and self._missed[j] < self.max_missed]
+        old_boxes = [self._boxes[j] for j in keep]
+        old_ids = [self._ids[j] for j in keep]
+        old_missed = [self._missed[j] + 1 for j in keep]
+        for i in range(len(boxes)):
+            if ids[i] is None:
+                ids[i] = self._next_id
+                self._next_id += 1
+        self._boxes = np.concatenate([boxes, np.asarray(old_boxes).reshape(-1, 4)])
+        self._ids = ids + old_ids
+        self._missed = [0] * len(ids) + old_missed
+        return ids
+
+
+# ---------------------------
+# Storage
+# ---------------------------
+class _SQLiteSink:
+    def __init__(self, path):
+        # Opened by the caller, then only used from the writer thread
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        columns = ", ".join(f"{c} REAL" if c.startswith("p_") or c == "ts" else f"{c} INTEGER"
+                            for c in COLUMNS[1:])
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS faces (session TEXT, {columns})")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS faces_session ON faces (session, ts)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS sessions (session TEXT PRIMARY KEY, module TEXT, started REAL)")
+        self._insert = f"INSERT INTO faces VALUES ({', '.join('?' * len(COLUMNS))})"
+
+    def start_session(self, session, module, started):
+        self.conn.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)", (session, module, started))
+        self.conn.commit()
+
+    def write(self, rows):
+        self.conn.executemany(self._insert, rows)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class _ParquetSink:
+    """One row group per flush (Parquet files can't be appended to once closed,
+    so each session gets its own file next to `path`)"""
+
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._pa, self._pq = pa, pq
+        self.path = Path(path)
+        self.schema = pa.schema([("session", pa.string()), ("ts", pa.float64()), ("track", pa.int32())]
+                                + [(c, pa.int32()) for c in ("x", "y", "w", "h")]
+                                + [(c, pa.float32()) for c in COLUMNS[7:]])
+        self._writer = None
+
+    def start_session(self, session, module, started):
+        path = self.path.with_name(f"{self.path.stem}-{session}{self.path.suffix}")
+        self._writer = self._pq.ParquetWriter(str(path), self.schema)
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        self._writer.write_table(self._pa.Table.from_arrays(
+            [self._pa.array(col, type=field.type) for col, field in zip(columns, self.schema)],
+            schema=self.schema))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _open_sink(path):
+    if Path(path).suffix == ".parquet":
+        return _ParquetSink(path)
+    return _SQLiteSink(path)
+
+
+_STOP = object()
+
+
+class TimelineRecorder:
+    """Buffers face records and writes them in batches on a background thread
+
+    `add()` is a queue put and nothing else; conversion to rows and all I/O
+    happen on the writer thread. Records reach disk every `batch_size`
+    faces or `flush_interval` seconds, whichever comes first. If the writer
+    falls `max_queue` records behind, new records are dropped (and counted);
+    if a write fails, the error is reported and `add()` stops queueing.
+    """
+
+    def __init__(self, path, module="emotion_detection", session=None, batch_size=512, flush_interval=2.0,
+                 max_queue=50000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.module = module
+        self.session = session or time.strftime("%Y%m%d-%H%M%S")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self.failed = False
+        # Opened here so a bad path or missing pyarrow fails now, not on the thread
+        self._sink = _open_sink(self.path)
+        self._sink.start_session(self.session, module, time.time())
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="emotion-timeline", daemon=True)
+        self._thread.start()
+
+    def add(self, timestamp, track, box, probabilities):
+        """Queue one face: (x, y, w, h) box and the 7 class probabilities"""
+        if self.failed:
+            return
+        try:
+            self._queue.put_nowait((timestamp, track, box, probabilities))
+        except queue.Full:
+            self.dropped += 1
+
+    def _row(self, record):
+        timestamp, track, (x, y, w, h), probabilities = record
+        return (self.session, timestamp, int(track), int(x), int(y), int(w), int(h),
+                *np.asarray(probabilities, dtype=np.float64).ravel().tolist())
+
+    def _run(self):
+        sink = self._sink
+        rows, last_flush, stopping = [], time.monotonic(), False
+        try:
+            while not stopping:
+                try:
+                    record = self._queue.get(timeout=self.flush_interval)
+                    while record is not _STOP:
+                        rows.append(self._row(record))
+                        if len(rows) >= self.batch_size:
+                            break
+                        record = self._queue.get_nowait()
+                    stopping = record is _STOP
+                except queue.Empty:
+                    pass
+                now = time.monotonic()
+                if rows and (stopping or len(rows) >= self.batch_size or now - last_flush >= self.flush_interval):
+                    sink.write(rows)
+                    self.written += len(rows)
+                    rows, last_flush = [], now
+        except Exception as e:
+            # A full disk or a locked database: stop recording, keep the camera loop running
+            self.failed = True
+            self.dropped += len(rows)
+            print(f"⚠ Emotion timeline stopped writing to {self.path}: {e}")
+        finally:
+            sink.close()
+
+    def close(self):
+        """Flush everything queued and stop the writer"""
+        # A writer that failed has stopped draining the queue, so don't block on it
+        while self._thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        self._thread.join()
+        print(f"Emotion timeline: {self.written} face records in {self.path} (session {self.session})")
+        if self.dropped:
+            print(f"⚠ Emotion timeline dropped {self.dropped} face records")
+
+
+# ---------------------------
+# Reading and reports
+# ---------------------------
+def load_timeline(path, session=None):
+    """Column arrays (dict) for one session, or all of them"""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        # One file per session, named <stem>-<session>.parquet
+        files = sorted(path.parent.glob(f"{path.stem}-*{path.suffix}")) or [path]
+        table = pa.concat_tables([pq.read_table(str(f)) for f in files])
+        data = {c: table.column(c).to_numpy() for c in COLUMNS}
+    else:
+        conn = sqlite3.connect(str(path))
+        query = f"SELECT {', '.join(COLUMNS)} FROM faces"
+        rows = conn.execute(query + " WHERE session = ? ORDER BY ts" if session else query + " ORDER BY ts",
+                            (session,) if session else ()).fetchall()
+        conn.close()
+        columns = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+        data = {c: np.asarray(col) for c, col in zip(COLUMNS, columns)}
+    if session is not None:
+        keep = data["session"] == session
+        data = {c: v[keep] for c, v in data.items()}
+    return data
+
+
+def summarize(data):
+    """Per-session stats: duration, tracks, dominant-emotion histogram, mean probabilities"""
+    summaries = {}
+    probs_all = np.stack([data[c] for c in COLUMNS[7:]], axis=1).astype(np.float64) if len(data["ts"]) else None
+    for session in sorted(set(data["session"].tolist())):
+        keep = data["session"] == session
+        ts, probs = data["ts"][keep].astype(np.float64), probs_all[keep]
+        dominant = np.bincount(probs.argmax(axis=1), minlength=len(EMOTIONS))
+        summaries[session] = {
+            "faces": int(keep.sum()),
+            "tracks": len(set(data["track"][keep].tolist())),
+            "duration_s": float(ts.max() - ts.min()),
+            "histogram": dict(zip(EMOTIONS, dominant.tolist())),
+            "mean_probabilities": dict(zip(EMOTIONS, probs.mean(axis=0).round(3).tolist())),
+        }
+    return summaries
+
+
+def print_report(summaries, width=40):
+    if not summaries:
+        print("No face records")
+    for session, s in summaries.items():
+        print(f"\nSession {session}: {s['faces']} faces, {s['tracks']} tracks, {s['duration_s'] / 60:.1f} min")
+        for emotion, count in s["histogram"].items():
+            share = count / s["faces"]
+            bar = "█" * round(share * width)
+            print(f"  {emotion:<9}{share:6.1%}  {bar:<{width}}  mean p {s['mean_probabilities'][emotion]:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emotion timeline reports")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("report", help="per-session emotion histograms")
+    report.add_argument("path", type=Path, help="timeline .db or .parquet")
+    report.add_argument("--session", help="only this session")
+    report.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    summaries = summarize(load_timeline(args.path, args.session))
+    if args.json:
+        import json
+        print(json.dumps(summaries, indent=2))
+    else:
+        print_report(summaries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Export the emotion model with its preprocessing built into the graph
+
+The exported SavedModel takes a raw uint8 greyscale face crop of any size,
+the ROI sliced straight out of the camera frame. Resizing to 224x224,
+grey-to-RGB replication and the 1/255 rescale are layers in front of the
+trained network. The per-face OpenCV/NumPy steps and their float copies go
+away, and TensorFlow can fuse the preprocessing with the first convolution.
+
+    python Emotion_detection/export_fused_model.py
+    python Emotion_detection/export_fused_model.py --keras best_model.h5 --output best_model_fused
+
+Signatures:
+    face       uint8  (h, w)             -> (1, 7) probabilities
+    predict    float32 (n, 224, 224, 3)  -> (n, 7), the original model input
+
+The "fused" backend in emotion_backends.py loads it, and auto picks it when
+the export exists.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from emotion_backends import FUSED_PATH, KERAS_PATH
+
+
+def build_module(model, size=(224, 224)):
+    """tf.Module wrapping `model` with in-graph preprocessing"""
+    import tensorflow as tf
+
+    class FusedEmotionModel(tf.Module):
+        def __init__(self):
+            super().__init__()
+            self.model = model
+            # Bilinear, like the cv2.resize default used in training
+            self.resize = tf.keras.layers.Resizing(*size, interpolation="bilinear")
+            self.rescale = tf.keras.layers.Rescaling(1.0 / 255)
+
+        @tf.function(input_signature=[tf.TensorSpec([None, None], tf.uint8, name="face")])
+        def face(self, face):
+            x = tf.cast(face, tf.float32)[tf.newaxis, :, :, tf.newaxis]
+            x = self.resize(x)
+            x = tf.repeat(x, 3, axis=-1)
+            return self.model(self.rescale(x), training=False)
+
+        @tf.function(input_signature=[tf.TensorSpec([None, *size, 3], tf.float32, name="batch")])
+        def predict(self, batch):
+            return self.model(batch, training=False)
+
+    return FusedEmotionModel()
+
+
+def check(module, keras_model, size=(224, 224)):
+    """Max difference from the NumPy/OpenCV pipeline on a random crop"""
+    import cv2
+
+    face = np.random.default_rng(0).integers(0, 256, (173, 149), dtype=np.uint8)
+    rgb = cv2.resize(cv2.cvtColor(face, cv2.COLOR_GRAY2RGB), size)
+    expected = np.asarray(keras_model(rgb[np.newaxis].astype(np.float32) / 255.0, training=False))
+    return float(np.abs(np.asarray(module.face(face)) - expected).max())
+
+
+def export(keras_path=KERAS_PATH, output=FUSED_PATH):
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(str(keras_path), compile=False)
+    module = build_module(model)
+    tf.saved_model.save(module, str(output),
+                        signatures={"face": module.face, "predict": module.predict})
+    print(f"✓ Wrote {output}")
+    print(f"  max difference from the NumPy preprocessing: {check(module, model):.2e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the emotion model with fused uint8 preprocessing")
+    parser.add_argument("--keras", type=Path, default=KERAS_PATH)
+    parser.add_argument("--output", type=Path, default=FUSED_PATH)
+    args = parser.parse_args()
+    export(args.keras, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,65 +1,128 @@
 import cv2
 import numpy as np
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import img_to_array
 import warnings
 import os
+import sys
+import time
+from pathlib import Path
 warnings.filterwarnings("ignore")
 
-# Print current directory to debug
-print("Current directory:", os.getcwd())
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from cv_common import profiles, startup, threads
+from cv_common.capture import open_capture
+from cv_common.model_lifecycle import ModelLifecycle
+from cv_common.telemetry import Telemetry
+# TensorFlow is only imported when the backend loads (CV_EMOTION_BACKEND)
+from emotion_backends import select_backend
+from emotion_timeline import FaceTracker, TimelineRecorder
 
-# Use full path to your model
-model = load_model(r"C:\Users\maria\OneDrive\Desktop\CV project\Emotion_detection\best_model.h5")
-
-# Rest of your code...
 emotions = ['Angry', 'Disgust', 'Fear', 'Happy', 'Neutral', 'Sad', 'Surprise']
 
 face_haar_cascade = cv2.CascadeClassifier(
     cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
 )
 
-cap = cv2.VideoCapture(0)
-if not cap.isOpened():
-    print("Error: Could not open camera")
-    exit()
+# EmotionBackend, loaded when run as a script; benchmarks assign their own
+model = None
+
+def predict_probabilities(face):
+    """The 7 class probabilities for a greyscale face crop
 
-print("Press 'q' to quit")
+    The backend preprocesses the crop; with the fused model (see
+    export_fused_model.py) that happens inside the TensorFlow graph.
+    """
+    return model.predict_face(face)[0]
 
 def predict_emotion(face):
-    """Preprocess face and predict emotion"""
-    roi_rgb = cv2.cvtColor(face, cv2.COLOR_GRAY2RGB)
-    roi_rgb = cv2.resize(roi_rgb, (224, 224))
-    img_pixels = img_to_array(roi_rgb)
-    img_pixels = np.expand_dims(img_pixels, axis=0) / 255.0
-    preds = model.predict(img_pixels, verbose=0)
-    emotion = emotions[np.argmax(preds)]
-    return emotion
-
-try:
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = face_haar_cascade.detectMultiScale(gray, 1.3, 5)
-
-        for (x, y, w, h) in faces:
-            cv2.rectangle(frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
-            roi_gray = gray[y:y+h, x:x+w]
-            emotion = predict_emotion(roi_gray)
-            cv2.putText(frame, emotion, (x, y-10), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-
-        cv2.imshow("Facial Emotion Analysis", frame)
-
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
-
-except KeyboardInterrupt:
-    print("\nStopping...")
-
-finally:
-    cap.release()
-    cv2.destroyAllWindows()
\ No newline at end of file
+    """Predict the emotion of a greyscale face crop"""
+    return emotions[np.argmax(predict_probabilities(face))]
+
+if __name__ == "__main__":
+    # Print current directory to debug
+    print("Current directory:", os.getcwd())
+    profiles.apply()
+    threads.apply()
+
+    # Load and warm up the model in the background while the camera opens
+    lifecycle = ModelLifecycle(
+        "emotion",
+        load=lambda: select_backend().load(),
+        warmup=lambda m: m.predict_face(np.zeros((224, 224), dtype=np.uint8)),
+    ).start()
+
+    cap = open_capture(0)
+    if not cap.isOpened():
+        print("Error: Could not open camera")
+        exit()
+    startup.mark("camera")
+
+    telemetry = Telemetry("emotion_detection")
+    model = lifecycle.result(telemetry)
+    print(f"Emotion backend: {model.name}")
+
+    # Optional per-face log for later analysis (see emotion_timeline.py)
+    timeline_path = os.environ.get("CV_EMOTION_TIMELINE")
+    timeline = TimelineRecorder(timeline_path) if timeline_path else None
+    tracker = FaceTracker()
+
+    # CV_INFERENCE_STRIDE=N detects faces and emotions on every Nth frame; the labels stay in between
+    stride = max(1, int(os.environ.get("CV_INFERENCE_STRIDE", "1") or 1))
+    frame_index = 0
+    faces, labels = [], []
+
+    print("Press 'q' to quit, 'h' for the performance HUD")
+
+    try:
+        while True:
+            with telemetry.stage("capture"):
+                ret, frame = cap.read()
+            if not ret:
+                break
+            frame_index += 1
+            due = (frame_index - 1) % stride == 0
+
+            if due:
+                with telemetry.stage("preprocess"):
+                    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                with telemetry.stage("face_detect"):
+                    faces = face_haar_cascade.detectMultiScale(gray, 1.3, 5)
+
+                labels, probabilities = [], []
+                with telemetry.stage("inference"):
+                    for (x, y, w, h) in faces:
+                        roi_gray = gray[y:y+h, x:x+w]
+                        with lifecycle.steady():
+                            probabilities.append(predict_probabilities(roi_gray))
+                        labels.append(emotions[np.argmax(probabilities[-1])])
+
+            if timeline is not None and due:
+                # Queued only; the recorder writes in batches on its own thread
+                now = time.time()
+                for track, box, p in zip(tracker.update(faces), faces, probabilities):
+                    timeline.add(now, track, box, p)
+
+            with telemetry.stage("render"):
+                for (x, y, w, h), emotion in zip(faces, labels):
+                    cv2.rectangle(frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
+                    cv2.putText(frame, emotion, (x, y-10), 
+                                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+
+                telemetry.draw_hud(frame)
+                cv2.imshow("Facial Emotion Analysis", frame)
+            telemetry.frame()
+
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
+                break
+            telemetry.handle_key(key)
+
+    except KeyboardInterrupt:
+        print("\nStopping...")
+
+    finally:
+        if timeline is not None:
+            timeline.close()
+        lifecycle.report()
+        telemetry.close()
+        cap.release()
+        cv2.destroyAllWindows()
@@ -0,0 +1,167 @@
+"""
+Deterministic inputs for the benchmark suite
+
+Face crops come from the committed Emotion_detection/test images, frames are
+mosaics built from them, and hand landmarks are canonical poses with seeded
+jitter. The same seed always yields the same inputs, so runs are comparable.
+"""
+
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+FACE_DIR = PROJECT_ROOT / "Emotion_detection" / "test"
+SEED = 1234
+
+
+def face_crops(n=32, size=160, seed=SEED):
+    """Greyscale face crops, upscaled to a typical Haar detection size"""
+    paths = sorted(FACE_DIR.glob("*/im*.png"))[:n * 8:8] if FACE_DIR.exists() else []
+    crops = []
+    for path in paths:
+        image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+        if image is not None:
+            crops.append(cv2.resize(image, (size, size), interpolation=cv2.INTER_LINEAR))
+
+    # Fall back to seeded noise if the test images are not available
+    rng = np.random.default_rng(seed)
+    while len(crops) < n:
+        crops.append(rng.integers(0, 256, (size, size), dtype=np.uint8))
+    return crops
+
+
+def frames(n=8, width=640, height=480, seed=SEED):
+    """BGR frames tiled from face crops with a little seeded noise"""
+    rng = np.random.default_rng(seed)
+    tiles = face_crops(n=16, size=160, seed=seed)
+    result = []
+    for i in range(n):
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        for y in range(0, height, 160):
+            for x in range(0, width, 160):
+                tile = tiles[(i + x // 160 + y // 160 * 4) % len(tiles)]
+                h, w = min(160, height - y), min(160, width - x)
+                frame[y:y + h, x:x + w] = tile[:h, :w, None]
+        noise = rng.integers(-8, 9, frame.shape, dtype=np.int16)
+        result.append(np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8))
+    return result
+
+
+def detections(n=16, per_frame=12, width=640, height=480, seed=SEED):
+    """(xyxy, classes, confidences) per frame, like one YOLO result"""
+    rng = np.random.default_rng(seed)
+    result = []
+    for _ in range(n):
+        xy = rng.uniform(0, (width - 40, height - 40), (per_frame, 2))
+        wh = rng.uniform(30, 240, (per_frame, 2))
+        result.append((np.concatenate([xy, xy + wh], axis=1).astype(np.float32),
+                       rng.integers(0, 80, per_frame).astype(np.float32),
+                       rng.uniform(0.3, 1.0, per_frame).astype(np.float32)))
+    return result
+
+
+def blank_canvas(width=1280, height=720):
+    return np.zeros((height, width, 3), dtype=np.uint8)
+
+
+# ---------------------------
+# Hand landmarks
+# ---------------------------
+_MCP_X = [0.44, 0.48, 0.52, 0.56]
+
+
+def _hand_pose(fingers, thumb):
+    """21x3 landmark array for a right hand in the mirrored image"""
+    points = np.zeros((21, 3), dtype=np.float32)
+    points[0] = (0.50, 0.80, 0.0)
+
+    if thumb == "side":
+        thumb_joints = [(0.42, 0.72), (0.39, 0.68), (0.36, 0.65), (0.33, 0.63)]
+    elif thumb == "up":
+        thumb_joints = [(0.42, 0.72), (0.40, 0.62), (0.40, 0.52), (0.40, 0.42)]
+    elif thumb == "down":
+        thumb_joints = [(0.42, 0.60), (0.40, 0.70), (0.40, 0.80), (0.40, 0.90)]
+    else:
+        thumb_joints = [(0.42, 0.72), (0.39, 0.68), (0.41, 0.64), (0.44, 0.62)]
+    for j, (x, y) in enumerate(thumb_joints):
+        points[1 + j] = (x, y, -0.02 * j)
+
+    for f, extended in enumerate(fingers):
+        base = 5 + 4 * f
+        x = _MCP_X[f]
+        ys = (0.60, 0.50, 0.45, 0.40) if extended else (0.60, 0.55, 0.60, 0.62)
+        for j, y in enumerate(ys):
+            points[base + j] = (x, y, -0.02 * j)
+    return points
+
+
+POSES = {
+    "open": ((True, True, True, True), "side"),
+    "fist": ((False, False, False, False), "folded"),
+    "thumbs_up": ((False, False, False, False), "up"),
+    "thumbs_down": ((False, False, False, False), "down"),
+    "point": ((True, False, False, False), "folded"),
+    "peace": ((True, True, False, False), "folded"),
+}
+
+
+def landmark_array(n=256, seed=SEED, jitter=0.004):
+    """(n, 21, 3) float32 landmarks cycling through POSES with seeded jitter"""
+    rng = np.random.default_rng(seed)
+    poses = [_hand_pose(*spec) for spec in POSES.values()]
+    base = np.stack([poses[i % len(poses)] for i in range(n)])
+    return (base + rng.normal(0, jitter, base.shape)).astype(np.float32)
+
+
+def as_mediapipe(points, label="Right", score=0.98):
+    """Wrap a 21x3 array in objects shaped like MediaPipe's results"""
+    hand = SimpleNamespace(landmark=[SimpleNamespace(x=float(x), y=float(y), z=float(z))
+                                     for x, y, z in points])
+    handedness = SimpleNamespace(classification=[SimpleNamespace(label=label, score=score, index=1)])
+    return hand, handedness
+
+
+def hands(n=256, seed=SEED):
+    """List of (hand_landmarks, handedness) pairs"""
+    return [as_mediapipe(points) for points in landmark_array(n, seed)]
+
+
+def recording(n=256, seed=SEED):
+    """Path of a landmark recording (cv_common/landmark_recorder.py) of `hands()`"""
+    from cv_common.landmark_recorder import LandmarkRecorder
+
+    path = Path(tempfile.gettempdir()) / f"cv_bench_hands_{n}_{seed}.npz"
+    recorder = LandmarkRecorder(path, max_hands=1)
+    for i, (hand, handedness) in enumerate(hands(n, seed)):
+        recorder.add(SimpleNamespace(multi_hand_landmarks=[hand], multi_handedness=[handedness]),
+                     timestamp=i / 30)
+    recorder.save()
+    return path
+
+
+def pinch_levels(n=256, seed=SEED, noise=0.8):
+    """Volume percentages from a hand slowly opening and closing a pinch, with jitter"""
+    rng = np.random.default_rng(seed)
+    sweep = 50 + 45 * np.sin(np.linspace(0, 4 * np.pi, n))
+    return (sweep + rng.normal(0, noise, n)).tolist()
+
+
+# ---------------------------
+# Tic-Tac-Toe boards
+# ---------------------------
+def boards(n=64, seed=SEED):
+    """Random mid-game boards (X always moves first)"""
+    rng = np.random.default_rng(seed)
+    result = []
+    while len(result) < n:
+        moves = int(rng.integers(1, 8))
+        cells = rng.permutation(9)[:moves]
+        board = [['' for _ in range(3)] for _ in range(3)]
+        for k, cell in enumerate(cells):
+            board[cell // 3][cell % 3] = 'X' if k % 2 == 0 else 'O'
+        result.append(board)
+    return result
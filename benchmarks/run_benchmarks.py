@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""
+Headless performance benchmarks for every module
+
+Replays the deterministic fixtures in benchmarks/fixtures.py through the
+real module functions on CPU, without a camera or window, and compares the
+results against a stored baseline.
+
+    python benchmarks/run_benchmarks.py                      # run + compare
+    python benchmarks/run_benchmarks.py --update-baseline    # store new baseline
+    python benchmarks/run_benchmarks.py --only tictactoe     # group or component filter
+
+Components whose dependencies or weights are missing are reported as skipped.
+No baseline is committed (timings only compare on the same machine), so
+until --update-baseline has been run nothing is compared and nothing fails.
+"""
+
+import argparse
+import importlib.util
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Headless CPU run: hide GPUs and keep framework logging quiet
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "-1")
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import fixtures
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+class Skip(Exception):
+    """Raised by a case setup when it cannot run in this environment"""
+
+
+def load_script(relative_path, name):
+    """Import a module script by path (directories may contain spaces)"""
+    path = PROJECT_ROOT / relative_path
+    sys.path.insert(0, str(path.parent))
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except (ImportError, AttributeError) as e:
+        # AttributeError: an installed build lacks something (e.g. no Haar cascades)
+        raise Skip(f"{relative_path}: {e}")
+    return module
+
+
+# ---------------------------
+# Benchmark cases
+# ---------------------------
+class Case:
+    """One benchmarked callable fed with a list of inputs
+
+    `prepare(input)` runs outside the timed region (e.g. to reset state that
+    the function mutates) and returns the argument actually passed to `fn`.
+    `teardown()` releases what the case holds (worker pools) once it is done.
+    `stats()` returns extra figures for the report, read after the timed runs.
+    """
+
+    def __init__(self, name, fn, inputs, prepare=None, iterations=None, teardown=None, stats=None):
+        self.name = name
+        self.fn = fn
+        self.inputs = inputs
+        self.prepare = prepare
+        self.iterations = iterations
+        self.teardown = teardown
+        self.stats = stats
+
+
+def emotion_cases():
+    tes = load_script("Emotion_detection/tes.py", "tes")
+    from emotion_backends import KERAS_PATH, FusedBackend, KerasBackend, select_backend
+    from export_fused_model import build_module
+
+    try:
+        if KERAS_PATH.exists():
+            tes.model = select_backend().load()
+        else:
+            # Same architecture as em_de.ipynb with random weights - fine for timing
+            from tensorflow.keras.applications.mobilenet import MobileNet
+            from tensorflow.keras.layers import Dense, Dropout, GlobalAveragePooling2D
+            from tensorflow.keras.models import Model
+            base = MobileNet(input_shape=(224, 224, 3), include_top=False, weights=None)
+            x = GlobalAveragePooling2D()(base.output)
+            x = Dropout(0.5)(Dense(512, activation='relu')(x))
+            tes.model = KerasBackend(model=Model(base.input, Dense(7, activation='softmax')(x)))
+    except ImportError as e:
+        raise Skip(str(e))
+
+    # The same weights with resize/grey->RGB/rescale inside the graph
+    fused = FusedBackend(module=build_module(tes.model.model)) if isinstance(tes.model, KerasBackend) else None
+
+    def predict_fused(face):
+        return tes.emotions[int(np.argmax(fused.predict_face(face)))]
+
+    cases = [Case("emotion.predict_emotion", tes.predict_emotion, fixtures.face_crops(), iterations=50)]
+    if fused is not None:
+        cases.append(Case("emotion.predict_emotion_fused", predict_fused, fixtures.face_crops(), iterations=50))
+    return cases
+
+
+def hand_cases():
+    hand_tracking = load_script("pose_detection/hand_tracking.py", "hand_tracking")
+    from cv_common.landmark_recorder import LandmarkReplay
+    try:
+        # MediaPipe is imported lazily, on first use of its landmark enums
+        hand_tracking.mp_hands.HandLandmark
+    except ImportError as e:
+        raise Skip(f"mediapipe: {e}")
+
+    hands = fixtures.hands()
+    replay = LandmarkReplay(fixtures.recording())
+
+    def replay_frame(_):
+        # Recorded MediaPipe results through the finger counter, no inference
+        results = replay.process()
+        return [hand_tracking.count_fingers(hand, handedness)
+                for hand, handedness in zip(results.multi_hand_landmarks, results.multi_handedness)]
+
+    return [
+        Case("hands.count_fingers", lambda h: hand_tracking.count_fingers(*h), hands),
+        Case("hands.is_thumb_up", lambda h: hand_tracking.is_thumb_up(*h), hands),
+        Case("hands.is_thumb_down", lambda h: hand_tracking.is_thumb_down(*h), hands),
+        Case("hands.replay_count_fingers", replay_frame, [None], iterations=2000),
+    ]
+
+
+def gesture_cases():
+    from cv_common.gestures import GestureDetector
+
+    detector = GestureDetector()
+    ticks = itertools.count(0.0, 1 / 30)
+    return [
+        Case("gestures.update", lambda points: detector.update(points, next(ticks)),
+             list(fixtures.landmark_array()), iterations=2000),
+    ]
+
+
+def yolo_cases():
+    try:
+        from ultralytics import YOLO
+    except ImportError as e:
+        raise Skip(str(e))
+    weights = os.environ.get("CV_YOLO_WEIGHTS", "yolov8n.pt")
+    try:
+        model = YOLO(weights)
+    except Exception as e:
+        raise Skip(f"could not load {weights}: {e}")
+    from cv_common.detection_render import DetectionRenderer
+    tiled_inference = load_script("yolo webcam detection/tiled_inference.py", "tiled_inference")
+
+    frames = fixtures.frames()
+    results = [model(frame, conf=0.3, verbose=False, device="cpu")[0] for frame in frames]
+    renderer = DetectionRenderer(model.names, every=1)
+    return [
+        Case("yolo.inference", lambda frame: model(frame, conf=0.3, verbose=False, device="cpu"),
+             frames, iterations=30),
+        # Annotation only: Ultralytics' plot() vs the in-place renderer
+        Case("yolo.plot", lambda result: result.plot(), results),
+        Case("yolo.render", lambda result: renderer.draw_result(result.orig_img, result), results),
+        # 1080p: every tile on the first frame, then only tiles the coarse pass points at
+        Case("yolo.tiled_1080p", tiled_inference.TiledDetector(model), fixtures.frames(n=4, width=1920, height=1080),
+             iterations=10),
+    ]
+
+
+def volume_cases():
+    from cv_common.audio_backends import MockBackend
+    from cv_common.volume import VolumeController
+
+    levels = fixtures.pinch_levels()
+
+    def case(name, max_rate=None, fps=None):
+        backend = MockBackend()
+        controller = VolumeController(backend, max_rate=max_rate)
+        changes = [0]
+
+        def set_volume(percent):
+            before = controller.target
+            if controller.set(percent) != before:
+                changes[0] += 1
+
+        def stats():
+            # Let the worker send what is still pending before counting
+            controller.close()
+            calls = backend.summary()
+            return {"targets": changes[0], "calls": calls["calls"], "calls_per_s": round(calls["rate_hz"], 1),
+                    "coalesced": changes[0] - calls["calls"]}
+
+        # Paced like a camera loop (outside the timed region) or as fast as set() goes
+        pace = (lambda p: time.sleep(1 / fps) or p) if fps else None
+        return Case(name, set_volume, levels, prepare=pace, iterations=len(levels) if fps else None,
+                    teardown=controller.close, stats=stats)
+
+    return [
+        # The mock's own 1000 calls/s: the cost of set() on the camera loop
+        case("volume.set"),
+        # A 60 FPS loop against pycaw's 10 calls/s: how many targets the limit coalesces
+        case("volume.set_60fps_10hz", max_rate=10, fps=60),
+    ]
+
+
+def render_cases():
+    from cv_common.detection_render import DetectionRenderer
+
+    renderer = DetectionRenderer({i: f"class{i}" for i in range(80)}, every=1)
+    detections = fixtures.detections()
+    frames = fixtures.frames()
+
+    def copy_frame(i):
+        # Frames are drawn on in place; start each iteration from a clean one
+        np.copyto(canvas, frames[i % len(frames)])
+        return i
+
+    canvas = np.empty_like(frames[0])
+    return [
+        Case("render.detections", lambda i: renderer.draw(canvas, *detections[i % len(detections)]),
+             list(range(len(detections))), prepare=copy_frame, iterations=500),
+    ]
+
+
+def game_cases():
+    ttt = load_script("virtuals/Tic_tac_toe.py", "Tic_tac_toe")
+    guessing = load_script("virtuals/guessing_game.py", "guessing_game")
+    psychology = load_script("virtuals/physcology_test.py", "physcology_test")
+    ttt.player_symbol, ttt.computer_symbol = 'X', 'O'
+
+    def set_board(board):
+        ttt.board = [row[:] for row in board]
+
+    canvas = fixtures.blank_canvas()
+
+    def clear_canvas(_):
+        canvas.fill(0)
+        return canvas
+
+    frame_only = [None] * 8
+    return [
+        Case("tictactoe.check_winner", lambda _: ttt.check_winner(), fixtures.boards(), prepare=set_board),
+        Case("tictactoe.computer_move", lambda _: ttt.computer_move(), fixtures.boards(), prepare=set_board),
+        Case("tictactoe.draw_grid", ttt.draw_grid, frame_only, prepare=clear_canvas),
+        Case("tictactoe.draw_perfect_symbol",
+             lambda frame: ttt.draw_perfect_symbol(frame, 1, 1, 'X'), frame_only, prepare=clear_canvas),
+        Case("guessing.draw_keyboard", guessing.draw_keyboard, frame_only, prepare=clear_canvas),
+        Case("guessing.draw_special_buttons", guessing.draw_special_buttons, frame_only, prepare=clear_canvas),
+        Case("psychology.draw_next_button", psychology.draw_next_button, frame_only, prepare=clear_canvas),
+    ]
+
+
+# Each "module" is its own process, as when several are launched from the dashboard
+_module_frame = None
+_module_layers = None
+
+
+def _module_init(counter, groups, budget):
+    """Pool initializer: one module process, pinned and budgeted when `budget` is set"""
+    global _module_frame, _module_layers
+    import cv2
+    from cv_common import threads
+
+    _module_frame = fixtures.frames(n=1, width=1280, height=720)[0]
+    rng = np.random.default_rng(fixtures.SEED)
+    # Eight pointwise-convolution-sized layers: many short parallel regions, each
+    # ending in a barrier, which is where surplus threads wait on each other
+    _module_layers = [rng.standard_normal((512, 512)).astype(np.float32) / 24 for _ in range(8)]
+    if budget:
+        with counter.get_lock():
+            index = counter.value
+            counter.value += 1
+        threads.apply(threads=budget, cores=groups[index % len(groups)], verbose=False)
+    else:
+        # Framework default: a thread per core, whatever the calling shell set
+        cv2.setNumThreads(len(threads.available_cores()))
+
+
+def _module_step(_):
+    """Preprocessing-style OpenCV work, then a small network's worth of GEMMs"""
+    import cv2
+    blurred = cv2.GaussianBlur(_module_frame, (15, 15), 0)
+    small = cv2.resize(blurred, (512, 256), interpolation=cv2.INTER_AREA)
+    x = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32) / 255
+    for weights in _module_layers:
+        x = np.maximum(x @ weights, 0)
+    return float(x.sum())
+
+
+def _module_pool(modules, budget):
+    import multiprocessing as mp
+    from cv_common import threads
+
+    ctx = mp.get_context("spawn")
+    saved = dict(os.environ)
+    # Read by the BLAS runtime when NumPy loads in the child, before the initializer;
+    # without a budget every child gets a thread per core, as frameworks do by default
+    per_process = budget or len(threads.available_cores())
+    os.environ.update({name: str(per_process) for name in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS",
+                                                           "MKL_NUM_THREADS")})
+    try:
+        groups = threads.partition(threads.available_cores(), modules)
+        return ctx.Pool(modules, _module_init, (ctx.Value("i", 0), groups, budget))
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+
+
+def thread_cases():
+    from cv_common import threads
+
+    # Three modules at once: a thread per core in each (3x oversubscribed) vs a
+    # third of the cores each, pinned. The gap grows with the core count; with
+    # one or two cores there is nothing to split and the two match
+    modules = 3
+    share = max(1, len(threads.available_cores()) // modules)
+    oversubscribed = _module_pool(modules, None)
+    budgeted = _module_pool(modules, share)
+    steps = list(range(modules * 4))
+    return [
+        Case("threads.oversubscribed", lambda _: oversubscribed.map(_module_step, steps, chunksize=4), [None],
+             iterations=30, teardown=oversubscribed.terminate),
+        Case("threads.budgeted", lambda _: budgeted.map(_module_step, steps, chunksize=4), [None],
+             iterations=30, teardown=budgeted.terminate),
+    ]
+
+
+GROUPS = {
+    "emotion": emotion_cases,
+    "hands": hand_cases,
+    "gestures": gesture_cases,
+    "yolo": yolo_cases,
+    "render": render_cases,
+    "games": game_cases,
+    "volume": volume_cases,
+    "threads": thread_cases,
+}
+# Component name prefixes per group, so --only can skip building (and loading
+# the models of) groups it doesn't select
+PREFIXES = {"games": ("tictactoe", "guessing", "psychology")}
+
+
+def selected(group, only):
+    """True if --only `only` can match a component of `group`"""
+    if not only:
+        return True
+    names = (group,) + PREFIXES.get(group, ())
+    return any(only in name or only.startswith(name + ".") for name in names)
+
+
+# ---------------------------
+# Runner
+# ---------------------------
+def run_case(case, iterations, warmup):
+    iterations = case.iterations or iterations
+    inputs = case.inputs
+
+    def arg(i):
+        value = inputs[i % len(inputs)]
+        return case.prepare(value) if case.prepare else value
+
+    for i in range(warmup):
+        case.fn(arg(i))
+
+    latencies = np.empty(iterations, dtype=np.float64)
+    for i in range(iterations):
+        value = arg(i)
+        start = time.perf_counter()
+        case.fn(value)
+        latencies[i] = time.perf_counter() - start
+
+    # Separate, shorter pass for memory: tracemalloc slows every allocation
+    tracemalloc.start()
+    for i in range(min(iterations, 10)):
+        case.fn(arg(i))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ms = latencies * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    result = {
+        "iterations": iterations,
+        "throughput_per_s": round(float(iterations / latencies.sum()), 2),
+        "mean_ms": round(float(ms.mean()), 4),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "peak_alloc_kb": round(peak / 1024, 1),
+    }
+    if case.stats is not None:
+        result["stats"] = case.stats()
+    return result
+
+
+def compare(results, baseline, threshold):
+    """Print a comparison table; returns the names that regressed"""
+    regressions = []
+    print(f"\n{'component':<34}{'p50 ms':>10}{'p95 ms':>10}{'per s':>12}{'peak KB':>10}{'vs base':>10}")
+    print("-" * 86)
+    for name, result in results.items():
+        if "skipped" in result:
+            print(f"{name:<34}  skipped: {result['skipped']}")
+            continue
+        delta = ""
+        base = baseline.get(name)
+        if base and "p50_ms" in base and base["p50_ms"] > 0:
+            ratio = result["p50_ms"] / base["p50_ms"]
+            delta = f"{(ratio - 1) * 100:+.1f}%"
+            if ratio > 1 + threshold:
+                delta += " !"
+                regressions.append(name)
+        print(f"{name:<34}{result['p50_ms']:>10.3f}{result['p95_ms']:>10.3f}"
+              f"{result['throughput_per_s']:>12.1f}{result['peak_alloc_kb']:>10.1f}{delta:>10}")
+        if result.get("stats"):
+            print("    " + ", ".join(f"{key} {value}" for key, value in result["stats"].items()))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", default="",
+                        help="run only this group or components starting with it (e.g. yolo, tictactoe.check_winner)")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed p50 slowdown vs baseline before failing (0.15 = 15%%)")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", type=Path, help="also write the results JSON here")
+    args = parser.parse_args()
+
+    results = {}
+    for group, build in GROUPS.items():
+        if not selected(group, args.only):
+            continue
+        try:
+            cases = build()
+        except Skip as e:
+            results[group] = {"skipped": str(e)}
+            continue
+        for case in cases:
+            try:
+                if args.only in case.name or args.only == group:
+                    print(f"Running {case.name}...", flush=True)
+                    results[case.name] = run_case(case, args.iterations, args.warmup)
+            finally:
+                if case.teardown is not None:
+                    case.teardown()
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+    baseline = {}
+    if args.baseline.exists() and not args.update_baseline:
+        baseline = json.loads(args.baseline.read_text()).get("results", {})
+    elif not args.update_baseline:
+        print(f"\n⚠ No baseline at {args.baseline}: nothing is compared. "
+              f"Run with --update-baseline on this machine to record one.")
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"\n✓ Baseline written to {args.baseline}")
+    elif regressions:
+        print(f"\n✗ {len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Combined mode: emotion, hand landmarks and objects from one camera
+
+Each frame is read once and fanned out to the stages on a thread pool
+(TensorFlow, torch and MediaPipe release the GIL while they run). The
+outputs are merged into one annotated frame and, optionally, one JSON
+record per frame.
+
+Each stage has a schedule:
+    every      every frame
+    every:N    every Nth frame
+    person     only when YOLO currently sees a person (waits for YOLO on
+               frames where both run, so a cheap detector gates an expensive stage)
+
+    python combined/multi_task.py --yolo every:2 --emotion person --hands every
+    python combined/multi_task.py --record results.jsonl
+
+Frames a stage skips reuse its last result for drawing.
+
+The stages run at the same time, so the core budget (CV_CORE_BUDGET, see
+cv_common/threads.py) is split between them by STAGE_THREAD_WEIGHTS instead
+of each framework starting a thread per core.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "Emotion_detection"))
+sys.path.insert(0, str(PROJECT_ROOT / "pose_detection"))
+from cv_common import model_server, profiles, startup, threads
+from cv_common.capture import open_capture, requested_size
+from cv_common.frames import FrameBuffers
+from cv_common.hands import HandService, mp_hands, mp_drawing
+from cv_common.model_lifecycle import ModelLifecycle
+from cv_common.telemetry import Telemetry
+from emotion_backends import select_backend
+import tes
+import hand_tracking
+
+# Relative share of the core budget per framework (MediaPipe's only keeps cores free for it)
+STAGE_THREAD_WEIGHTS = {"torch": 2, "tensorflow": 1, "mediapipe": 1}
+CAPTURE_SIZE = (1280, 720)
+
+
+# ---------------------------
+# Scheduling
+# ---------------------------
+class Schedule:
+    """Parsed stage schedule: 'every', 'every:N' or 'person'"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.every = 1
+        self.person = spec == "person"
+        if spec.startswith("every:"):
+            self.every = max(1, int(spec.split(":", 1)[1]))
+        elif spec not in ("every", "person"):
+            raise ValueError(f"Unknown schedule {spec!r}; use every, every:N or person")
+
+    def due(self, frame_index, person_seen):
+        if self.person:
+            return person_seen
+        return frame_index % self.every == 0
+
+
+# ---------------------------
+# Stages
+# ---------------------------
+class EmotionStage:
+    name = "emotion"
+
+    def __init__(self):
+        self.lifecycle = ModelLifecycle(
+            "emotion",
+            load=lambda: select_backend().load(),
+            warmup=lambda m: m.predict(np.zeros((1, 224, 224, 3), dtype=np.float32)),
+        )
+
+    def start(self):
+        self.lifecycle.start()
+
+    def ready(self, telemetry):
+        self.model = self.lifecycle.result(telemetry)
+
+    def run(self, bgr, rgb):
+        gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+        faces = tes.face_haar_cascade.detectMultiScale(gray, 1.3, 5)
+        if len(faces) == 0:
+            return []
+        # All faces in one batch
+        batch = np.empty((len(faces), 224, 224, 3), dtype=np.float32)
+        for i, (x, y, w, h) in enumerate(faces):
+            roi = cv2.resize(gray[y:y + h, x:x + w], (224, 224))
+            batch[i] = roi[..., None] / 255.0
+        with self.lifecycle.steady():
+            probs = self.model.predict(batch)
+        return [{"box": [int(v) for v in face], "emotion": tes.emotions[int(np.argmax(p))],
+                 "confidence": round(float(np.max(p)), 3)}
+                for face, p in zip(faces, probs)]
+
+    def draw(self, frame, faces):
+        for face in faces:
+            x, y, w, h = face["box"]
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2)
+            cv2.putText(frame, face["emotion"], (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+
+    def close(self):
+        self.lifecycle.report()
+
+
+class HandsStage:
+    name = "hands"
+
+    def start(self):
+        # The stage's schedule decides which frames run, not CV_INFERENCE_STRIDE
+        self._loading = HandService.load(max_num_hands=2, min_detection_confidence=0.7,
+                                         min_tracking_confidence=0.7, stride=1)
+
+    def ready(self, telemetry):
+        self.hands = self._loading.result()
+        startup.mark("hands")
+
+    def run(self, bgr, rgb):
+        results = self.hands.process(rgb)
+        hands = []
+        if results.multi_hand_landmarks and results.multi_handedness:
+            for landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
+                hands.append({
+                    "label": handedness.classification[0].label,
+                    "fingers": hand_tracking.count_fingers(landmarks, handedness),
+                    "landmarks": landmarks,
+                })
+        return hands
+
+    def draw(self, frame, hands):
+        for i, hand in enumerate(hands):
+            mp_drawing.draw_landmarks(frame, hand["landmarks"], mp_hands.HAND_CONNECTIONS)
+            cv2.putText(frame, f"{hand['label']} hand: {hand['fingers']} fingers", (10, 30 + 35 * i),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 0), 2)
+
+    def close(self):
+        # Not set if the stage never got as far as ready()
+        hands = getattr(self, "hands", None)
+        if hands is not None:
+            hands.close()
+
+
+class YoloStage:
+    name = "yolo"
+
+    def __init__(self, weights):
+        def load():
+            if model_server.enabled():
+                return model_server.RemoteModel("yolo", weights=weights).load()
+            from ultralytics import YOLO
+            threads.configure_torch()
+            return YOLO(weights)
+
+        # Warm up on the size the camera is asked for (CV_CAPTURE_* may replace it)
+        width, height = requested_size(*CAPTURE_SIZE)
+        self.lifecycle = ModelLifecycle(
+            "yolo", load=load,
+            warmup=lambda m: m(np.zeros((height, width, 3), dtype=np.uint8), conf=0.3, verbose=False),
+        )
+
+    def start(self):
+        self.lifecycle.start()
+
+    def ready(self, telemetry):
+        self.model = self.lifecycle.result(telemetry)
+
+    def run(self, bgr, rgb):
+        with self.lifecycle.steady():
+            result = self.model(bgr, conf=0.3, verbose=False)[0]
+        boxes = result.boxes
+        return [{"box": [round(float(v), 1) for v in xyxy], "class": result.names[int(c)],
+                 "confidence": round(float(conf), 3)}
+                for xyxy, c, conf in zip(boxes.xyxy.tolist(), boxes.cls.tolist(), boxes.conf.tolist())]
+
+    def draw(self, frame, objects):
+        for obj in objects:
+            x1, y1, x2, y2 = (int(v) for v in obj["box"])
+            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 200, 0), 2)
+            cv2.putText(frame, f"{obj['class']} {obj['confidence']:.2f}", (x1, max(y1 - 6, 12)),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 200, 0), 2)
+
+    def close(self):
+        self.lifecycle.report()
+
+
+def _record(frame_index, stage_results, ran):
+    record = {"frame": frame_index, "ts": time.time(), "ran": sorted(ran)}
+    for name, result in stage_results.items():
+        if name == "hands":
+            result = [{k: v for k, v in hand.items() if k != "landmarks"} for hand in result]
+        record[name] = result
+    return record
+
+
+def main():
+    # Before the defaults below are read: CV_PROFILE fills in weights and schedules
+    profiles.apply()
+    parser = argparse.ArgumentParser(description="Emotion + hands + objects from one camera")
+    parser.add_argument("--emotion", default=os.environ.get("CV_SCHEDULE_EMOTION", "person"))
+    parser.add_argument("--hands", default=os.environ.get("CV_SCHEDULE_HANDS", "every"))
+    parser.add_argument("--yolo", default=os.environ.get("CV_SCHEDULE_YOLO", "every:2"))
+    parser.add_argument("--weights", default=os.environ.get("CV_YOLO_WEIGHTS", "yolov8n.pt"))
+    parser.add_argument("--record", type=Path, help="append one JSON record per frame here")
+    args = parser.parse_args()
+
+    try:
+        schedules = {name: Schedule(getattr(args, name)) for name in ("yolo", "emotion", "hands")}
+    except ValueError as e:
+        parser.error(str(e))
+    if schedules["yolo"].person:
+        parser.error("the yolo stage cannot be gated on its own person detections")
+
+    threads.apply(weights=STAGE_THREAD_WEIGHTS)
+    # Everything from here is inside the try, so a failed load or camera is
+    # reported as itself and only what was set up gets cleaned up
+    stages, cap, telemetry, recorder = {}, None, None, None
+    try:
+        stages = {"yolo": YoloStage(args.weights), "emotion": EmotionStage(), "hands": HandsStage()}
+        # Models load (and warm up) in the background while the camera opens
+        for stage in stages.values():
+            stage.start()
+
+        cap = open_capture(0, width=CAPTURE_SIZE[0], height=CAPTURE_SIZE[1])
+        if not cap.isOpened():
+            print("Error: Could not open camera")
+            sys.exit(1)
+        buffers = FrameBuffers()
+        telemetry = Telemetry("multi_task")
+        startup.mark("camera")
+        for stage in stages.values():
+            stage.ready(telemetry)
+
+        print("Schedules: " + ", ".join(f"{name}={s.spec}" for name, s in schedules.items()))
+        print("Press 'q' to quit, 'h' for the performance HUD")
+
+        def timed(stage, bgr, rgb):
+            start = time.perf_counter()
+            result = stage.run(bgr, rgb)
+            telemetry.record(stage.name, (time.perf_counter() - start) * 1000)
+            return result
+
+        recorder = open(args.record, "a", buffering=1) if args.record else None
+        latest = {name: [] for name in stages}
+        frame_index = 0
+        with ThreadPoolExecutor(max_workers=len(stages), thread_name_prefix="stage") as pool:
+            while True:
+                with telemetry.stage("capture"):
+                    ret, frame, rgb = buffers.read(cap)
+                if not ret:
+                    break
+
+                # Ungated stages run concurrently
+                person_seen = any(obj["class"] == "person" for obj in latest["yolo"])
+                futures = {name: pool.submit(timed, stages[name], frame, rgb)
+                           for name, s in schedules.items() if not s.person and s.due(frame_index, person_seen)}
+
+                # Person-gated stages use this frame's YOLO result when there is one
+                if "yolo" in futures:
+                    latest["yolo"] = futures.pop("yolo").result()
+                    person_seen = any(obj["class"] == "person" for obj in latest["yolo"])
+                    ran = {"yolo"}
+                else:
+                    ran = set()
+                for name, s in schedules.items():
+                    if s.person and s.due(frame_index, person_seen):
+                        futures[name] = pool.submit(timed, stages[name], frame, rgb)
+
+                for name, future in futures.items():
+                    latest[name] = future.result()
+                    ran.add(name)
+
+                with telemetry.stage("render"):
+                    for name, stage in stages.items():
+                        stage.draw(frame, latest[name])
+                    telemetry.draw_hud(frame)
+                    cv2.imshow("Multi-Task: Emotion + Hands + Objects", frame)
+                if recorder is not None:
+                    recorder.write(json.dumps(_record(frame_index, latest, ran)) + "\n")
+                telemetry.frame()
+                frame_index += 1
+
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('q'):
+                    break
+                telemetry.handle_key(key)
+
+    except KeyboardInterrupt:
+        print("\nStopping...")
+
+    finally:
+        for stage in stages.values():
+            stage.close()
+        if recorder is not None:
+            recorder.close()
+        if telemetry is not None:
+            telemetry.close()
+        if cap is not None:
+            cap.release()
+        cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    main()
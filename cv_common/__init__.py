@@ -0,0 +1,3 @@
+"""
+Shared helpers for the Having Fun with Computer Vision modules
+"""
@@ -0,0 +1,226 @@
+"""
+Camera source for the modules
+
+    open_capture(0)                             cv2.VideoCapture(0) as before
+    open_capture(0, width=1280, height=720,     low-latency capture: format
+                 threaded=True)                 negotiation + a reader thread
+
+CV_FRAME_BUS=<name> replaces the camera with a frame bus consumer (see
+cv_common/frame_bus.py); the size is fixed by the producer, and frames are
+resized to the requested size when it differs.
+
+The hand-only modules pass `hands_replay=True`: while CV_HANDS_REPLAY plays
+recorded landmarks back (see cv_common/landmark_recorder.py) they get blank
+frames of the requested size instead of the camera, so they run headless.
+
+Left to its defaults, V4L2 often delivers uncompressed YUYV, which USB 2
+can only carry at a low frame rate at 1280x720, and queues several frames
+in the driver. Asking for a size (or FPS) negotiates:
+
+    CV_CAPTURE_FOURCC   pixel format, default MJPG ("" keeps the driver's)
+    CV_CAPTURE_FPS      requested frame rate (default: the driver's)
+    CAP_PROP_BUFFERSIZE 1, so the driver doesn't hold on to old frames
+
+CV_CAPTURE_WIDTH / CV_CAPTURE_HEIGHT (set by the performance profiles, see
+cv_common/profiles.py) replace the size a module asks for, unless it passes
+`resizable=False` because its layout needs exactly that size.
+
+With `threaded=True` (or CV_CAPTURE_THREADED=1) frames are grabbed and
+decoded on their own thread; `read()` returns the newest one, and frames
+that were replaced before being read are counted in `dropped`.
+"""
+
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+def fourcc_name(code):
+    code = int(code)
+    return "".join(chr((code >> 8 * i) & 0xFF) for i in range(4)).strip("\0")
+
+
+def negotiate(cap, width=None, height=None, fps=None, fourcc=None, buffer_size=1):
+    """Request format, size, rate and a short driver queue; returns what was granted"""
+    if fourcc is None:
+        fourcc = os.environ.get("CV_CAPTURE_FOURCC", "MJPG")
+    if fps is None and os.environ.get("CV_CAPTURE_FPS"):
+        fps = float(os.environ["CV_CAPTURE_FPS"])
+    # V4L2 applies these in order: the format decides which sizes and rates exist
+    if fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+    if width:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    if height:
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    if fps:
+        cap.set(cv2.CAP_PROP_FPS, fps)
+    if buffer_size:
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+    return {
+        "fourcc": fourcc_name(cap.get(cv2.CAP_PROP_FOURCC)),
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": cap.get(cv2.CAP_PROP_FPS),
+    }
+
+
+class ThreadedCapture:
+    """VideoCapture wrapper that grabs and decodes on a background thread
+
+    The thread always holds the newest frame, so a slow consumer gets the
+    freshest image instead of working through a backlog. `timestamp` is the
+    time.time() at which the returned frame was grabbed.
+    """
+
+    def __init__(self, cap, timeout=2.0):
+        self._cap = cap
+        self.timeout = timeout
+        self.timestamp = None
+        self.captured = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._ready = threading.Condition()
+        self._buffers = [None, None]
+        self._latest = None
+        self._seq = -1
+        self._last_seq = -1
+        self._ended = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _start(self):
+        # Started on the first read, so settings made right after opening go
+        # straight to the device
+        self._thread = threading.Thread(target=self._run, name="camera-reader", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        back = 0
+        while not self._stop.is_set():
+            with self._lock:
+                ok = self._cap.grab()
+                timestamp = time.time()
+                if ok:
+                    ok, frame = self._cap.retrieve(self._buffers[back])
+            if not ok:
+                break
+            with self._ready:
+                # The other buffer may be mid-copy in read(), which holds this condition
+                self._buffers[back] = frame
+                self._latest = (self._seq + 1, timestamp, frame)
+                self._seq += 1
+                self.captured += 1
+                self._ready.notify_all()
+            back = 1 - back
+        with self._ready:
+            self._ended = True
+            self._ready.notify_all()
+
+    def isOpened(self):
+        return self._cap.isOpened() and not self._ended
+
+    def read(self, image=None):
+        """Like VideoCapture.read(): the newest frame not returned yet, copied into `image`"""
+        if self._thread is None:
+            self._start()
+        with self._ready:
+            if not self._ready.wait_for(lambda: self._seq > self._last_seq or self._ended, self.timeout):
+                return False, None
+            if self._seq <= self._last_seq:
+                return False, None
+            seq, timestamp, frame = self._latest
+            if image is None or image.shape != frame.shape:
+                image = frame.copy()
+            else:
+                image[...] = frame
+        if self._last_seq >= 0:
+            self.dropped += seq - self._last_seq - 1
+        self._last_seq = seq
+        self.timestamp = timestamp
+        return True, image
+
+    def get(self, prop):
+        with self._lock:
+            return self._cap.get(prop)
+
+    def set(self, prop, value):
+        with self._lock:
+            return self._cap.set(prop, value)
+
+    def release(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout)
+        with self._lock:
+            self._cap.release()
+
+
+class BlankCapture:
+    """Black frames with the parts of the cv2.VideoCapture API the modules use"""
+
+    def __init__(self, width=640, height=480):
+        self.shape = (height, width, 3)
+        self._opened = True
+
+    def isOpened(self):
+        return self._opened
+
+    def read(self, image=None):
+        if not self._opened:
+            return False, None
+        if image is None or image.shape != self.shape:
+            image = np.zeros(self.shape, dtype=np.uint8)
+        else:
+            # The caller may have drawn on the last one
+            image.fill(0)
+        return True, image
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.shape[1])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.shape[0])
+        return 0.0
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        self._opened = False
+
+
+def requested_size(width=None, height=None, resizable=True):
+    """(width, height) open_capture() will ask the camera for; (None, None) = driver default"""
+    if resizable and os.environ.get("CV_CAPTURE_WIDTH") and os.environ.get("CV_CAPTURE_HEIGHT"):
+        return int(os.environ["CV_CAPTURE_WIDTH"]), int(os.environ["CV_CAPTURE_HEIGHT"])
+    return width, height
+
+
+def open_capture(index=0, width=None, height=None, fps=None, threaded=None, resizable=True,
+                 hands_replay=False):
+    """VideoCapture-compatible source for camera `index`"""
+    width, height = requested_size(width, height, resizable)
+    if hands_replay and os.environ.get("CV_HANDS_REPLAY"):
+        print("Hand replay: blank frames instead of the camera")
+        return BlankCapture(width or 640, height or 480)
+
+    bus = os.environ.get("CV_FRAME_BUS")
+    if bus:
+        from cv_common.frame_bus import FrameBusCapture
+        # The module gets the size it asked for (a fixed layout's or the profile's)
+        return FrameBusCapture(bus, size=(width, height) if width and height else None)
+    if fps is None and os.environ.get("CV_CAPTURE_FPS"):
+        fps = float(os.environ["CV_CAPTURE_FPS"])
+
+    cap = cv2.VideoCapture(index)
+    if cap.isOpened() and (width or height or fps):
+        granted = negotiate(cap, width, height, fps)
+        print(f"Camera: {granted['fourcc'] or '?'} {granted['width']}x{granted['height']} "
+              f"@ {granted['fps']:.0f} FPS")
+    if threaded is None:
+        threaded = os.environ.get("CV_CAPTURE_THREADED", "0") == "1"
+    return ThreadedCapture(cap) if threaded else cap
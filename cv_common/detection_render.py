@@ -0,0 +1,101 @@
+"""
+Lightweight detection renderer, a stand-in for Ultralytics' `result.plot()`
+
+`plot()` copies the frame and draws every box and label through the
+Ultralytics annotator. This draws straight onto the frame you already have:
+
+    renderer = DetectionRenderer(model.names)
+    renderer.draw_result(frame, results[0])     # in place
+    cv2.imshow("...", frame)
+
+* boxes of one class are drawn with a single cv2.polylines call
+* label images ("person 0.85" on its class colour) are rendered once per
+  class and confidence bucket, then pasted with a slice assignment
+* `every=N` (CV_RENDER_EVERY) renders and displays only every Nth frame,
+  so detection can run faster than the screen needs to refresh
+"""
+
+import os
+
+import cv2
+import numpy as np
+
+# Ultralytics' default palette, so colours match what plot() showed
+_PALETTE = np.array([
+    (56, 56, 255), (151, 157, 255), (31, 112, 255), (29, 178, 255), (49, 210, 207),
+    (10, 249, 72), (23, 204, 146), (134, 219, 61), (52, 147, 26), (187, 212, 0),
+    (168, 153, 44), (255, 194, 0), (147, 69, 52), (255, 115, 100), (236, 24, 0),
+    (255, 56, 132), (133, 0, 82), (255, 56, 203), (200, 149, 255), (199, 55, 255),
+], dtype=np.uint8)
+
+
+def class_color(class_id):
+    return tuple(int(c) for c in _PALETTE[int(class_id) % len(_PALETTE)])
+
+
+class DetectionRenderer:
+    """Draws boxes and cached label sprites in place on BGR frames"""
+
+    def __init__(self, names=None, thickness=2, font_scale=0.5, conf_step=0.05, every=None):
+        if every is None:
+            every = int(os.environ.get("CV_RENDER_EVERY", "1") or 1)
+        self.names = names or {}
+        self.thickness = thickness
+        self.font_scale = font_scale
+        self.conf_step = conf_step
+        self.every = max(1, every)
+        self._sprites = {}
+
+    def due(self, frame_index):
+        """True on the frames that should be drawn and shown"""
+        return frame_index % self.every == 0
+
+    def _label(self, class_id, conf):
+        bucket = int(round(conf / self.conf_step))
+        key = (class_id, bucket)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            text = f"{self.names.get(class_id, class_id)} {bucket * self.conf_step:.2f}"
+            (w, h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, self.font_scale, 1)
+            sprite = np.empty((h + baseline + 4, w + 4, 3), dtype=np.uint8)
+            sprite[:] = class_color(class_id)
+            cv2.putText(sprite, text, (2, h + 2), cv2.FONT_HERSHEY_SIMPLEX, self.font_scale,
+                        (255, 255, 255), 1, cv2.LINE_AA)
+            self._sprites[key] = sprite
+        return sprite
+
+    @staticmethod
+    def _paste(frame, sprite, x, y):
+        fh, fw = frame.shape[:2]
+        h, w = sprite.shape[:2]
+        x0, y0, x1, y1 = max(x, 0), max(y, 0), min(x + w, fw), min(y + h, fh)
+        if x1 > x0 and y1 > y0:
+            frame[y0:y1, x0:x1] = sprite[y0 - y:y1 - y, x0 - x:x1 - x]
+
+    def draw(self, frame, xyxy, classes, confs):
+        """Draw (n, 4) boxes with their class ids and confidences onto `frame`"""
+        if len(xyxy) == 0:
+            return frame
+        boxes = np.asarray(xyxy).round().astype(np.int32)
+        classes = np.asarray(classes).astype(np.int64)
+        # Each box as a closed 4-point polygon; one polylines call per class
+        corners = boxes[:, [0, 1, 2, 1, 2, 3, 0, 3]].reshape(-1, 4, 2)
+        for class_id in np.unique(classes):
+            cv2.polylines(frame, list(corners[classes == class_id]), True, class_color(class_id), self.thickness)
+
+        for (x1, y1, _, _), class_id, conf in zip(boxes.tolist(), classes.tolist(), np.asarray(confs).tolist()):
+            sprite = self._label(class_id, conf)
+            # Above the box, or just inside it at the top edge of the frame
+            y = y1 - sprite.shape[0] if y1 >= sprite.shape[0] else y1
+            self._paste(frame, sprite, x1, y)
+        return frame
+
+    def draw_result(self, frame, result):
+        """Draw an Ultralytics Results object onto `frame` (not result.orig_img)"""
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return frame
+        if not self.names:
+            self.names = result.names
+        boxes = boxes.cpu().numpy()
+        return self.draw(frame, boxes.xyxy, boxes.cls, boxes.conf)
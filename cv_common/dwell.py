@@ -0,0 +1,141 @@
+"""
+Time-based dwell and debounce helpers for gesture-driven widgets
+
+Everything here runs off time.monotonic(), so click latency and cooldowns
+stay the same whether the camera loop runs at 10 or 60 FPS.
+"""
+
+import time
+
+import cv2
+
+
+class Debouncer:
+    """Allow an action at most once every `interval` seconds"""
+
+    def __init__(self, interval, clock=time.monotonic):
+        self.interval = interval
+        self.clock = clock
+        self._last = None
+
+    def ready(self, now=None):
+        """Check if the cooldown has elapsed"""
+        if self._last is None:
+            return True
+        now = self.clock() if now is None else now
+        return now - self._last >= self.interval
+
+    def trigger(self, now=None):
+        """Return True and restart the cooldown if the action is allowed"""
+        now = self.clock() if now is None else now
+        if not self.ready(now):
+            return False
+        self._last = now
+        return True
+
+    def reset(self):
+        """Clear the cooldown"""
+        self._last = None
+
+
+class Dwell:
+    """Fire once a condition has held for `dwell_time` seconds
+
+    The condition may drop out for up to `release_time` seconds (a missed
+    detection, a jittery fingertip) without restarting the dwell. After
+    firing, the condition has to be released before it can fire again.
+    While `armed` is False (e.g. a cooldown) the dwell keeps timing but holds
+    back the click until the first armed update.
+    """
+
+    def __init__(self, dwell_time, release_time=0.15, clock=time.monotonic):
+        self.dwell_time = dwell_time
+        self.release_time = release_time
+        self.clock = clock
+        self._start = None
+        self._last_seen = None
+        self._fired = False
+        self._now = None
+
+    @property
+    def active(self):
+        """True while the condition is held (including the release grace)"""
+        return self._start is not None
+
+    @property
+    def progress(self):
+        """Dwell completion in [0, 1]"""
+        if self._start is None or self._fired:
+            return 0.0
+        return min(1.0, (self._now - self._start) / self.dwell_time)
+
+    def update(self, active, now=None, armed=True):
+        """Feed the current condition; return True on the update the dwell completes"""
+        now = self.clock() if now is None else now
+        self._now = now
+
+        if active:
+            self._last_seen = now
+            if self._start is None:
+                self._start = now
+            if armed and not self._fired and now - self._start >= self.dwell_time:
+                self._fired = True
+                return True
+        elif self._start is not None and now - self._last_seen > self.release_time:
+            self.reset()
+        return False
+
+    def reset(self):
+        """Drop any dwell in progress"""
+        self._start = None
+        self._last_seen = None
+        self._fired = False
+
+
+class DwellButton(Dwell):
+    """Rectangular widget that clicks when the pointer rests on it
+
+    Hysteresis on enter/exit: the pointer has to be inside the rectangle to
+    start a dwell, but only leaves once it is more than `margin` pixels
+    outside, so a fingertip hovering on the edge doesn't flicker.
+    """
+
+    def __init__(self, x, y, width, height, dwell_time=0.6, margin=10,
+                 release_time=0.15, clock=time.monotonic):
+        super().__init__(dwell_time, release_time=release_time, clock=clock)
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.margin = margin
+
+    @classmethod
+    def from_rect(cls, rect, **kwargs):
+        """Build a button from a {"x", "y", "width", "height"} dict"""
+        return cls(rect["x"], rect["y"], rect["width"], rect["height"], **kwargs)
+
+    @property
+    def center(self):
+        return (self.x + self.width // 2, self.y + self.height // 2)
+
+    def contains(self, px, py, margin=0):
+        """Check if a pixel lies inside the button grown by `margin`"""
+        return (self.x - margin < px < self.x + self.width + margin and
+                self.y - margin < py < self.y + self.height + margin)
+
+    def update(self, point, now=None, armed=True):
+        """Feed the pointer position (or None); return True when the click fires"""
+        inside = False
+        if point is not None:
+            margin = self.margin if self.active else 0
+            inside = self.contains(point[0], point[1], margin)
+        return super().update(inside, now, armed)
+
+    def draw_progress(self, frame, color=(0, 255, 255), thickness=4):
+        """Draw the dwell progress as a ring around the button center"""
+        progress = self.progress
+        if progress <= 0:
+            return
+        radius = max(8, min(self.width, self.height) // 2 - thickness)
+        cv2.ellipse(frame, self.center, (radius, radius), -90, 0, 360 * progress,
+                    color, thickness)
@@ -0,0 +1,182 @@
+"""
+Signal smoothing filters for noisy gesture measurements
+"""
+
+import math
+import time
+
+import numpy as np
+
+
+def _smoothing_factor(dt, cutoff):
+    """EMA weight for a first-order low-pass filter at `cutoff` Hz"""
+    r = 2 * math.pi * cutoff * dt
+    return r / (r + 1)
+
+
+class EMAFilter:
+    """Exponential moving average with a fixed weight"""
+
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self._x = None
+
+    def __call__(self, value, t=None):
+        if self._x is None:
+            self._x = value
+        else:
+            self._x = self.alpha * value + (1 - self.alpha) * self._x
+        return self._x
+
+    def reset(self):
+        self._x = None
+
+
+class OneEuroFilter:
+    """One-Euro filter: heavy smoothing when still, low lag when moving
+
+    `min_cutoff` (Hz) sets the jitter rejection at rest and `beta` how fast
+    the cutoff opens up with speed. Timestamps come from a monotonic clock so
+    the smoothing does not depend on the frame rate.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.0, d_cutoff=1.0, clock=time.monotonic):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.clock = clock
+        self.reset()
+
+    def __call__(self, value, t=None):
+        t = self.clock() if t is None else t
+        if self._x is None:
+            self._x, self._dx, self._t = value, 0.0, t
+            return value
+
+        dt = t - self._t
+        if dt <= 0:
+            return self._x
+        self._t = t
+
+        a_d = _smoothing_factor(dt, self.d_cutoff)
+        self._dx = a_d * (value - self._x) / dt + (1 - a_d) * self._dx
+        cutoff = self.min_cutoff + self.beta * abs(self._dx)
+        a = _smoothing_factor(dt, cutoff)
+        self._x = a * value + (1 - a) * self._x
+        return self._x
+
+    def reset(self):
+        self._x = None
+        self._dx = 0.0
+        self._t = None
+
+
+class LandmarkFilterBank:
+    """One-Euro filters over all 21x3 landmarks of each hand, as NumPy arrays
+
+    The state of every landmark of a hand is updated in one vectorised step.
+    The cutoff opens up with each landmark's speed, so a fingertip that
+    moves fast is not held back by the slow ones.
+
+    With `lookahead` (seconds) the output is extrapolated along the filtered
+    velocity, compensating for the time between the frame being captured
+    and the cursor being drawn.
+
+    Hands are kept in slots by handedness (Left = 0, Right = 1), so two
+    hands don't swap filter state when MediaPipe reorders them.
+    """
+
+    def __init__(self, max_hands=2, min_cutoff=1.5, beta=10.0, d_cutoff=1.0, lookahead=0.0,
+                 clock=time.monotonic):
+        self.max_hands = max_hands
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.lookahead = lookahead
+        self.clock = clock
+        self._x = np.zeros((max_hands, 21, 3), dtype=np.float64)
+        self._dx = np.zeros_like(self._x)
+        self._out = np.zeros_like(self._x)
+        self._raw = np.zeros((21, 3), dtype=np.float64)
+        self._t = np.zeros(max_hands, dtype=np.float64)
+        self._active = np.zeros(max_hands, dtype=bool)
+
+    def filter(self, slot, points, t=None):
+        """Filter one hand's (21, 3) landmarks; returns the (predicted) estimate
+
+        The returned array is reused on the next call for the same slot.
+        """
+        t = self.clock() if t is None else t
+        x, dx, out = self._x[slot], self._dx[slot], self._out[slot]
+        if not self._active[slot]:
+            x[:] = points
+            dx[:] = 0.0
+            self._t[slot] = t
+            self._active[slot] = True
+            out[:] = x
+            return out
+
+        dt = t - self._t[slot]
+        if dt <= 0:
+            return out
+        self._t[slot] = t
+
+        a_d = _smoothing_factor(dt, self.d_cutoff)
+        dx *= 1 - a_d
+        dx += a_d * (points - x) / dt
+        speed = np.linalg.norm(dx, axis=1, keepdims=True)
+        a = _smoothing_factor(dt, self.min_cutoff + self.beta * speed)
+        x += a * (points - x)
+        np.multiply(dx, self.lookahead, out=out)
+        out += x
+        return out
+
+    def reset(self, slot=None):
+        if slot is None:
+            self._active[:] = False
+        else:
+            self._active[slot] = False
+
+    def _slots(self, results):
+        """Filter slot for each detected hand (None beyond max_hands)"""
+        handedness = results.multi_handedness or []
+        slots, used = [], set()
+        for i in range(len(results.multi_hand_landmarks)):
+            slot = None
+            # Replays label hands recorded without handedness "Unknown": no preference
+            label = handedness[i].classification[0].label if i < len(handedness) else None
+            if label in ("Left", "Right"):
+                preferred = 0 if label == "Left" else 1
+                if preferred < self.max_hands and preferred not in used:
+                    slot = preferred
+            if slot is None:
+                slot = next((s for s in range(self.max_hands) if s not in used), None)
+            if slot is not None:
+                used.add(slot)
+            slots.append(slot)
+        return slots
+
+    def apply(self, results, t=None):
+        """Replace the landmarks in MediaPipe hand results with filtered ones
+
+        Slots whose hand has disappeared are reset, so a returning hand
+        starts from its measured position instead of gliding in.
+        """
+        t = self.clock() if t is None else t
+        if not results.multi_hand_landmarks:
+            self.reset()
+            return results
+
+        slots = self._slots(results)
+        for slot in set(range(self.max_hands)) - set(slots):
+            self.reset(slot)
+        for hand, slot in zip(results.multi_hand_landmarks, slots):
+            if slot is None:
+                continue
+            raw = self._raw
+            for i, lm in enumerate(hand.landmark):
+                raw[i] = (lm.x, lm.y, lm.z)
+            filtered = self.filter(slot, raw, t)
+            for lm, (x, y, z) in zip(hand.landmark, filtered.tolist()):
+                lm.x, lm.y, lm.z = x, y, z
+        return results
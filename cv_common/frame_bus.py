@@ -0,0 +1,280 @@
+"""
+Shared-memory frame bus: one process owns the camera, any number read it
+
+The producer captures straight into a ring of preallocated frame slots in a
+`multiprocessing.shared_memory` block. Consumers map the same block, so the
+latest frame is available to every process without pipes or pickling.
+
+    python -m cv_common.frame_bus --camera 0 --width 1280 --height 720   # producer
+    CV_FRAME_BUS=cv_frames python pose_detection/hand_tracking.py        # consumer
+
+Block layout (all little-endian, 64-byte aligned):
+    header    int64[8]   magic, height, width, channels, slots, latest seq, closed, -
+    seqs      int64[n]   sequence number held by each slot (-1 while being written)
+    stamps    float64[n] capture time of each slot (time.time())
+    frames    uint8[n, h, w, c]
+
+A slot is reused `slots` frames later; readers check the slot's sequence
+number before and after using it, like a seqlock.
+
+`FrameBusCapture.latest()` hands out a view into the block without copying;
+`read()` copies the frame out (resizing it on the way when the consumer asked
+for another size than the producer publishes).
+"""
+
+import argparse
+import signal
+import sys
+import time
+
+import cv2
+import numpy as np
+from multiprocessing import shared_memory
+
+DEFAULT_NAME = "cv_frames"
+MAGIC = 0x43564642  # "CVFB"
+_HEADER = 8
+
+
+def _align(n, to=64):
+    return (n + to - 1) // to * to
+
+
+def _layout(slots, shape):
+    seqs = _align(_HEADER * 8)
+    stamps = _align(seqs + slots * 8)
+    frames = _align(stamps + slots * 8)
+    return seqs, stamps, frames, frames + slots * int(np.prod(shape))
+
+
+class _Ring:
+    """numpy views over a frame bus block"""
+
+    def __init__(self, shm, slots, shape):
+        seqs, stamps, frames, _ = _layout(slots, shape)
+        self.shm = shm
+        self.header = np.ndarray((_HEADER,), dtype=np.int64, buffer=shm.buf)
+        self.seqs = np.ndarray((slots,), dtype=np.int64, buffer=shm.buf, offset=seqs)
+        self.stamps = np.ndarray((slots,), dtype=np.float64, buffer=shm.buf, offset=stamps)
+        self.frames = np.ndarray((slots,) + tuple(shape), dtype=np.uint8, buffer=shm.buf, offset=frames)
+        self.slots = slots
+
+    @property
+    def latest(self):
+        return int(self.header[5])
+
+    @property
+    def closed(self):
+        return bool(self.header[6])
+
+    def release(self):
+        # Views must go before the block can be closed
+        del self.header, self.seqs, self.stamps, self.frames
+        self.shm.close()
+
+
+class FrameBusProducer:
+    """Owns the shared block and writes frames into it"""
+
+    def __init__(self, name=DEFAULT_NAME, shape=(720, 1280, 3), slots=4):
+        self.name = name
+        self.shape = tuple(shape)
+        size = _layout(slots, self.shape)[3]
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a producer that crashed
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self._ring = _Ring(shm, slots, self.shape)
+        self._ring.seqs[:] = -1
+        self._ring.header[:] = (MAGIC, self.shape[0], self.shape[1], self.shape[2], slots, -1, 0, 0)
+        self._seq = -1
+
+    def begin(self):
+        """Slot to capture the next frame into (zero-copy for cap.read(slot))"""
+        slot = (self._seq + 1) % self._ring.slots
+        self._ring.seqs[slot] = -1
+        return self._ring.frames[slot]
+
+    def commit(self, timestamp=None):
+        """Publish the frame written into the slot from begin()"""
+        self._seq += 1
+        slot = self._seq % self._ring.slots
+        self._ring.stamps[slot] = time.time() if timestamp is None else timestamp
+        self._ring.seqs[slot] = self._seq
+        self._ring.header[5] = self._seq
+
+    def write(self, frame, timestamp=None):
+        """Copy an already captured frame in and publish it"""
+        np.copyto(self.begin(), frame)
+        self.commit(timestamp)
+
+    def close(self):
+        self._ring.header[6] = 1
+        shm = self._ring.shm
+        self._ring.release()
+        shm.unlink()
+
+
+def attach_shared_memory(name):
+    """Open an existing block without taking ownership of its lifetime"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: stop the resource tracker unlinking the producer's block at exit
+        shm = shared_memory.SharedMemory(name=name)
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class FrameBusCapture:
+    """Consumer with the parts of the cv2.VideoCapture API the modules use
+
+    With `size` (width, height), `read()` returns frames of that size whatever
+    the producer publishes, for modules whose layout is drawn for one size.
+    """
+
+    def __init__(self, name=DEFAULT_NAME, timeout=2.0, size=None):
+        self.name = name
+        self.timeout = timeout
+        self.size = None
+        self._ring = None
+        self._last_seq = -1
+        self.dropped = 0
+        try:
+            shm = attach_shared_memory(name)
+        except FileNotFoundError:
+            print(f"⚠ Frame bus '{name}' not found - is the producer running?")
+            return
+        header = np.ndarray((_HEADER,), dtype=np.int64, buffer=shm.buf)
+        if header[0] != MAGIC:
+            del header
+            shm.close()
+            print(f"⚠ '{name}' is not a frame bus")
+            return
+        shape, slots = (int(header[1]), int(header[2]), int(header[3])), int(header[4])
+        del header
+        self._ring = _Ring(shm, slots, shape)
+        if size is not None and tuple(size) != (shape[1], shape[0]):
+            self.size = tuple(size)
+            print(f"Frame bus '{name}' publishes {shape[1]}x{shape[0]}; resizing to {size[0]}x{size[1]}")
+
+    def isOpened(self):
+        return self._ring is not None and not self._ring.closed
+
+    def latest(self):
+        """Wait for a frame newer than the last one read
+
+        Returns (seq, timestamp, view) where `view` points into shared memory
+        (no copy) and stays valid until the producer wraps around; returns
+        None on timeout or when the producer has stopped.
+        """
+        if not self.isOpened():
+            return None
+        deadline = time.monotonic() + self.timeout
+        ring = self._ring
+        while ring.latest <= self._last_seq:
+            if ring.closed or time.monotonic() > deadline:
+                return None
+            time.sleep(0.001)
+        seq = ring.latest
+        slot = seq % ring.slots
+        if ring.seqs[slot] != seq:
+            return self.latest()
+        if self._last_seq >= 0:
+            self.dropped += seq - self._last_seq - 1
+        self._last_seq = seq
+        return seq, float(ring.stamps[slot]), ring.frames[slot]
+
+    def read(self, image=None):
+        """Like VideoCapture.read(): copy (or resize) the next frame into `image`"""
+        while True:
+            latest = self.latest()
+            if latest is None:
+                return False, None
+            seq, _, view = latest
+            if self.size is not None:
+                shape = (self.size[1], self.size[0], view.shape[2])
+                if image is None or image.shape != shape:
+                    image = np.empty(shape, dtype=np.uint8)
+                cv2.resize(view, self.size, dst=image, interpolation=cv2.INTER_AREA)
+            elif image is None or image.shape != view.shape:
+                image = view.copy()
+            else:
+                np.copyto(image, view)
+            # Overwritten while copying: take the next one
+            if self._ring.seqs[seq % self._ring.slots] == seq:
+                return True, image
+
+    def get(self, prop):
+        if self._ring is None:
+            return 0.0
+        width, height = self.size or (self._ring.frames.shape[2], self._ring.frames.shape[1])
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(height)
+        return 0.0
+
+    def set(self, prop, value):
+        # Resolution etc. are fixed by the producer
+        return False
+
+    def release(self):
+        if self._ring is not None:
+            self._ring.release()
+            self._ring = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish a camera on the shared-memory frame bus")
+    parser.add_argument("--camera", type=int, default=0)
+    parser.add_argument("--name", default=DEFAULT_NAME)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--slots", type=int, default=4)
+    args = parser.parse_args()
+
+    from cv_common.capture import negotiate
+
+    cap = cv2.VideoCapture(args.camera)
+    # MJPG and a one-frame driver queue (CV_CAPTURE_FOURCC / CV_CAPTURE_FPS)
+    negotiate(cap, args.width, args.height)
+    ok, frame = cap.read()
+    if not ok:
+        print("Error: Could not open camera")
+        return
+
+    producer = FrameBusProducer(args.name, frame.shape, args.slots)
+    # The dashboard stops the producer with terminate(): exit through the
+    # finally below so readers see the closed flag and the block is unlinked
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"Frame bus '{args.name}': {frame.shape[1]}x{frame.shape[0]}, {args.slots} slots (Ctrl+C to stop)")
+    frames, start = 0, time.monotonic()
+    try:
+        producer.write(frame)
+        while True:
+            slot = producer.begin()
+            ok, captured = cap.read(slot)
+            if not ok:
+                break
+            if not np.may_share_memory(captured, slot):
+                np.copyto(slot, captured)
+            producer.commit()
+            frames += 1
+            if frames % 300 == 0:
+                print(f"{frames} frames, {frames / (time.monotonic() - start):.1f} FPS", end="\r")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        producer.close()
+        cap.release()
+        print("\nFrame bus stopped")
+
+
+if __name__ == "__main__":
+    main()
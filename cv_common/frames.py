@@ -0,0 +1,51 @@
+"""
+Preallocated frame buffers for the camera loops
+
+Capture, mirror and BGR->RGB conversion all write into buffers that are
+allocated once, so the steady-state loop does no full-frame allocations
+for them.
+"""
+
+import cv2
+import numpy as np
+
+
+class FrameBuffers:
+    """Reusable raw/BGR/RGB buffers for one camera stream
+
+    `read()` returns the mirrored BGR frame to draw on and a read-only RGB
+    view of the same image for inference.
+    """
+
+    def __init__(self, mirror=True):
+        self.mirror = mirror
+        self.raw = None
+        self.bgr = None
+        self.rgb = None
+        self.rgb_view = None
+
+    def _allocate(self, shape):
+        self.bgr = np.empty(shape, dtype=np.uint8) if self.mirror else None
+        self.rgb = np.empty(shape, dtype=np.uint8)
+        self.rgb_view = self.rgb.view()
+        self.rgb_view.flags.writeable = False
+
+    def read(self, cap):
+        """Grab the next frame; returns (ok, bgr, rgb)"""
+        ok, self.raw = cap.read(self.raw)
+        if not ok:
+            return False, None, None
+        return (True,) + self.prepare(self.raw)
+
+    def prepare(self, frame):
+        """Mirror and colour-convert an already captured frame; returns (bgr, rgb)"""
+        if self.rgb is None or self.rgb.shape != frame.shape:
+            self._allocate(frame.shape)
+
+        if self.mirror:
+            cv2.flip(frame, 1, dst=self.bgr)
+            bgr = self.bgr
+        else:
+            bgr = frame
+        cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        return bgr, self.rgb_view
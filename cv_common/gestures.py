@@ -0,0 +1,208 @@
+"""
+Temporal hand gestures from a ring buffer of landmarks
+
+    detector = GestureDetector()
+    ...
+    gesture = detector.update(hand_landmarks, now)   # None when no hand
+    if gesture == "swipe_left": ...
+
+Detected gestures:
+    swipe_left / swipe_right / swipe_up / swipe_down   fast palm movement
+    pinch_drag                                        thumb-index pinch held while moving
+                                                      (the drag vector is in `detector.drag`)
+    circle_cw / circle_ccw                            index fingertip traces a loop
+    wave                                              open palm moving side to side
+
+The last `size` frames live in preallocated NumPy arrays, and every feature
+is computed vectorised over a fixed-length window, so each update costs
+the same however long the session runs. Distances are in hand sizes
+(wrist to middle-finger MCP), so thresholds don't depend on camera distance.
+Pass the frame's `aspect` (width / height): x is scaled by it on the way in,
+as in cv_common/pinch.py, so a horizontal swipe needs the same real motion
+as a vertical one (and `drag` is in fractions of the frame height).
+Directions are in image coordinates; the modules mirror their frames, so
+"left" is the user's left.
+"""
+
+import time
+
+import numpy as np
+
+from cv_common.dwell import Debouncer
+
+WRIST, THUMB_TIP, INDEX_TIP, MIDDLE_MCP = 0, 4, 8, 9
+PALM = [0, 5, 9, 13, 17]
+
+
+def landmarks_to_array(hand_landmarks, out=None):
+    """(21, 3) float32 array from a MediaPipe hand"""
+    if out is None:
+        out = np.empty((21, 3), dtype=np.float32)
+    for i, lm in enumerate(hand_landmarks.landmark):
+        out[i] = (lm.x, lm.y, lm.z)
+    return out
+
+
+class LandmarkHistory:
+    """Ring buffer of the last `size` hand poses and their timestamps"""
+
+    def __init__(self, size=48):
+        self.size = size
+        self.points = np.zeros((size, 21, 3), dtype=np.float32)
+        self.times = np.zeros(size, dtype=np.float64)
+        self.count = 0
+        self._index = 0
+
+    def push(self, points, now):
+        self.points[self._index] = points
+        self.commit(now)
+
+    def slot(self):
+        """Buffer row to fill in place before `commit(now)`"""
+        return self.points[self._index]
+
+    def commit(self, now):
+        self.times[self._index] = now
+        self._index = (self._index + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def clear(self):
+        self.count = 0
+
+    def latest(self):
+        return self.points[(self._index - 1) % self.size]
+
+    def window(self, seconds, now):
+        """(points, times) for frames in the last `seconds`, oldest first"""
+        order = (self._index - self.count + np.arange(self.count)) % self.size
+        times = self.times[order]
+        keep = order[times >= now - seconds]
+        return self.points[keep], self.times[keep]
+
+
+class GestureDetector:
+    """Swipe, pinch-drag, circle and wave detection for one hand"""
+
+    def __init__(self, size=48, cooldown=0.6, swipe_time=0.35, swipe_distance=1.6,
+                 pinch_ratio=0.35, drag_distance=0.6, circle_time=1.2, wave_time=1.2,
+                 wave_reversals=3, aspect=1.0, clock=time.monotonic):
+        self.history = LandmarkHistory(size)
+        self.aspect = aspect
+        self.cooldown = Debouncer(cooldown)
+        self.swipe_time = swipe_time
+        self.swipe_distance = swipe_distance
+        self.pinch_ratio = pinch_ratio
+        self.drag_distance = drag_distance
+        self.circle_time = circle_time
+        self.wave_time = wave_time
+        self.wave_reversals = wave_reversals
+        self.clock = clock
+        self.drag = None
+        self._pinch_start = None
+
+    def reset(self):
+        self.history.clear()
+        self.drag = None
+        self._pinch_start = None
+
+    def update(self, hand_landmarks, now=None):
+        """Add a frame (None = no hand); returns a gesture name or None"""
+        now = self.clock() if now is None else now
+        if hand_landmarks is None:
+            self.reset()
+            return None
+        slot = self.history.slot()
+        if isinstance(hand_landmarks, np.ndarray):
+            slot[:] = hand_landmarks
+        else:
+            landmarks_to_array(hand_landmarks, slot)
+        # Normalised x is relative to the width and y to the height: same units for both
+        slot[:, 0] *= self.aspect
+        self.history.commit(now)
+
+        gesture = self._pinch_drag(now)
+        if gesture is None and self._pinch_start is None:
+            gesture = self._swipe(now) or self._circle(now) or self._wave(now)
+        if gesture is None or gesture == "pinch_drag":
+            return gesture
+        if not self.cooldown.trigger(now):
+            return None
+        # Start the next gesture from a clean slate
+        self.history.clear()
+        return gesture
+
+    # ---------------------------
+    # Features
+    # ---------------------------
+    @staticmethod
+    def _scale(points):
+        return float(np.median(np.linalg.norm(points[:, MIDDLE_MCP, :2] - points[:, WRIST, :2], axis=1))) or 1e-6
+
+    def _pinch_drag(self, now):
+        current = self.history.latest()
+        scale = float(np.linalg.norm(current[MIDDLE_MCP, :2] - current[WRIST, :2])) or 1e-6
+        pinched = np.linalg.norm(current[THUMB_TIP, :2] - current[INDEX_TIP, :2]) / scale < self.pinch_ratio
+        if not pinched:
+            self._pinch_start = None
+            self.drag = None
+            return None
+        tip = current[INDEX_TIP, :2]
+        if self._pinch_start is None:
+            self._pinch_start = tip.copy()
+        self.drag = tuple(float(v) for v in tip - self._pinch_start)
+        if np.hypot(*self.drag) / scale >= self.drag_distance:
+            return "pinch_drag"
+        return None
+
+    def _swipe(self, now):
+        points, times = self.history.window(self.swipe_time, now)
+        if len(points) < 4 or times[-1] - times[0] < self.swipe_time * 0.5:
+            return None
+        palm = points[:, PALM, :2].mean(axis=1)
+        dx, dy = (palm[-1] - palm[0]) / self._scale(points)
+        if max(abs(dx), abs(dy)) < self.swipe_distance:
+            return None
+        # Mostly along one axis, and moving the same way throughout
+        steps = np.diff(palm, axis=0)
+        if abs(dx) > 2 * abs(dy) and np.mean(np.sign(steps[:, 0]) == np.sign(dx)) > 0.7:
+            return "swipe_right" if dx > 0 else "swipe_left"
+        if abs(dy) > 2 * abs(dx) and np.mean(np.sign(steps[:, 1]) == np.sign(dy)) > 0.7:
+            return "swipe_down" if dy > 0 else "swipe_up"
+        return None
+
+    def _circle(self, now):
+        points, times = self.history.window(self.circle_time, now)
+        if len(points) < 10:
+            return None
+        tip = points[:, INDEX_TIP, :2]
+        offsets = tip - tip.mean(axis=0)
+        radii = np.linalg.norm(offsets, axis=1)
+        radius = radii.mean()
+        if radius < 0.3 * self._scale(points) or radii.std() > 0.35 * radius:
+            return None
+        angles = np.unwrap(np.arctan2(offsets[:, 1], offsets[:, 0]))
+        turned = angles[-1] - angles[0]
+        if abs(turned) < 1.7 * np.pi:
+            return None
+        # Image y points down, so a positive angle change is clockwise on screen
+        return "circle_cw" if turned > 0 else "circle_ccw"
+
+    def _wave(self, now):
+        points, times = self.history.window(self.wave_time, now)
+        if len(points) < 8:
+            return None
+        x = points[:, PALM, 0].mean(axis=1)
+        scale = self._scale(points)
+        if (x.max() - x.min()) / scale < 0.8:
+            return None
+        # Count direction reversals, ignoring frame-to-frame jitter (< 2% of a hand)
+        steps = np.diff(x)
+        moving = steps[np.abs(steps) > 0.02 * scale]
+        reversals = np.count_nonzero(np.diff(np.sign(moving)) != 0)
+        if reversals < self.wave_reversals:
+            return None
+        # Open hand: fingertips well away from the wrist
+        fingertips = points[-1, [8, 12, 16, 20], :2]
+        if np.linalg.norm(fingertips - points[-1, WRIST, :2], axis=1).min() / scale < 1.2:
+            return None
+        return "wave"
@@ -0,0 +1,193 @@
+"""
+Shared MediaPipe Hands service used by every hand-tracking module
+
+Knobs (constructor argument, else environment variable, else default):
+    model_complexity   CV_HANDS_COMPLEXITY      0 = lite, 1 = full (default 1)
+    inference_width    CV_HANDS_INFERENCE_WIDTH width fed to MediaPipe, 0 = full frame
+    smoothing          CV_HANDS_SMOOTHING       1 = One-Euro filter every landmark (default 0)
+    lookahead_ms       CV_HANDS_LOOKAHEAD_MS    prediction for smoothed landmarks, "auto" =
+                                                measured pipeline latency (default auto)
+    stride             CV_INFERENCE_STRIDE      run MediaPipe on every Nth frame and return the
+                                                previous results in between (default 1)
+
+CV_HANDS_RECORD / CV_HANDS_REPLAY record results to, or replay them from, an
+.npz file instead of the camera (see cv_common/landmark_recorder.py).
+"""
+
+import os
+import time
+
+import cv2
+
+from cv_common import model_server
+from cv_common.filters import LandmarkFilterBank
+from cv_common.landmark_recorder import LandmarkRecorder, LandmarkReplay
+from cv_common.startup import LazyModule
+
+
+def _import_mediapipe():
+    from google.protobuf import symbol_database, message_factory
+
+    # Patch SymbolDatabase to include GetPrototype
+    if not hasattr(symbol_database.Default(), "GetPrototype"):
+        def get_prototype(self, descriptor):
+            return message_factory.MessageFactory().GetPrototype(descriptor)
+        symbol_database.Default().GetPrototype = get_prototype
+
+    import mediapipe as mp
+    return mp
+
+
+# MediaPipe (and its TensorFlow Lite runtime) is imported on first use, so
+# scripts can open the camera while it loads - see HandService.load()
+mediapipe = LazyModule(_import_mediapipe)
+mp_hands = LazyModule(lambda: mediapipe.solutions.hands)
+mp_drawing = LazyModule(lambda: mediapipe.solutions.drawing_utils)
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+class HandService:
+    """Thin wrapper around mp.solutions.hands.Hands
+
+    Frames can be downscaled to `inference_width` before inference. The aspect
+    ratio is kept, so MediaPipe's normalised landmarks map straight back onto
+    the full-resolution frame (use `to_pixels`). The input array is marked
+    read-only while MediaPipe runs so it is passed by reference, not copied.
+
+    With `smoothing` the returned landmarks are filtered in place (see
+    LandmarkFilterBank) and, by default, extrapolated by the measured
+    pipeline latency: the mean time between frames, which covers capture,
+    inference and drawing. Recordings always hold the raw landmarks.
+    """
+
+    def __init__(self, max_num_hands=2, model_complexity=None, min_detection_confidence=0.5,
+                 min_tracking_confidence=0.5, static_image_mode=False, inference_width=None,
+                 smoothing=None, lookahead_ms=None, stride=None):
+        if model_complexity is None:
+            model_complexity = _env_int("CV_HANDS_COMPLEXITY", 1)
+        if inference_width is None:
+            inference_width = _env_int("CV_HANDS_INFERENCE_WIDTH", 0)
+        if smoothing is None:
+            smoothing = os.environ.get("CV_HANDS_SMOOTHING", "0") == "1"
+        if lookahead_ms is None:
+            lookahead_ms = os.environ.get("CV_HANDS_LOOKAHEAD_MS", "auto")
+        if stride is None:
+            stride = _env_int("CV_INFERENCE_STRIDE", 1)
+
+        self.model_complexity = model_complexity
+        self.inference_width = inference_width
+        self.stride = max(1, stride)
+        self.latency_ms = 0.0
+        self.mean_latency_ms = 0.0
+        self.pipeline_latency_ms = 0.0
+        self.lookahead_ms = lookahead_ms if lookahead_ms == "auto" else float(lookahead_ms)
+        self._filters = LandmarkFilterBank(max_num_hands) if smoothing and not static_image_mode else None
+        self._last_call = None
+        self._last_results = None
+        self._calls = 0
+        self._small = None
+        options = dict(
+            static_image_mode=static_image_mode,
+            max_num_hands=max_num_hands,
+            model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+        )
+        replay = os.environ.get("CV_HANDS_REPLAY")
+        record = os.environ.get("CV_HANDS_RECORD")
+        self._recorder = LandmarkRecorder(record, max_num_hands) if record else None
+        if replay:
+            # Recorded results stand in for MediaPipe
+            loop = os.environ.get("CV_HANDS_REPLAY_LOOP", "1") == "1"
+            self._hands = LandmarkReplay(replay, loop=loop, fresh=self._filters is not None)
+            print(f"Replaying {len(self._hands)} frames of hand landmarks from {replay}")
+        elif model_server.enabled():
+            # Inference runs in the shared model server (CV_MODEL_SERVER=1)
+            self._hands = model_server.RemoteModel("hands", **options).load()
+        else:
+            self._hands = mp_hands.Hands(**options)
+
+    @classmethod
+    def load(cls, *args, **kwargs):
+        """Build the service on a background thread; returns a Future
+
+        Importing MediaPipe and building the graph takes longer than opening
+        the camera, so start this first and call `.result()` once the camera
+        is ready.
+        """
+        from cv_common import startup
+        return startup.background(cls, *args, **kwargs)
+
+    def _downscale(self, rgb):
+        h, w = rgb.shape[:2]
+        if not self.inference_width or w <= self.inference_width:
+            return rgb
+        size = (self.inference_width, round(h * self.inference_width / w))
+        if self._small is None or self._small.shape[1::-1] != size:
+            self._small = cv2.resize(rgb, size, interpolation=cv2.INTER_AREA)
+        else:
+            cv2.resize(rgb, size, dst=self._small, interpolation=cv2.INTER_AREA)
+        return self._small
+
+    def process(self, rgb):
+        """Run hand landmark detection on an RGB frame"""
+        self._calls += 1
+        if self._last_results is not None and (self._calls - 1) % self.stride:
+            return self._last_results
+        start = time.perf_counter()
+        image = self._downscale(rgb)
+        writeable = image.flags.writeable
+        image.flags.writeable = False
+        try:
+            results = self._hands.process(image)
+        finally:
+            image.flags.writeable = writeable
+
+        self.latency_ms = (time.perf_counter() - start) * 1000
+        if self._recorder is not None:
+            self._recorder.add(results)
+        self.mean_latency_ms = (self.latency_ms if self.mean_latency_ms == 0
+                                else 0.9 * self.mean_latency_ms + 0.1 * self.latency_ms)
+        if self._last_call is not None:
+            interval = (start - self._last_call) * 1000
+            self.pipeline_latency_ms = (interval if self.pipeline_latency_ms == 0
+                                        else 0.9 * self.pipeline_latency_ms + 0.1 * interval)
+        self._last_call = start
+        if self._filters is not None:
+            self._smooth(results, start)
+        self._last_results = results
+        return results
+
+    def _smooth(self, results, timestamp):
+        if self.lookahead_ms == "auto":
+            # Predicting much further ahead than this overshoots on direction changes
+            self._filters.lookahead = min(self.pipeline_latency_ms, 100.0) / 1000
+        else:
+            self._filters.lookahead = self.lookahead_ms / 1000
+        self._filters.apply(results, timestamp)
+
+    @property
+    def ended(self):
+        """True once a non-looping replay (CV_HANDS_REPLAY_LOOP=0) has run out"""
+        return getattr(self._hands, "ended", False)
+
+    def close(self):
+        self._hands.close()
+        if self._recorder is not None:
+            self._recorder.save()
+            self._recorder = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def to_pixels(landmark, width, height):
+    """Map a normalised landmark onto a frame of the given size"""
+    return int(landmark.x * width), int(landmark.y * height)
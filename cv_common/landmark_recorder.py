@@ -0,0 +1,207 @@
+"""
+Record MediaPipe hand results to a compact .npz file and replay them
+
+    CV_HANDS_RECORD=session.npz   HandService saves every result it produces
+    CV_HANDS_REPLAY=session.npz   HandService returns recorded results instead
+                                  of running MediaPipe (CV_HANDS_REPLAY_LOOP=0
+                                  stops at the end instead of looping; the
+                                  replay's `ended` is then set)
+
+File contents (np.savez_compressed):
+    landmarks    float16 (T, H, 21, 3)   x, y, z; NaN where no hand
+    handedness   int8    (T, H)          0 = Left, 1 = Right, 2 = unknown, -1 = no hand
+    scores       float16 (T, H)          handedness confidence
+    timestamps   float64 (T,)            seconds since recording started
+
+Replayed results have the same shape as MediaPipe's (multi_hand_landmarks,
+multi_handedness, .landmark[i].x ...), so game and gesture code runs
+unchanged and deterministically. The hand-tracking scripts, the games and
+volume control then read blank frames instead of the camera (see
+cv_common/capture.py) and stop once a non-looping replay has ended; they
+still draw a window, so they run at display speed. The thousands of frames
+per second are for code driven without one, like the benchmark's
+hands.replay_count_fingers case.
+"""
+
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Index 2 is for hands MediaPipe returned without a handedness entry
+LABELS = ("Left", "Right", "Unknown")
+UNKNOWN = 2
+
+
+class LandmarkRecorder:
+    """Accumulates hand results in growing arrays; `save()` writes the file"""
+
+    def __init__(self, path, max_hands=2, chunk=1024):
+        self.path = Path(path)
+        self.max_hands = max_hands
+        self._chunk = chunk
+        self._landmarks = np.full((chunk, max_hands, 21, 3), np.nan, dtype=np.float16)
+        self._handedness = np.full((chunk, max_hands), -1, dtype=np.int8)
+        self._scores = np.zeros((chunk, max_hands), dtype=np.float16)
+        self._timestamps = np.zeros(chunk, dtype=np.float64)
+        self._start = None
+        self.frames = 0
+
+    def _grow(self):
+        pad = self._chunk
+        self._landmarks = np.concatenate([self._landmarks, np.full((pad,) + self._landmarks.shape[1:], np.nan, np.float16)])
+        self._handedness = np.concatenate([self._handedness, np.full((pad, self.max_hands), -1, np.int8)])
+        self._scores = np.concatenate([self._scores, np.zeros((pad, self.max_hands), np.float16)])
+        self._timestamps = np.concatenate([self._timestamps, np.zeros(pad)])
+
+    def add(self, results, timestamp=None):
+        """Record one frame of hand results (hands beyond max_hands are dropped)"""
+        now = time.monotonic() if timestamp is None else timestamp
+        if self._start is None:
+            self._start = now
+        if self.frames == len(self._timestamps):
+            self._grow()
+
+        t = self.frames
+        self._timestamps[t] = now - self._start
+        if results.multi_hand_landmarks:
+            handedness = results.multi_handedness or []
+            for h, hand in enumerate(results.multi_hand_landmarks[:self.max_hands]):
+                self._landmarks[t, h] = [(lm.x, lm.y, lm.z) for lm in hand.landmark]
+                if h < len(handedness):
+                    classification = handedness[h].classification[0]
+                    label = classification.label
+                    self._handedness[t, h] = LABELS.index(label) if label in LABELS else UNKNOWN
+                    self._scores[t, h] = classification.score
+                else:
+                    self._handedness[t, h] = UNKNOWN
+        self.frames += 1
+
+    def save(self):
+        t = self.frames
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(self.path, landmarks=self._landmarks[:t], handedness=self._handedness[:t],
+                            scores=self._scores[:t], timestamps=self._timestamps[:t])
+        print(f"Saved {t} frames of hand landmarks to {self.path}")
+
+
+# ---------------------------
+# Replay
+# ---------------------------
+class _Landmark:
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y, z):
+        self.x, self.y, self.z = x, y, z
+
+    def HasField(self, name):
+        # mp_drawing checks visibility/presence, which hand landmarks don't carry
+        return False
+
+
+class _LandmarkList:
+    __slots__ = ("landmark",)
+
+    def __init__(self, points):
+        self.landmark = [_Landmark(float(x), float(y), float(z)) for x, y, z in points]
+
+
+class _Category:
+    __slots__ = ("index", "label", "score")
+
+    def __init__(self, index, label, score):
+        self.index, self.label, self.score = index, label, score
+
+
+class _Classification:
+    __slots__ = ("classification",)
+
+    def __init__(self, index, score):
+        self.classification = [_Category(index, LABELS[index], score)]
+
+
+class _Results:
+    __slots__ = ("multi_hand_landmarks", "multi_handedness")
+
+    def __init__(self, hands, handedness):
+        # MediaPipe uses None, not [], when there are no hands
+        self.multi_hand_landmarks = hands or None
+        self.multi_handedness = handedness or None
+
+
+def load_recording(path):
+    """(landmarks, handedness, scores, timestamps) arrays from a recording"""
+    with np.load(path) as data:
+        return data["landmarks"], data["handedness"], data["scores"], data["timestamps"]
+
+
+class LandmarkReplay:
+    """Drop-in for mp_hands.Hands that plays a recording back
+
+    All result objects are built up front, so `process()` is a list lookup.
+    Callers that modify the results in place (e.g. landmark smoothing) pass
+    `fresh=True` to get new objects on every call instead.
+    With `realtime=True` frames follow the recorded timestamps instead of
+    advancing one per call. Without `loop`, `ended` is set once the last
+    frame has been returned; later calls return no hands.
+    """
+
+    def __init__(self, path, loop=True, realtime=False, fresh=False):
+        self._landmarks, self._handedness, self._scores, timestamps = load_recording(path)
+        self.timestamps = timestamps
+        self.loop = loop
+        self.realtime = realtime
+        self.fresh = fresh
+        self.index = 0
+        self.ended = False
+        self._start = None
+        self._results = [None if fresh else self._build(t) for t in range(len(timestamps))]
+        self._empty = _Results([], [])
+
+    def _build(self, t):
+        hands, labels = [], []
+        for h in range(self._landmarks.shape[1]):
+            if self._handedness[t, h] < 0:
+                continue
+            hands.append(_LandmarkList(self._landmarks[t, h].astype(np.float32)))
+            labels.append(_Classification(int(self._handedness[t, h]), float(self._scores[t, h])))
+        return _Results(hands, labels)
+
+    def __len__(self):
+        return len(self._results)
+
+    def _next_index(self):
+        if not self.realtime:
+            index = self.index
+            self.index += 1
+            return index
+        now = time.monotonic()
+        if self._start is None:
+            self._start = now
+        duration = self.timestamps[-1] if len(self.timestamps) else 0.0
+        elapsed = now - self._start
+        if self.loop and duration > 0:
+            elapsed %= duration
+        elif elapsed > duration:
+            return len(self._results)
+        return int(np.searchsorted(self.timestamps, elapsed, side="right")) - 1
+
+    def process(self, image=None):
+        """Next recorded result; `image` is ignored"""
+        if not self._results:
+            self.ended = not self.loop
+            return self._empty
+        index = self._next_index()
+        if index >= len(self._results):
+            if not self.loop:
+                self.ended = True
+                return self._empty
+            index %= len(self._results)
+            self.index = index + 1
+        index = max(index, 0)
+        if not (self.loop or self.realtime) and index == len(self._results) - 1:
+            self.ended = True
+        return self._build(index) if self.fresh else self._results[index]
+
+    def close(self):
+        pass
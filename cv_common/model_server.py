@@ -0,0 +1,402 @@
+"""
+Shared model server
+
+One process holds the emotion model, YOLO and MediaPipe Hands, loaded on
+first request and evicted least-recently-used when the memory budget is
+exceeded. Modules talk to it over a local socket (a Unix socket, or a named
+pipe on Windows), so switching features or running two at once reuses the
+loaded weights instead of loading another copy per process.
+
+    python -m cv_common.model_server --budget-mb 4096     # or from the dashboard
+
+Modules use it when CV_MODEL_SERVER=1:
+    HandService          -> RemoteModel("hands", ...)
+    CV_EMOTION_BACKEND   -> "remote" (auto picks it when the server is enabled)
+    Tracking.py          -> RemoteModel("yolo", weights=...)
+
+Only the same user can connect: the socket is owner-only and connections
+must present the key in ~/.having_fun_cv/model_server.key (random, mode
+0600, created on first use) or CV_MODEL_SERVER_KEY.
+
+MediaPipe Hands keeps per-stream tracking state, so each client connection
+gets its own (small) Hands graph; emotion and YOLO models are shared.
+"""
+
+import argparse
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+from types import SimpleNamespace
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+KEY_PATH = Path.home() / ".having_fun_cv" / "model_server.key"
+
+
+def default_address():
+    address = os.environ.get("CV_MODEL_SERVER_ADDRESS")
+    if address:
+        return address
+    if sys.platform == "win32":
+        return r"\\.\pipe\having_fun_cv_models"
+    return str(Path.home() / ".having_fun_cv" / "model_server.sock")
+
+
+def authkey():
+    """Connection secret: CV_MODEL_SERVER_KEY, else a random per-user key file
+
+    Connections exchange pickles, so the key is what stops other users on the
+    machine from running code in the server. The file is created once, with
+    mode 0600, by whichever of server and client starts first.
+    """
+    key = os.environ.get("CV_MODEL_SERVER_KEY")
+    if key:
+        return key.encode()
+    if not KEY_PATH.exists():
+        KEY_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = KEY_PATH.with_name(f"{KEY_PATH.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(secrets.token_hex(32).encode())
+        try:
+            # link() fails if another process got there first; its key wins
+            os.link(tmp, KEY_PATH)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp)
+    return KEY_PATH.read_bytes().strip()
+
+
+def enabled():
+    return os.environ.get("CV_MODEL_SERVER", "0") == "1"
+
+
+def _rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        from cv_common.telemetry import _ResourceSampler
+        return _ResourceSampler._rss_mb()
+
+
+# ---------------------------
+# Loaders and runners (server side)
+# ---------------------------
+def _load_emotion(backend="auto"):
+    sys.path.insert(0, str(PROJECT_ROOT / "Emotion_detection"))
+    from emotion_backends import select_backend
+    return select_backend(backend).load()
+
+
+def _load_yolo(weights="yolov8n.pt"):
+    from ultralytics import YOLO
+    from cv_common import threads
+    threads.configure_torch()
+    return YOLO(weights)
+
+
+def _load_hands(**options):
+    from cv_common.hands import mp_hands
+    return mp_hands.Hands(**options)
+
+
+def _run_emotion(model, value, face=False, **kwargs):
+    return model.predict_face(value) if face else model.predict(value)
+
+
+def _run_yolo(model, frame, **kwargs):
+    return [r.cpu() for r in model(frame, **kwargs)]
+
+
+def _run_hands(model, rgb, **kwargs):
+    rgb.flags.writeable = False
+    results = model.process(rgb)
+    # Protobuf landmark lists pickle fine; the SolutionOutputs wrapper doesn't
+    return SimpleNamespace(multi_hand_landmarks=results.multi_hand_landmarks,
+                           multi_handedness=results.multi_handedness)
+
+
+MODELS = {
+    "emotion": (_load_emotion, _run_emotion),
+    "yolo": (_load_yolo, _run_yolo),
+    "hands": (_load_hands, _run_hands),
+}
+PER_CLIENT = {"hands"}
+
+
+class _Entry:
+    """One loaded model; closed once evicted and no call is using it"""
+
+    def __init__(self):
+        self.model = None
+        self.size_mb = 0.0
+        self.uses = 0
+        self.active = 0
+        self.retired = False
+        self.error = None
+        self.loaded = threading.Event()
+        self.lock = threading.Lock()
+
+    def close(self):
+        # Under the inference lock, so no call is half-way through the model
+        with self.lock:
+            close = getattr(self.model, "close", None)
+            if close is not None:
+                close()
+
+
+class ModelRegistry:
+    """Models loaded on demand, evicted LRU beyond `budget_mb`
+
+    Loading runs outside the registry lock: other clients keep using the
+    loaded models meanwhile, and clients asking for the model being loaded
+    wait for that one load. Calls hold their entry through `use()`; an entry
+    evicted while a call is running is closed when the last call finishes.
+    """
+
+    def __init__(self, budget_mb=4096):
+        self.budget_mb = budget_mb
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(kind, options, owner=None):
+        return (kind, tuple(sorted(options.items())), owner if kind in PER_CLIENT else None)
+
+    @contextmanager
+    def use(self, kind, options, owner=None):
+        """The loaded entry for `kind` and `options`, held for the `with` block"""
+        entry = self._acquire(kind, options, owner)
+        try:
+            yield entry
+        finally:
+            self._done(entry)
+
+    def _acquire(self, kind, options, owner):
+        if kind not in MODELS:
+            raise ValueError(f"Unknown model {kind!r}; choose from {', '.join(MODELS)}")
+        key = self.key(kind, options, owner)
+        with self._lock:
+            entry = self._entries.get(key)
+            loading = entry is None
+            if loading:
+                entry = self._entries[key] = _Entry()
+            else:
+                self._entries.move_to_end(key)
+            entry.uses += 1
+            entry.active += 1
+        if loading:
+            self._load(key, entry, kind, options)
+        else:
+            entry.loaded.wait()
+        if entry.error is not None:
+            self._done(entry)
+            raise entry.error
+        return entry
+
+    def _load(self, key, entry, kind, options):
+        closing = []
+        try:
+            before = _rss_mb()
+            start = time.perf_counter()
+            entry.model = MODELS[kind][0](**options)
+            entry.size_mb = max(_rss_mb() - before, 0.0)
+            print(f"Loaded {kind} {options or ''} in {(time.perf_counter() - start) * 1000:.0f} ms "
+                  f"(~{entry.size_mb:.0f} MB)")
+            with self._lock:
+                closing = self._evict(keep=key)
+        except Exception as e:
+            # Waiting clients get the same error; the next request tries again
+            entry.error = e
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+        finally:
+            entry.loaded.set()
+        for evicted in closing:
+            evicted.close()
+
+    def _done(self, entry):
+        with self._lock:
+            entry.active -= 1
+            close = entry.retired and entry.active == 0 and entry.error is None
+        if close:
+            entry.close()
+
+    def _retire(self, key):
+        """Remove an entry (registry lock held); returns it if it can be closed right away"""
+        entry = self._entries.pop(key)
+        entry.retired = True
+        return entry if entry.active == 0 and entry.loaded.is_set() else None
+
+    def _evict(self, keep):
+        closing = []
+        while self.used_mb() > self.budget_mb:
+            key = next((k for k, e in self._entries.items() if k != keep and e.loaded.is_set()), None)
+            if key is None:
+                break
+            print(f"Evicted {key[0]} (~{self._entries[key].size_mb:.0f} MB) to stay under {self.budget_mb} MB")
+            closing.append(self._retire(key))
+        return [entry for entry in closing if entry is not None]
+
+    def release(self, owner):
+        """Drop the per-client models of a disconnected client"""
+        with self._lock:
+            closing = [self._retire(k) for k in [k for k in self._entries if k[2] == owner]]
+        for entry in closing:
+            if entry is not None:
+                entry.close()
+
+    def used_mb(self):
+        return sum(entry.size_mb for entry in self._entries.values())
+
+    def stats(self):
+        with self._lock:
+            return [{"model": k[0], "options": dict(k[1]), "size_mb": round(e.size_mb, 1), "uses": e.uses}
+                    for k, e in self._entries.items()]
+
+
+# ---------------------------
+# Server
+# ---------------------------
+def _serve_client(conn, registry, owner):
+    try:
+        while True:
+            try:
+                op, kind, options, args, kwargs = conn.recv()
+            except EOFError:
+                break
+            try:
+                if op == "load":
+                    with registry.use(kind, options, owner) as entry:
+                        reply = round(entry.size_mb, 1)
+                elif op == "infer":
+                    with registry.use(kind, options, owner) as entry, entry.lock:
+                        reply = MODELS[kind][1](entry.model, *args, **kwargs)
+                elif op == "stats":
+                    reply = {"budget_mb": registry.budget_mb, "used_mb": round(registry.used_mb(), 1),
+                             "models": registry.stats()}
+                else:
+                    raise ValueError(f"Unknown op {op!r}")
+                conn.send(("ok", reply))
+            except Exception as e:
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        registry.release(owner)
+        conn.close()
+
+
+def serve(address=None, budget_mb=4096):
+    address = address or default_address()
+    if not address.startswith("\\\\"):
+        Path(address).parent.mkdir(parents=True, exist_ok=True)
+        if os.path.exists(address):
+            os.remove(address)
+
+    # The server itself must load models locally
+    os.environ.pop("CV_MODEL_SERVER", None)
+    registry = ModelRegistry(budget_mb)
+    unix_socket = not address.startswith("\\\\")
+    # Owner-only socket from the moment it is bound
+    umask = os.umask(0o177) if unix_socket else None
+    try:
+        listener = Listener(address, authkey=authkey())
+    finally:
+        if umask is not None:
+            os.umask(umask)
+    with listener:
+        print(f"Model server listening on {address} (budget {budget_mb} MB)")
+        client_id = 0
+        while True:
+            conn = listener.accept()
+            client_id += 1
+            threading.Thread(target=_serve_client, args=(conn, registry, client_id),
+                             name=f"model-client-{client_id}", daemon=True).start()
+
+
+# ---------------------------
+# Client
+# ---------------------------
+class ModelClient:
+    """Connection to the model server; safe to share between threads"""
+
+    def __init__(self, address=None):
+        self._conn = Client(address or default_address(), authkey=authkey())
+        self._lock = threading.Lock()
+
+    def call(self, op, kind=None, options=None, args=(), kwargs=None):
+        with self._lock:
+            self._conn.send((op, kind, options or {}, args, kwargs or {}))
+            status, reply = self._conn.recv()
+        if status == "error":
+            raise RuntimeError(f"Model server: {reply}")
+        return reply
+
+    def stats(self):
+        return self.call("stats")
+
+    def close(self):
+        self._conn.close()
+
+
+class RemoteModel:
+    """Stand-in for a model held by the server
+
+    Mirrors the calls the modules make: `predict(batch)` / `predict_face(face)`
+    (emotion backends),
+    `model(frame, **kwargs)` (YOLO) and `process(rgb)` (MediaPipe Hands).
+    """
+
+    def __init__(self, kind, client=None, **options):
+        self.kind = kind
+        self.name = f"remote-{kind}"
+        self.options = options
+        self._client = client or ModelClient()
+
+    def load(self):
+        self._client.call("load", self.kind, self.options)
+        return self
+
+    def _infer(self, value, **kwargs):
+        return self._client.call("infer", self.kind, self.options, (value,), kwargs)
+
+    def predict(self, batch):
+        return self._infer(batch)
+
+    def predict_face(self, face):
+        return self._infer(face, face=True)
+
+    def __call__(self, frame, **kwargs):
+        return self._infer(frame, **kwargs)
+
+    def process(self, rgb):
+        return self._infer(rgb)
+
+    def close(self):
+        self._client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared model server")
+    parser.add_argument("--address", default=None, help="socket path / pipe name")
+    parser.add_argument("--budget-mb", type=float,
+                        default=float(os.environ.get("CV_MODEL_SERVER_BUDGET_MB", 4096)))
+    args = parser.parse_args()
+    # One process serves every module: its models share the one budget
+    from cv_common import threads
+    threads.apply()
+    try:
+        serve(args.address, args.budget_mb)
+    except KeyboardInterrupt:
+        print("\nModel server stopped")
+
+
+if __name__ == "__main__":
+    main()
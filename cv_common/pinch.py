@@ -0,0 +1,90 @@
+"""
+Scale-invariant pinch measurement for MediaPipe hand landmarks
+
+The thumb-index distance is measured in normalised landmark space and divided
+by the wrist -> middle-MCP length, so the value stays the same whether the
+hand is 30 cm or 2 m from the camera.
+"""
+
+import json
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+WRIST = 0
+THUMB_TIP = 4
+INDEX_FINGER_TIP = 8
+MIDDLE_FINGER_MCP = 9
+
+
+def _point(landmark, aspect, use_z):
+    # Normalised x is relative to the width and y to the height; scale x so
+    # both axes are in the same units before taking distances
+    return np.array([landmark.x * aspect, landmark.y, landmark.z * aspect if use_z else 0.0])
+
+
+def pinch_ratio(hand_landmarks, aspect=1.0, use_z=False):
+    """Thumb-index tip distance relative to the hand size"""
+    lm = hand_landmarks.landmark
+    thumb = _point(lm[THUMB_TIP], aspect, use_z)
+    index = _point(lm[INDEX_FINGER_TIP], aspect, use_z)
+    wrist = _point(lm[WRIST], aspect, use_z)
+    middle_mcp = _point(lm[MIDDLE_FINGER_MCP], aspect, use_z)
+
+    hand_size = np.linalg.norm(middle_mcp - wrist)
+    if hand_size < 1e-6:
+        return None
+    return float(np.linalg.norm(index - thumb) / hand_size)
+
+
+class PinchCalibrator:
+    """Per-user mapping from pinch ratio to [0, 1]
+
+    Keeps a window of recent ratios and uses its 5th/95th percentiles as the
+    closed/open pinch, so the full range is reachable with the user's own
+    hand. The range only moves once the window spans at least `min_span`,
+    so holding still at one volume doesn't collapse it.
+    """
+
+    def __init__(self, low=0.15, high=1.1, window=300, min_span=0.3, dead_zone=0.05):
+        self.low = low
+        self.high = high
+        self.min_span = min_span
+        self.dead_zone = dead_zone
+        self._samples = deque(maxlen=window)
+
+    def update(self, ratio):
+        """Add a sample and refresh the calibrated range"""
+        self._samples.append(ratio)
+        if len(self._samples) < self._samples.maxlen // 4:
+            return
+        low, high = np.percentile(self._samples, [5, 95])
+        if high - low >= self.min_span:
+            self.low, self.high = float(low), float(high)
+
+    def normalize(self, ratio):
+        """Map a ratio to [0, 1], snapping to the ends inside the dead zone"""
+        value = (ratio - self.low) / (self.high - self.low)
+        value = (value - self.dead_zone) / (1 - 2 * self.dead_zone)
+        return min(1.0, max(0.0, value))
+
+    def load(self, path):
+        """Restore a saved range if the file exists; a broken file keeps the defaults"""
+        path = Path(path)
+        if not path.exists():
+            return
+        try:
+            data = json.loads(path.read_text())
+            low, high = float(data["low"]), float(data["high"])
+            if not low < high:
+                raise ValueError(f"empty range {low}..{high}")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠ Ignoring pinch calibration {path} ({e}); using the default range")
+            return
+        self.low, self.high = low, high
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"low": self.low, "high": self.high}))
@@ -0,0 +1,133 @@
+"""
+Performance profiles: one switch for resolution, model sizes, stride and render rate
+
+    CV_PROFILE=low|balanced|high|auto python pose_detection/hand_tracking.py
+    (or the dashboard's Performance profile box)
+
+                        low                balanced       high
+    capture             640x360 @ 15 FPS   1280x720       1920x1080
+    YOLO weights        yolov8n.pt         yolov8n.pt     yolov8s.pt
+    MediaPipe hands     lite               full           full
+    emotion backend     tflite (if built)  auto           auto
+    inference stride    every 2nd frame    every frame    every frame
+    render rate         every 2nd frame    every frame    every frame
+
+A profile only fills in the CV_* variables that aren't set already, so
+`CV_PROFILE=low CV_YOLO_WEIGHTS=yolov8s.pt` is the low profile with the
+larger YOLO. Without CV_PROFILE every module keeps its own defaults.
+
+`auto` times a short OpenCV + matrix-multiply workload (about a quarter of
+a second) and picks a profile from it. The choice is cached per machine in
+~/.having_fun_cv/profile.json; delete the file to measure again.
+
+The games lay out their boards for 1280x720, so they keep that capture size
+in every profile.
+"""
+
+import json
+import os
+import platform
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+PROFILES = {
+    "low": {
+        "CV_CAPTURE_WIDTH": "640", "CV_CAPTURE_HEIGHT": "360", "CV_CAPTURE_FPS": "15",
+        "CV_YOLO_WEIGHTS": "yolov8n.pt", "CV_HANDS_COMPLEXITY": "0", "CV_EMOTION_BACKEND": "tflite",
+        "CV_INFERENCE_STRIDE": "2", "CV_RENDER_EVERY": "2",
+        # Combined mode: its per-stage schedules play the part of the stride
+        "CV_SCHEDULE_YOLO": "every:4", "CV_SCHEDULE_HANDS": "every:2",
+    },
+    "balanced": {
+        "CV_CAPTURE_WIDTH": "1280", "CV_CAPTURE_HEIGHT": "720",
+        "CV_YOLO_WEIGHTS": "yolov8n.pt", "CV_HANDS_COMPLEXITY": "1", "CV_EMOTION_BACKEND": "auto",
+        "CV_INFERENCE_STRIDE": "1", "CV_RENDER_EVERY": "1",
+    },
+    "high": {
+        "CV_CAPTURE_WIDTH": "1920", "CV_CAPTURE_HEIGHT": "1080",
+        "CV_YOLO_WEIGHTS": "yolov8s.pt", "CV_HANDS_COMPLEXITY": "1", "CV_EMOTION_BACKEND": "auto",
+        "CV_INFERENCE_STRIDE": "1", "CV_RENDER_EVERY": "1",
+    },
+}
+
+# Milliseconds per measure() iteration: faster than HIGH_MS -> high, slower than LOW_MS -> low
+HIGH_MS = 1.5
+LOW_MS = 5.0
+
+CACHE = Path.home() / ".having_fun_cv" / "profile.json"
+_TFLITE_MODEL = Path(__file__).resolve().parent.parent / "Emotion_detection" / "best_model.tflite"
+
+
+def settings(name):
+    """The CV_* variables profile `name` sets"""
+    values = dict(PROFILES[name])
+    # The light backend only exists once converted; otherwise let auto choose
+    if values.get("CV_EMOTION_BACKEND") == "tflite" and not _TFLITE_MODEL.exists():
+        values["CV_EMOTION_BACKEND"] = "auto"
+    return values
+
+
+def measure(duration=0.25):
+    """Mean milliseconds of a small frame-processing + GEMM workload"""
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, (480, 640, 3), dtype=np.uint8)
+    # About the size of one MobileNet pointwise convolution
+    a = rng.standard_normal((256, 1152)).astype(np.float32)
+    b = rng.standard_normal((1152, 256)).astype(np.float32)
+    iterations, start = 0, time.perf_counter()
+    while iterations < 3 or time.perf_counter() - start < duration:
+        small = cv2.resize(frame, (320, 240), interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        cv2.GaussianBlur(frame, (9, 9), 0)
+        a @ b
+        iterations += 1
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def pick(ms):
+    if ms < HIGH_MS:
+        return "high"
+    if ms > LOW_MS:
+        return "low"
+    return "balanced"
+
+
+def auto():
+    """(profile, ms) for this machine, measured once and cached"""
+    machine = f"{platform.node()}/{platform.machine()}/{os.cpu_count()}"
+    try:
+        cached = json.loads(CACHE.read_text())
+        if cached.get("machine") == machine and cached.get("profile") in PROFILES:
+            return cached["profile"], cached["ms"]
+    except (OSError, ValueError):
+        pass
+    ms = measure()
+    name = pick(ms)
+    try:
+        CACHE.parent.mkdir(parents=True, exist_ok=True)
+        CACHE.write_text(json.dumps({"machine": machine, "profile": name, "ms": round(ms, 3),
+                                     "ts": time.time()}))
+    except OSError:
+        pass
+    return name, ms
+
+
+def apply(name=None, verbose=True):
+    """Fill in the CV_* defaults of profile `name` (default CV_PROFILE); returns its name or None"""
+    name = (name or os.environ.get("CV_PROFILE", "")).strip().lower()
+    if not name:
+        return None
+    detail = ""
+    if name == "auto":
+        name, ms = auto()
+        detail = f" (auto, {ms:.2f} ms benchmark)"
+    if name not in PROFILES:
+        raise ValueError(f"Unknown profile {name!r}; choose from {', '.join(PROFILES)} or auto")
+    for key, value in settings(name).items():
+        os.environ.setdefault(key, value)
+    if verbose:
+        print(f"Profile: {name}{detail}")
+    return name
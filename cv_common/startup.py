@@ -0,0 +1,172 @@
+"""
+Startup helpers: lazy imports, concurrent initialisation and time-to-first-frame
+
+The heavy frameworks (MediaPipe, TensorFlow, Ultralytics/torch) are only
+imported on first use, on a background thread while the camera opens.
+Knobs:
+
+    CV_PROFILE_IMPORTS=1   print where import time went (summarised like -X importtime;
+                           only imports after this module is loaded are counted)
+    CV_LAUNCH_TS           wall-clock launch time, set by the dashboard so the
+                           time-to-first-frame includes interpreter start-up
+
+Telemetry.frame() calls `first_frame()` after the first frame is shown; the
+time-to-first-frame is printed and appended to ~/.having_fun_cv/startup.jsonl,
+which the dashboard reads back.
+"""
+
+import builtins
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+STARTUP_LOG = Path.home() / ".having_fun_cv" / "startup.jsonl"
+
+
+def _process_start():
+    launch = os.environ.get("CV_LAUNCH_TS")
+    if launch:
+        return float(launch)
+    try:
+        import psutil
+        return psutil.Process().create_time()
+    except Exception:
+        return time.time()
+
+
+_START = _process_start()
+_phases = {}
+_reported = False
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup")
+
+
+# ---------------------------
+# Import profiling
+# ---------------------------
+class ImportProfiler:
+    """Self time of first-time imports, grouped by top-level package"""
+
+    def __init__(self):
+        self.self_times = {}
+        self._local = threading.local()
+        self._original = None
+
+    def install(self):
+        self._original = original = builtins.__import__
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules:
+                return original(name, globals, locals, fromlist, level)
+            stack = getattr(self._local, "stack", None)
+            if stack is None:
+                stack = self._local.stack = []
+            stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                elapsed = time.perf_counter() - start
+                children = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                top = name.partition(".")[0]
+                self.self_times[top] = self.self_times.get(top, 0.0) + elapsed - children
+
+        builtins.__import__ = timed_import
+
+    def uninstall(self):
+        if self._original is not None:
+            builtins.__import__ = self._original
+            self._original = None
+
+    def summary(self, top=12):
+        """[(package, ms)] sorted by self time"""
+        items = sorted(self.self_times.items(), key=lambda kv: kv[1], reverse=True)
+        return [(name, round(seconds * 1000, 1)) for name, seconds in items[:top]]
+
+
+profiler = None
+if os.environ.get("CV_PROFILE_IMPORTS", "0") == "1":
+    profiler = ImportProfiler()
+    profiler.install()
+
+
+# ---------------------------
+# Lazy modules and concurrent init
+# ---------------------------
+class LazyModule:
+    """Proxy that runs `loader()` on first attribute access"""
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._module is None:
+                self._module = self._loader()
+        return self._module
+
+    def __getattr__(self, name):
+        return getattr(self._module or self._load(), name)
+
+
+def background(fn, *args, **kwargs):
+    """Run `fn` on the startup pool; returns a Future"""
+    return _executor.submit(fn, *args, **kwargs)
+
+
+def mark(phase):
+    """Record that a start-up phase finished now"""
+    _phases[phase] = round((time.time() - _START) * 1000, 1)
+
+
+def first_frame(module, telemetry=None):
+    """Report time-to-first-frame once, with phases and the import profile"""
+    global _reported
+    if _reported:
+        return
+    _reported = True
+
+    ttff_ms = round((time.time() - _START) * 1000, 1)
+    record = {"ts": time.time(), "module": module, "ttff_ms": ttff_ms, "phases": dict(_phases)}
+    phases = ", ".join(f"{name} @ {ms:.0f} ms" for name, ms in _phases.items())
+    print(f"⏱ Time to first frame: {ttff_ms:.0f} ms" + (f" ({phases})" if phases else ""))
+
+    if profiler is not None:
+        profiler.uninstall()
+        record["imports"] = profiler.summary()
+        print("⏱ Import self time by package:")
+        for name, ms in record["imports"]:
+            print(f"    {ms:8.1f} ms  {name}")
+
+    if telemetry is not None:
+        telemetry.set_gauge("time_to_first_frame_ms", ttff_ms)
+
+    try:
+        STARTUP_LOG.parent.mkdir(parents=True, exist_ok=True)
+        with open(STARTUP_LOG, "a") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        print(f"⚠ Could not write {STARTUP_LOG}: {e}")
+
+
+def last_record(module):
+    """Most recent start-up record for a module, or None"""
+    if not STARTUP_LOG.exists():
+        return None
+    latest = None
+    with open(STARTUP_LOG) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("module") == module:
+                latest = record
+    return latest
@@ -0,0 +1,301 @@
+"""
+Lightweight FPS, per-stage latency and resource telemetry
+
+    telemetry = Telemetry("hand_tracking")
+    while True:
+        with telemetry.stage("capture"):
+            ret, frame = cap.read()
+        ...
+        telemetry.frame()            # once per loop iteration
+        telemetry.draw_hud(frame)    # no-op unless the HUD is on ('h' toggles)
+
+Latencies live in fixed-size ring buffers, so memory is constant however long
+a module runs. Exports are configured from the environment:
+    CV_TELEMETRY_HUD=1         start with the on-frame HUD visible
+    CV_TELEMETRY_JSONL=path    append one JSON record per report interval
+    CV_TELEMETRY_PORT=9100     serve Prometheus text format on 127.0.0.1:port/metrics
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+from cv_common import startup
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+class RingStats:
+    """Fixed-size ring buffer of samples with rolling percentiles"""
+
+    def __init__(self, size=256):
+        self._values = np.zeros(size, dtype=np.float64)
+        self._index = 0
+        self.count = 0
+
+    def add(self, value):
+        self._values[self._index] = value
+        self._index = (self._index + 1) % len(self._values)
+        self.count += 1
+
+    def samples(self):
+        return self._values[:min(self.count, len(self._values))]
+
+    def percentiles(self, q=(50, 95)):
+        values = self.samples()
+        if len(values) == 0:
+            return [0.0] * len(q)
+        return [float(v) for v in np.percentile(values, q)]
+
+    def mean(self):
+        values = self.samples()
+        return float(values.mean()) if len(values) else 0.0
+
+
+class _ResourceSampler:
+    """Process CPU % and RSS, via psutil when installed"""
+
+    def __init__(self):
+        self._process = psutil.Process() if psutil is not None else None
+        if self._process is not None:
+            self._process.cpu_percent(None)
+        self._last_wall = time.monotonic()
+        self._last_cpu = sum(os.times()[:2])
+
+    def sample(self):
+        if self._process is not None:
+            return self._process.cpu_percent(None), self._process.memory_info().rss / 2**20
+
+        wall, cpu = time.monotonic(), sum(os.times()[:2])
+        elapsed = wall - self._last_wall
+        cpu_percent = 100.0 * (cpu - self._last_cpu) / elapsed if elapsed > 0 else 0.0
+        self._last_wall, self._last_cpu = wall, cpu
+        return cpu_percent, self._rss_mb()
+
+    @staticmethod
+    def _rss_mb():
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+        except (OSError, ValueError, AttributeError):
+            pass
+        try:
+            import resource
+            # Peak RSS (KiB on Linux) - the best we can do without psutil
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        except ImportError:
+            return 0.0
+
+
+class Telemetry:
+    """Per-module collector for FPS, stage latencies and resource use"""
+
+    def __init__(self, module, window=256, report_interval=1.0, hud=None,
+                 jsonl_path=None, prometheus_port=None):
+        self.module = module
+        self.window = window
+        self.report_interval = report_interval
+        self.stages = {}
+        self.counters = {}
+        self.gauges = {}
+        self.frames = 0
+        self.cpu_percent = 0.0
+        self.rss_mb = 0.0
+        self.hud = os.environ.get("CV_TELEMETRY_HUD", "0") == "1" if hud is None else hud
+
+        self._frame_times = RingStats(window)
+        self._last_frame = None
+        self._last_report = time.monotonic()
+        self._resources = _ResourceSampler()
+
+        jsonl_path = jsonl_path or os.environ.get("CV_TELEMETRY_JSONL")
+        self._jsonl = open(jsonl_path, "a", buffering=1) if jsonl_path else None
+
+        port = prometheus_port or os.environ.get("CV_TELEMETRY_PORT")
+        self._server = self._start_prometheus(int(port)) if port else None
+
+    # ---------------------------
+    # Recording
+    # ---------------------------
+    def record(self, stage, ms):
+        """Add one latency sample (milliseconds) for a stage"""
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = RingStats(self.window)
+        stats.add(ms)
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as one sample of `name`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def start(self):
+        """Start a manual timer for stages that don't fit in a with-block"""
+        return time.perf_counter()
+
+    def stop(self, name, start):
+        """Record the time since `start()` as one sample of `name`"""
+        self.record(name, (time.perf_counter() - start) * 1000)
+
+    def timed(self, name):
+        """Decorator form of stage()"""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name, n=1):
+        """Increment a free-form counter (dropped frames, detections, ...)"""
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def set_gauge(self, name, value):
+        """Set a point-in-time value (time to first frame, queue depth, ...)"""
+        self.gauges[name] = value
+
+    def frame(self):
+        """Mark the end of a loop iteration; exports when a report is due"""
+        now = time.monotonic()
+        if self._last_frame is not None:
+            self._frame_times.add(now - self._last_frame)
+        self._last_frame = now
+        self.frames += 1
+        if self.frames == 1:
+            startup.first_frame(self.module, self)
+
+        if now - self._last_report >= self.report_interval:
+            self._last_report = now
+            self.cpu_percent, self.rss_mb = self._resources.sample()
+            if self._jsonl is not None:
+                self._jsonl.write(json.dumps(self.snapshot()) + "\n")
+
+    # ---------------------------
+    # Reporting
+    # ---------------------------
+    @property
+    def fps(self):
+        mean = self._frame_times.mean()
+        return 1.0 / mean if mean > 0 else 0.0
+
+    def snapshot(self):
+        """Current metrics as a plain dict"""
+        stages = {}
+        for name, stats in list(self.stages.items()):
+            p50, p95 = stats.percentiles()
+            stages[name] = {"p50_ms": round(p50, 3), "p95_ms": round(p95, 3),
+                            "mean_ms": round(stats.mean(), 3)}
+        return {
+            "ts": time.time(),
+            "module": self.module,
+            "frames": self.frames,
+            "fps": round(self.fps, 2),
+            "cpu_percent": round(self.cpu_percent, 1),
+            "rss_mb": round(self.rss_mb, 1),
+            "stages": stages,
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+        }
+
+    def prometheus_text(self):
+        """Current metrics in Prometheus text exposition format"""
+        snap = self.snapshot()
+        label = f'module="{self.module}"'
+        lines = [
+            "# TYPE cv_fps gauge", f"cv_fps{{{label}}} {snap['fps']}",
+            "# TYPE cv_frames_total counter", f"cv_frames_total{{{label}}} {snap['frames']}",
+            "# TYPE cv_cpu_percent gauge", f"cv_cpu_percent{{{label}}} {snap['cpu_percent']}",
+            "# TYPE cv_rss_megabytes gauge", f"cv_rss_megabytes{{{label}}} {snap['rss_mb']}",
+            "# TYPE cv_stage_latency_ms summary",
+        ]
+        for name, stats in snap["stages"].items():
+            stage = f'{label},stage="{name}"'
+            lines.append(f'cv_stage_latency_ms{{{stage},quantile="0.5"}} {stats["p50_ms"]}')
+            lines.append(f'cv_stage_latency_ms{{{stage},quantile="0.95"}} {stats["p95_ms"]}')
+        if snap["counters"]:
+            lines.append("# TYPE cv_events_total counter")
+            for name, value in snap["counters"].items():
+                lines.append(f'cv_events_total{{{label},event="{name}"}} {value}')
+        for name, value in snap["gauges"].items():
+            lines.append(f"# TYPE cv_{name} gauge")
+            lines.append(f"cv_{name}{{{label}}} {value}")
+        return "\n".join(lines) + "\n"
+
+    def _start_prometheus(self, port):
+        telemetry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = telemetry.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        except OSError as e:
+            print(f"⚠ Could not start metrics endpoint on port {port}: {e}")
+            return None
+        threading.Thread(target=server.serve_forever, name="telemetry-http", daemon=True).start()
+        print(f"Metrics: http://127.0.0.1:{port}/metrics")
+        return server
+
+    # ---------------------------
+    # HUD
+    # ---------------------------
+    def handle_key(self, key):
+        """Toggle the HUD on 'h'; returns True if the key was consumed"""
+        if key == ord('h'):
+            self.hud = not self.hud
+            return True
+        return False
+
+    def draw_hud(self, frame):
+        """Overlay FPS, stage latencies and resources in the top-right corner"""
+        if not self.hud:
+            return
+        lines = [f"{self.fps:5.1f} FPS  CPU {self.cpu_percent:4.0f}%  RSS {self.rss_mb:5.0f} MB"]
+        for name, stats in list(self.stages.items()):
+            p50, p95 = stats.percentiles()
+            lines.append(f"{name:<12} p50 {p50:6.1f}  p95 {p95:6.1f} ms")
+
+        width, line_height = 380, 20
+        # Frames narrower than the panel (low profile, tiles) get it from the left edge
+        x = max(0, frame.shape[1] - width - 10)
+        y = 10
+        roi = frame[y:y + line_height * len(lines) + 10, x:x + width]
+        roi //= 3
+        for i, line in enumerate(lines):
+            cv2.putText(frame, line, (x + 8, y + 18 + i * line_height),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 255), 1)
+
+    def close(self):
+        if self._jsonl is not None:
+            self._jsonl.close()
+            self._jsonl = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
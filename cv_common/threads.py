@@ -0,0 +1,173 @@
+"""
+Thread budget: how many cores each framework in a process may keep busy
+
+Left alone, every framework sizes its thread pools to the whole machine:
+OpenCV, torch (intra- and inter-op pools), TensorFlow, TFLite and the
+OpenMP/MKL/OpenBLAS runtimes underneath them. With YOLO and the emotion
+model in one process, or two modules launched from the dashboard, that is
+several times more busy threads than cores, and they spend their time
+being switched out and waiting on each other at every parallel region.
+
+    threads.apply()                                  at start-up, before the models load
+    threads.apply(weights={"torch": 2, "tensorflow": 1, "mediapipe": 1})
+
+    CV_CORE_BUDGET    cores this process may use (default: all it may run on)
+    CV_CPU_AFFINITY   pin the process to these cores, e.g. "0-3" or "0,2,4,6";
+                      the budget then defaults to their number
+
+`apply()` sets the OMP/MKL/OpenBLAS/TF environment variables (read when
+torch and TensorFlow are imported, which the modules do lazily, after this)
+and cv2.setNumThreads. The loaders call `configure_torch()` and
+`configure_tensorflow()` right after importing the framework; TFLite takes
+`budget("tflite")` as its thread count. `weights` splits the budget between
+frameworks that run at the same time. MediaPipe has no thread setting, so a
+"mediapipe" weight only keeps cores free for it; pinning is what bounds it.
+
+NumPy's BLAS is already loaded by `import cv2`, so its pool keeps its size;
+the modules barely use it.
+"""
+
+import os
+
+import cv2
+
+_THREAD_ENV = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS",
+               "VECLIB_MAXIMUM_THREADS", "TF_NUM_INTRAOP_THREADS")
+# TFLite runs on TensorFlow's share unless given its own
+_ALIASES = {"tflite": "tensorflow"}
+
+_budget = None
+_shares = {}
+_cores = None
+
+
+def available_cores():
+    """Cores this process may currently run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def parse_cores(spec):
+    """"0-3,6" -> [0, 1, 2, 3, 6]"""
+    cores = []
+    for part in str(spec).replace(" ", "").split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        cores.extend(range(int(first), int(last or first) + 1))
+    return sorted(set(cores))
+
+
+def format_cores(cores):
+    """[0, 1, 2, 3, 6] -> "0-3,6\""""
+    parts = []
+    for core in sorted(cores):
+        if parts and core == parts[-1][1] + 1:
+            parts[-1][1] = core
+        else:
+            parts.append([core, core])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in parts)
+
+
+def partition(cores, n):
+    """Split `cores` into n contiguous groups (neighbouring cores share caches)"""
+    n = max(1, min(n, len(cores)))
+    size, extra = divmod(len(cores), n)
+    groups, start = [], 0
+    for i in range(n):
+        end = start + size + (i < extra)
+        groups.append(cores[start:end])
+        start = end
+    return groups
+
+
+def child_env(cores):
+    """Environment variables that give a child process `cores` and nothing else"""
+    return {"CV_CPU_AFFINITY": format_cores(cores), "CV_CORE_BUDGET": str(len(cores))}
+
+
+def pin_to_cores(cores):
+    """Restrict this process to `cores` (Linux natively, elsewhere via psutil)"""
+    try:
+        os.sched_setaffinity(0, cores)
+        return True
+    except (AttributeError, OSError):
+        pass
+    try:
+        import psutil
+        psutil.Process().cpu_affinity(list(cores))
+        return True
+    except Exception:
+        return False
+
+
+def split(total, weights):
+    """Threads per framework, proportional to `weights`, at least one each"""
+    weight_sum = sum(weights.values())
+    return {name: max(1, int(total * weight / weight_sum)) for name, weight in weights.items()}
+
+
+def budget(framework=None):
+    """Threads for `framework` (or the whole process) under the applied budget"""
+    framework = _ALIASES.get(framework, framework)
+    if framework in _shares:
+        return _shares[framework]
+    if _budget is not None:
+        return _budget
+    return int(os.environ.get("CV_CORE_BUDGET") or len(available_cores()))
+
+
+def interop_threads(threads):
+    """Inter-op pools only help graphs with parallel branches; keep them small"""
+    return max(1, threads // 4)
+
+
+def apply(threads=None, cores=None, weights=None, verbose=True):
+    """Pin (optionally) and size OpenCV and the OMP/BLAS/TF runtimes; returns the budget"""
+    global _budget, _shares, _cores
+    if cores is None and os.environ.get("CV_CPU_AFFINITY"):
+        cores = parse_cores(os.environ["CV_CPU_AFFINITY"])
+    pinned = bool(cores) and pin_to_cores(cores)
+    if threads is None:
+        threads = int(os.environ.get("CV_CORE_BUDGET") or len(available_cores()))
+    threads = max(1, threads)
+
+    _budget, _cores = threads, sorted(cores) if pinned else None
+    _shares = split(threads, weights) if weights else {}
+    # The budget is the one knob: values inherited from a parent are overwritten
+    for name in _THREAD_ENV:
+        os.environ[name] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = str(interop_threads(threads))
+    cv2.setNumThreads(budget("opencv"))
+
+    if verbose:
+        where = f" on cores {format_cores(_cores)}" if _cores else ""
+        shares = ", ".join(f"{name} {n}" for name, n in _shares.items())
+        print(f"Threads: {threads}{where}" + (f" ({shares})" if shares else ""))
+    return threads
+
+
+def configure_torch():
+    """Size torch's pools to its share; call right after importing torch/ultralytics"""
+    import torch
+    threads = budget("torch")
+    # Never above torch's own default (physical cores): hyper-threads don't help GEMMs
+    torch.set_num_threads(min(threads, torch.get_num_threads()))
+    try:
+        torch.set_interop_threads(interop_threads(threads))
+    except RuntimeError:
+        # Only allowed once, before the first parallel work (e.g. a second model load)
+        pass
+
+
+def configure_tensorflow():
+    """Size TensorFlow's pools to its share; call after importing it, before the model loads"""
+    import tensorflow as tf
+    threads = budget("tensorflow")
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(interop_threads(threads))
+    except RuntimeError:
+        # The runtime is already initialised; the TF_NUM_*_THREADS variables applied instead
+        pass
@@ -0,0 +1,109 @@
+"""
+Rate-limited system volume control
+
+The camera loop only records the latest target; a background thread pushes
+it to the OS when it changes, at most `max_rate` times per second.
+"""
+
+import threading
+import time
+
+
+class VolumeController:
+    """Apply whole-percent volume targets from a background thread
+
+    `backend` is an AudioBackend; it is opened on the worker thread (COM
+    objects such as pycaw's endpoint must live on the thread that uses them).
+    `max_rate` defaults to the backend's own limit, read again once the
+    backend is open (PulseBackend lowers it when it falls back to pactl).
+    """
+
+    def __init__(self, backend, max_rate=None, deadband=0.6):
+        self.backend = backend
+        self.max_rate = max_rate
+        self.min_interval = 1.0 / (max_rate or backend.max_rate)
+        self.deadband = deadband
+        self.updates_sent = 0
+        self._started = time.monotonic()
+        self._target = None
+        self._applied = None
+        self._running = True
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="volume-controller", daemon=True)
+        self._thread.start()
+
+    @property
+    def target(self):
+        return self._target
+
+    def set(self, percent):
+        """Request a volume (0-100); returns the quantised target"""
+        percent = min(100.0, max(0.0, percent))
+        with self._cond:
+            # Deadband around the current step so a value sitting on x.5 doesn't flip-flop
+            if self._target is None or abs(percent - self._target) >= self.deadband:
+                target = int(round(percent))
+                if target != self._target:
+                    self._target = target
+                    self._cond.notify()
+            return self._target
+
+    def _run(self):
+        try:
+            self.backend.open()
+            if self.max_rate is None:
+                self.min_interval = 1.0 / self.backend.max_rate
+            # Pick up the current level if the backend can read it
+            with self._cond:
+                self._applied = self.backend.get_percent()
+        except Exception as e:
+            print(f"⚠ Could not open audio backend '{self.backend.name}': {e}")
+            return
+
+        while True:
+            with self._cond:
+                while self._running and self._target in (None, self._applied):
+                    self._cond.wait()
+                target = self._target
+                if not self._running:
+                    break
+            self._apply(target)
+            # Rate limit, cut short by close()
+            with self._cond:
+                self._cond.wait_for(lambda: not self._running, self.min_interval)
+
+        # A target set during the last wait (e.g. the final pinch before quitting) still goes out
+        if target not in (None, self._applied):
+            self._apply(target)
+
+        try:
+            self.backend.close()
+        except Exception as e:
+            print(f"⚠ Could not close audio backend '{self.backend.name}': {e}")
+
+    def _apply(self, target):
+        try:
+            self.backend.set_percent(target)
+        except Exception as e:
+            print(f"⚠ Could not set volume: {e}")
+        with self._cond:
+            self._applied = target
+        self.updates_sent += 1
+
+    def rate(self):
+        """Average OS calls per second since the controller started"""
+        elapsed = time.monotonic() - self._started
+        return self.updates_sent / elapsed if elapsed > 0 else 0.0
+
+    def close(self):
+        """Stop the worker thread"""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=1.0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -17,6 +17,10 @@ import time
 # ---------------------------
 PROJECT_ROOT = Path(__file__).resolve().parent
 
+sys.path.insert(0, str(PROJECT_ROOT))
+from cv_common import model_server, profiles, threads
+from cv_common.startup import last_record
+
 
 # ---------------------------
 # Streamlit Page Config
@@ -103,14 +107,66 @@ feature = st.sidebar.selectbox(
         "Hand Tracking",
         "Virtual Games",
         "Volume Gesture Control",
-        "YOLO Tracking"
+        "YOLO Tracking",
+        "Multi-Task Mode"
     ]
 )
+# Named settings for every module; "default" leaves each module's own
+profile_options = ["default"] + list(profiles.PROFILES) + ["auto"]
+env_profile = os.environ.get("CV_PROFILE", "default")
+perf_profile = st.sidebar.selectbox(
+    "⚙️ Performance profile", profile_options,
+    index=profile_options.index(env_profile) if env_profile in profile_options else 0,
+    help="Capture size, model variants, inference stride and render rate for every module (CV_PROFILE); auto picks one from a quick benchmark",
+)
+profile_imports = st.sidebar.checkbox("⏱ Profile startup imports", help="Print where each module spends its import time (CV_PROFILE_IMPORTS)")
+
+# ---------------------------
+# Shared background services (python -m <module>), kept across reruns
+# ---------------------------
+def background_service(key, enabled, module):
+    process = st.session_state.get(key)
+    if enabled and (process is None or process.poll() is not None):
+        st.session_state[key] = subprocess.Popen([sys.executable, "-m", module], cwd=str(PROJECT_ROOT))
+    elif not enabled and process is not None:
+        process.terminate()
+        st.session_state[key] = None
+
+# One copy of each model for all modules
+share_models = st.sidebar.checkbox("🧠 Share models between modules", help="Load emotion, YOLO and MediaPipe models once in a background server instead of in every module")
+background_service("model_server", share_models, "cv_common.model_server")
+if share_models:
+    try:
+        client = model_server.ModelClient()
+        stats = client.stats()
+        client.close()
+        loaded = ", ".join(m["model"] for m in stats["models"]) or "none yet"
+        st.sidebar.caption(f"Models loaded: {loaded} ({stats['used_mb']:.0f} / {stats['budget_mb']:.0f} MB)")
+    except (OSError, EOFError):
+        st.sidebar.caption("Model server starting...")
+
+# One camera reader publishing frames to every module over shared memory
+share_camera = st.sidebar.checkbox("📷 Share the camera between modules", help="Run several modules at once on one webcam via the shared-memory frame bus")
+background_service("frame_bus", share_camera, "cv_common.frame_bus")
+
+# Modules running side by side each get their own cores and thread budget
+split_cores = st.sidebar.checkbox("🧮 Split CPU cores between modules", help="Pin each launched module to its own share of the cores (CV_CPU_AFFINITY / CV_CORE_BUDGET) so modules running together don't oversubscribe the CPU")
+core_slots = st.sidebar.slider("Modules at once", 2, 4, 2) if split_cores else 1
+
+def next_core_slot():
+    """A slice of the cores that no running module launched from here holds"""
+    launched = [(p, slot) for p, slot in st.session_state.get("launched", []) if p.poll() is None]
+    st.session_state["launched"] = launched
+    taken = {slot for _, slot in launched}
+    free = [slot for slot in range(core_slots) if slot not in taken]
+    slot = free[0] if free else len(launched) % core_slots
+    groups = threads.partition(threads.available_cores(), core_slots)
+    return slot, groups[slot % len(groups)]
 
 # ---------------------------
 # Helper function to run scripts with better process management
 # ---------------------------
-def run_script(relative_path, script_name):
+def run_script(relative_path, script_name, extra_env=None):
     script_path = PROJECT_ROOT / relative_path
     
     if not script_path.exists():
@@ -120,14 +176,34 @@ def run_script(relative_path, script_name):
     st.markdown(f'<div class="loading-box"><div class="info-text">🚀 Launching {script_name}...</div><div style="font-size: 0.9em; color: #666;">This may take a few seconds. Please wait...</div></div>', unsafe_allow_html=True)
     
     try:
+        # Launch time lets the script report time-to-first-frame including interpreter start-up
+        env = dict(os.environ, CV_LAUNCH_TS=str(time.time()))
+        if profile_imports:
+            env["CV_PROFILE_IMPORTS"] = "1"
+        if perf_profile != "default":
+            env["CV_PROFILE"] = perf_profile
+        # Per-launch settings; the dashboard's own environment is never changed
+        env.update(extra_env or {})
+        if share_models:
+            env["CV_MODEL_SERVER"] = "1"
+        if share_camera:
+            env["CV_FRAME_BUS"] = "cv_frames"
+        slot = None
+        if split_cores:
+            slot, cores = next_core_slot()
+            env.update(threads.child_env(cores))
+
         # Run script in a separate process and wait for it to complete
         process = subprocess.Popen(
             [sys.executable, str(script_path)],
             cwd=str(PROJECT_ROOT),
+            env=env,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             universal_newlines=True
         )
+        if slot is not None:
+            st.session_state.setdefault("launched", []).append((process, slot))
         
         # Wait for the process to complete (this keeps the UI responsive)
         stdout, stderr = process.communicate(timeout=30)  # 30 second timeout
@@ -146,6 +222,18 @@ def run_script(relative_path, script_name):
         st.markdown(f'<div class="error-box"><div class="info-text">❌ Failed to run {script_name}!</div><div style="font-size: 0.9em; color: #f44336;">Error: {str(e)}</div></div>', unsafe_allow_html=True)
         return False
 
+def show_startup(module):
+    """Caption with the module's most recent time-to-first-frame"""
+    record = last_record(module)
+    if record is None:
+        return
+    phases = ", ".join(f"{name} {ms:.0f} ms" for name, ms in record.get("phases", {}).items())
+    st.caption(f"⏱ Last time to first frame: {record['ttff_ms']:.0f} ms" + (f" ({phases})" if phases else ""))
+    if record.get("imports"):
+        with st.expander("Import profile"):
+            st.table({"package": [name for name, _ in record["imports"]],
+                      "self time (ms)": [ms for _, ms in record["imports"]]})
+
 # ---------------------------
 # Features
 # ---------------------------
@@ -169,6 +257,8 @@ if feature == "Select a feature...":
     **Volume Gesture Control** - Control your laptop volume with hand gestures.
     
     **YOLO Tracking** - Real-time object detection and tracking using YOLOv8.
+    
+    **Multi-Task Mode** - Emotion, hand and object detection together from a single camera.
     """)
     
     # Display cards
@@ -187,6 +277,7 @@ elif feature == "Emotion Detection":
     st.markdown("""<div class='feature-card'><div class='feature-title'>😊 Emotion Detection</div><div class='feature-desc'>Uses a trained model to detect facial emotions in real-time.</div></div>""", unsafe_allow_html=True)
     if st.button("🚀 Start Emotion Detection"):
         run_script("Emotion_detection/tes.py", "Emotion Detection")
+    show_startup("emotion_detection")
 
 # ---------------------------
 # Hand Tracking
@@ -195,6 +286,7 @@ elif feature == "Hand Tracking":
     st.markdown("""<div class='feature-card'><div class='feature-title'>✋ Hand Tracking</div><div class='feature-desc'>Counts fingers and detects thumbs up/down gestures in real-time.</div></div>""", unsafe_allow_html=True)
     if st.button("🚀 Start Hand Tracking"):
         run_script("pose_detection/hand_tracking.py", "Hand Tracking")
+    show_startup("hand_tracking")
 
 # ---------------------------
 # Virtual Games
@@ -204,14 +296,20 @@ elif feature == "Virtual Games":
     
     game_choice = st.selectbox("Select a Game:", ["Select a game...", "Guessing Game", "Psychology Game", "Tic-Tac-Toe"])
     
-    if game_choice == "Guessing Game" and st.button("🚀 Start Guessing Game"):
-        run_script("virtuals/guessing_game.py", "Guessing Game")
+    if game_choice == "Guessing Game":
+        if st.button("🚀 Start Guessing Game"):
+            run_script("virtuals/guessing_game.py", "Guessing Game")
+        show_startup("guessing_game")
     
-    elif game_choice == "Psychology Game" and st.button("🚀 Start Psychology Game"):
-        run_script("virtuals/physcology_test.py", "Psychology Game")
+    elif game_choice == "Psychology Game":
+        if st.button("🚀 Start Psychology Game"):
+            run_script("virtuals/physcology_test.py", "Psychology Game")
+        show_startup("psychology_test")
     
-    elif game_choice == "Tic-Tac-Toe" and st.button("🚀 Start Tic-Tac-Toe"):
-        run_script("virtuals/Tic_tac_toe.py", "Tic-Tac-Toe")
+    elif game_choice == "Tic-Tac-Toe":
+        if st.button("🚀 Start Tic-Tac-Toe"):
+            run_script("virtuals/Tic_tac_toe.py", "Tic-Tac-Toe")
+        show_startup("tic_tac_toe")
 
 # ---------------------------
 # Volume Gesture Control
@@ -220,6 +318,7 @@ elif feature == "Volume Gesture Control":
     st.markdown("""<div class='feature-card'><div class='feature-title'>🔊 Volume Gesture Control</div><div class='feature-desc'>Control your laptop's volume with hand gestures.</div></div>""", unsafe_allow_html=True)
     if st.button("🚀 Start Volume Control"):
         run_script("virtuals/Volume gesture control.py", "Volume Control")
+    show_startup("volume_control")
 
 # ---------------------------
 # YOLO Tracking
@@ -228,6 +327,26 @@ elif feature == "YOLO Tracking":
     st.markdown("""<div class='feature-card'><div class='feature-title'>🔍 YOLO Tracking</div><div class='feature-desc'>Real-time object detection and tracking using YOLOv8.</div></div>""", unsafe_allow_html=True)
     if st.button("🚀 Start YOLO Tracking"):
         run_script("yolo webcam detection/Tracking.py", "YOLO Tracking")
+    show_startup("yolo_tracking")
+
+# ---------------------------
+# Multi-Task Mode
+# ---------------------------
+elif feature == "Multi-Task Mode":
+    st.markdown("""<div class='feature-card'><div class='feature-title'>🧩 Multi-Task Mode</div><div class='feature-desc'>Runs emotion, hand and object detection together on one camera stream.</div></div>""", unsafe_allow_html=True)
+    schedule_options = ["every", "every:2", "every:5", "person"]
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        yolo_schedule = st.selectbox("Objects (YOLO)", schedule_options[:3], index=1)
+    with col2:
+        emotion_schedule = st.selectbox("Emotion", schedule_options, index=3)
+    with col3:
+        hands_schedule = st.selectbox("Hands", schedule_options, index=0)
+    if st.button("🚀 Start Multi-Task Mode"):
+        run_script("combined/multi_task.py", "Multi-Task Mode",
+                   extra_env={"CV_SCHEDULE_YOLO": yolo_schedule, "CV_SCHEDULE_EMOTION": emotion_schedule,
+                              "CV_SCHEDULE_HANDS": hands_schedule})
+    show_startup("multi_task")
 
 # ---------------------------
 # Footer
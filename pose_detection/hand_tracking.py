@@ -1,21 +1,15 @@
 import cv2
-from google.protobuf import symbol_database, message_factory
+import sys
+import time
+from pathlib import Path
 
-# Patch SymbolDatabase to include GetPrototype
-if not hasattr(symbol_database.Default(), "GetPrototype"):
-    def get_prototype(self, descriptor):
-        return message_factory.MessageFactory().GetPrototype(descriptor)
-    symbol_database.Default().GetPrototype = get_prototype
-
-import mediapipe as mp
-
-mp_hands = mp.solutions.hands
-mp_draw = mp.solutions.drawing_utils
-
-cap = cv2.VideoCapture(0)
-
-cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from cv_common.capture import open_capture
+from cv_common.frames import FrameBuffers
+from cv_common import profiles, startup, threads
+from cv_common.gestures import GestureDetector
+from cv_common.hands import HandService, mp_hands, mp_drawing as mp_draw
+from cv_common.telemetry import Telemetry
 
 def count_fingers(hand_landmarks, handedness):
     """Count how many fingers are extended"""
@@ -119,54 +113,100 @@ def is_thumb_down(hand_landmarks, handedness):
     
     return thumb_extended and fingers_folded
 
-with mp_hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7) as hands:
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
+if __name__ == "__main__":
+    profiles.apply()
+    threads.apply()
+    # MediaPipe loads in the background while the camera opens
+    hand_service = HandService.load(max_num_hands=2, min_detection_confidence=0.7, min_tracking_confidence=0.7)
+
+    # MJPG at 1280x720 (or the profile's size) with a one-frame driver queue, read on its own thread
+    cap = open_capture(0, width=1280, height=720, threaded=True, hands_replay=True)
+    buffers = FrameBuffers()
+    telemetry = Telemetry("hand_tracking")
+    startup.mark("camera")
 
-        frame = cv2.flip(frame, 1)
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(rgb)
+    # Temporal gestures (swipe, pinch-drag, circle, wave), one detector per hand slot
+    gesture_detectors = [GestureDetector(), GestureDetector()]
+    last_gesture, last_gesture_time = None, 0.0
 
-        thumbs_up_count = 0
-        thumbs_down_count = 0
-        total_fingers = 0
+    with hand_service.result() as hands:
+        startup.mark("hands")
+        # A replay with CV_HANDS_REPLAY_LOOP=0 stops the module after its last frame
+        while not hands.ended:
+            with telemetry.stage("capture"):
+                ret, frame, rgb = buffers.read(cap)
+            if not ret:
+                break
+
+            with telemetry.stage("inference"):
+                results = hands.process(rgb)
+
+            thumbs_up_count = 0
+            thumbs_down_count = 0
+            total_fingers = 0
+        
+            with telemetry.stage("postprocess"):
+                if results.multi_hand_landmarks and results.multi_handedness:
+                    for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
+                        # Count fingers
+                        fingers = count_fingers(hand_landmarks, handedness)
+                        total_fingers += fingers
+                    
+                        # Check for thumbs up or down
+                        if is_thumb_up(hand_landmarks, handedness):
+                            thumbs_up_count += 1
+                        elif is_thumb_down(hand_landmarks, handedness):
+                            thumbs_down_count += 1
+
+                now = time.monotonic()
+                hands_seen = results.multi_hand_landmarks or []
+                for i, detector in enumerate(gesture_detectors):
+                    detector.aspect = frame.shape[1] / frame.shape[0]
+                    gesture = detector.update(hands_seen[i] if i < len(hands_seen) else None, now)
+                    if gesture:
+                        last_gesture, last_gesture_time = gesture, now
         
-        if results.multi_hand_landmarks and results.multi_handedness:
-            for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
-                # Draw hand landmarks
-                mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-                
-                # Count fingers
-                fingers = count_fingers(hand_landmarks, handedness)
-                total_fingers += fingers
-                
-                # Check for thumbs up or down
-                if is_thumb_up(hand_landmarks, handedness):
-                    thumbs_up_count += 1
-                elif is_thumb_down(hand_landmarks, handedness):
-                    thumbs_down_count += 1
+            render_start = telemetry.start()
+            if results.multi_hand_landmarks:
+                for hand_landmarks in results.multi_hand_landmarks:
+                    # Draw hand landmarks
+                    mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
         
-        # Display information on screen
-        cv2.putText(frame, f"Fingers Up: {total_fingers}", (10, 30), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 0), 2)
-        cv2.putText(frame, f"Thumbs Up: {thumbs_up_count}", (10, 70), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-        cv2.putText(frame, f"Thumbs Down: {thumbs_down_count}", (10, 110), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+            # Display information on screen
+            cv2.putText(frame, f"Fingers Up: {total_fingers}", (10, 30), 
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 0), 2)
+            cv2.putText(frame, f"Thumbs Up: {thumbs_up_count}", (10, 70), 
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            cv2.putText(frame, f"Thumbs Down: {thumbs_down_count}", (10, 110), 
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+            cv2.putText(frame, f"Inference: {hands.mean_latency_ms:.1f} ms | {telemetry.fps:.1f} FPS", (10, 150), 
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2)
+            if last_gesture and now - last_gesture_time < 1.0:
+                cv2.putText(frame, f"Gesture: {last_gesture.replace('_', ' ')}", (10, 190), 
+                            cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 255), 2)
         
-        # Display gesture status
-        if thumbs_up_count > 0:
-            cv2.putText(frame, "OK", (frame.shape[1]//2 - 50, frame.shape[0]//2), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 3, (0, 255, 0), 5)
-        elif thumbs_down_count > 0:
-            cv2.putText(frame, "NOT OKAY", (frame.shape[1]//2 - 200, frame.shape[0]//2), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 3, (0, 0, 255), 5)
+            # Display gesture status
+            if thumbs_up_count > 0:
+                cv2.putText(frame, "OK", (frame.shape[1]//2 - 50, frame.shape[0]//2), 
+                            cv2.FONT_HERSHEY_SIMPLEX, 3, (0, 255, 0), 5)
+            elif thumbs_down_count > 0:
+                cv2.putText(frame, "NOT OKAY", (frame.shape[1]//2 - 200, frame.shape[0]//2), 
+                            cv2.FONT_HERSHEY_SIMPLEX, 3, (0, 0, 255), 5)
 
-        cv2.imshow("Hand Tracking - Finger Counter", frame)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+            telemetry.draw_hud(frame)
+            cv2.imshow("Hand Tracking - Finger Counter", frame)
+            telemetry.stop("render", render_start)
+            # Grab-to-display latency and frames the camera thread replaced unread
+            if getattr(cap, "timestamp", None):
+                telemetry.record("frame_age", (time.time() - cap.timestamp) * 1000)
+            telemetry.set_gauge("camera_dropped", getattr(cap, "dropped", 0))
+            telemetry.frame()
+
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
+                break
+            telemetry.handle_key(key)
 
-cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+    telemetry.close()
+    cap.release()
+    cv2.destroyAllWindows()
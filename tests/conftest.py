@@ -0,0 +1,12 @@
+"""
+Put the repository root and the script folders on sys.path, the way the
+modules find each other when run directly
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+for path in (ROOT, ROOT / "yolo webcam detection", ROOT / "Emotion_detection"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
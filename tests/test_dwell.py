@@ -0,0 +1,45 @@
+from cv_common.dwell import Debouncer, Dwell, DwellButton
+
+
+def test_debouncer_allows_once_per_interval():
+    debounce = Debouncer(0.5)
+    assert debounce.trigger(0.0)
+    assert not debounce.trigger(0.4)
+    assert debounce.trigger(0.5)
+    debounce.reset()
+    assert debounce.ready(0.6)
+
+
+def test_dwell_fires_once_until_released():
+    dwell = Dwell(0.3, release_time=0.1)
+    assert [dwell.update(True, t / 10) for t in range(6)] == [False, False, False, True, False, False]
+    assert dwell.progress == 0.0
+    dwell.update(False, 0.6)
+    dwell.update(False, 0.8)
+    assert not dwell.active
+    assert not dwell.update(True, 1.0)
+    assert dwell.update(True, 1.5)
+
+
+def test_dwell_survives_a_short_dropout():
+    dwell = Dwell(0.3, release_time=0.15)
+    dwell.update(True, 0.0)
+    dwell.update(False, 0.1)
+    assert dwell.active
+    assert dwell.update(True, 0.3)
+
+
+def test_dwell_holds_its_click_until_armed():
+    dwell = Dwell(0.3)
+    fired = [dwell.update(True, t / 10, armed=t >= 5) for t in range(8)]
+    assert fired == [False, False, False, False, False, True, False, False]
+
+
+def test_dwell_button_hysteresis():
+    button = DwellButton(100, 100, 50, 50, dwell_time=0.25, margin=10)
+    assert not button.update((95, 120), 0.0)
+    assert not button.active
+    button.update((120, 120), 0.25)
+    # Just outside the rectangle but within the margin: still on the button
+    assert button.update((155, 120), 0.5)
+    assert button.center == (125, 125)
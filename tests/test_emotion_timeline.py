@@ -0,0 +1,74 @@
+import threading
+
+import numpy as np
+
+from emotion_timeline import EMOTIONS, FaceTracker, TimelineRecorder, iou_matrix, load_timeline, summarize
+
+
+def test_iou_matrix():
+    iou = iou_matrix([[0, 0, 10, 10]], [[0, 0, 10, 10], [5, 0, 10, 10], [20, 20, 5, 5]])
+    np.testing.assert_allclose(iou, [[1.0, 1 / 3, 0.0]])
+
+
+def test_tracker_keeps_ids_across_frames():
+    tracker = FaceTracker(max_missed=1)
+    first = tracker.update([[0, 0, 50, 50], [200, 0, 50, 50]])
+    assert first == [1, 2]
+    assert tracker.update([[205, 2, 50, 50], [3, 1, 50, 50]]) == [2, 1]
+    # A face missing for longer than max_missed loses its ID
+    tracker.update([])
+    tracker.update([])
+    assert tracker.update([[0, 0, 50, 50]]) == [3]
+
+
+def test_recorder_round_trip(tmp_path):
+    path = tmp_path / "timeline.db"
+    recorder = TimelineRecorder(path, session="s1", batch_size=4, flush_interval=0.05)
+    probabilities = np.eye(len(EMOTIONS))[3]
+    for i in range(10):
+        recorder.add(100.0 + i, 1 + i % 2, (10, 20, 30, 40), probabilities)
+    recorder.close()
+    assert recorder.written == 10 and recorder.dropped == 0
+
+    data = load_timeline(path, "s1")
+    assert len(data["ts"]) == 10
+    summary = summarize(data)["s1"]
+    assert summary["tracks"] == 2
+    assert summary["duration_s"] == 9.0
+    assert summary["histogram"]["Happy"] == 10
+
+
+def test_recorder_stops_after_a_failed_write(tmp_path):
+    recorder = TimelineRecorder(tmp_path / "timeline.db", batch_size=1, flush_interval=0.05)
+
+    def fail(rows):
+        raise OSError("disk full")
+
+    recorder._sink.write = fail
+    recorder.add(0.0, 1, (0, 0, 1, 1), np.zeros(7))
+    recorder._thread.join(timeout=2)
+    assert recorder.failed
+    recorder.add(1.0, 1, (0, 0, 1, 1), np.zeros(7))
+    assert recorder._queue.empty()
+    recorder.close()
+    assert recorder.dropped == 1
+
+
+def test_recorder_drops_on_overflow(tmp_path):
+    recorder = TimelineRecorder(tmp_path / "timeline.db", batch_size=1, flush_interval=0.05, max_queue=2)
+    write, writing, release = recorder._sink.write, threading.Event(), threading.Event()
+
+    def slow_write(rows):
+        writing.set()
+        release.wait(2)
+        write(rows)
+
+    recorder._sink.write = slow_write
+    recorder.add(0.0, 1, (0, 0, 1, 1), np.zeros(7))
+    assert writing.wait(2)
+    # The writer is stuck on the first record: two fit in the queue, three don't
+    for i in range(5):
+        recorder.add(float(i), 1, (0, 0, 1, 1), np.zeros(7))
+    release.set()
+    recorder.close()
+    assert (recorder.written, recorder.dropped) == (3, 3)
@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from cv_common.filters import EMAFilter, LandmarkFilterBank, OneEuroFilter
+
+
+def test_ema_filter():
+    ema = EMAFilter(alpha=0.5)
+    assert ema(10.0) == 10.0
+    assert ema(20.0) == 15.0
+    ema.reset()
+    assert ema(4.0) == 4.0
+
+
+def test_one_euro_smooths_jitter_at_rest():
+    euro = OneEuroFilter(min_cutoff=1.0, beta=0.0)
+    rng = np.random.default_rng(0)
+    noisy = 0.5 + rng.normal(0, 0.01, 120)
+    filtered = [euro(v, t / 60) for t, v in enumerate(noisy)]
+    assert np.std(filtered[20:]) < np.std(noisy[20:]) / 2
+
+
+def test_one_euro_ignores_repeated_timestamps():
+    euro = OneEuroFilter()
+    euro(1.0, 0.0)
+    value = euro(2.0, 0.1)
+    assert euro(5.0, 0.1) == value
+
+
+def _hands(points, labels):
+    hands = [SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in p]) for p in points]
+    handedness = [SimpleNamespace(classification=[SimpleNamespace(label=label)]) for label in labels]
+    return SimpleNamespace(multi_hand_landmarks=hands, multi_handedness=handedness)
+
+
+def test_filter_bank_first_frame_passes_through():
+    bank = LandmarkFilterBank()
+    points = np.full((21, 3), 0.25)
+    np.testing.assert_allclose(bank.filter(0, points, 0.0), points)
+
+
+def test_filter_bank_lookahead_extrapolates_motion():
+    still, ahead = LandmarkFilterBank(lookahead=0.0), LandmarkFilterBank(lookahead=0.1)
+    for i in range(10):
+        points = np.full((21, 3), 0.01 * i)
+        a = still.filter(0, points, i / 30).copy()
+        b = ahead.filter(0, points, i / 30).copy()
+    assert (b > a).all()
+
+
+def test_filter_bank_slots_follow_handedness():
+    bank = LandmarkFilterBank()
+    left, right = np.full((21, 3), 0.2), np.full((21, 3), 0.8)
+    bank.apply(_hands([left, right], ["Left", "Right"]), 0.0)
+    # MediaPipe reorders the hands: the slots must not swap
+    results = bank.apply(_hands([right, left], ["Right", "Left"]), 0.1)
+    assert results.multi_hand_landmarks[0].landmark[0].x == pytest.approx(0.8)
+    assert results.multi_hand_landmarks[1].landmark[0].x == pytest.approx(0.2)
+
+
+def test_filter_bank_unknown_handedness_takes_a_free_slot():
+    bank = LandmarkFilterBank()
+    assert bank._slots(_hands([np.zeros((21, 3))] * 2, ["Unknown", "Right"])) == [0, 1]
@@ -0,0 +1,60 @@
+import uuid
+
+import numpy as np
+import pytest
+
+from cv_common.frame_bus import FrameBusCapture, FrameBusProducer
+
+
+@pytest.fixture
+def producer():
+    bus = FrameBusProducer(f"cv_test_{uuid.uuid4().hex[:8]}", (4, 6, 3), slots=3)
+    yield bus
+    if bus._ring is not None and hasattr(bus._ring, "header"):
+        bus.close()
+
+
+def test_consumer_reads_the_latest_frame(producer):
+    capture = FrameBusCapture(producer.name, timeout=0.1)
+    assert capture.isOpened()
+    assert capture.get(3) == 6.0 and capture.get(4) == 4.0
+    for value in range(5):
+        producer.write(np.full((4, 6, 3), value, dtype=np.uint8), timestamp=float(value))
+    ok, frame = capture.read()
+    assert ok and (frame == 4).all()
+    # Nothing newer yet: times out
+    assert capture.latest() is None
+    capture.release()
+
+
+def test_dropped_frames_are_counted(producer):
+    capture = FrameBusCapture(producer.name, timeout=0.1)
+    producer.write(np.zeros((4, 6, 3), dtype=np.uint8))
+    capture.read()
+    for _ in range(3):
+        producer.write(np.ones((4, 6, 3), dtype=np.uint8))
+    seq, timestamp, view = capture.latest()
+    assert seq == 3 and capture.dropped == 2
+    del view
+    capture.release()
+
+
+def test_close_is_seen_by_consumers(producer):
+    capture = FrameBusCapture(producer.name, timeout=0.1)
+    producer.close()
+    assert not capture.isOpened()
+    assert capture.read() == (False, None)
+    capture.release()
+
+
+def test_missing_bus():
+    assert not FrameBusCapture(f"cv_missing_{uuid.uuid4().hex[:8]}").isOpened()
+
+
+def test_consumer_resizes_to_the_requested_size(producer):
+    capture = FrameBusCapture(producer.name, timeout=0.1, size=(12, 8))
+    assert capture.get(3) == 12.0 and capture.get(4) == 8.0
+    producer.write(np.full((4, 6, 3), 7, dtype=np.uint8))
+    ok, frame = capture.read()
+    assert ok and frame.shape == (8, 12, 3) and (frame == 7).all()
+    capture.release()
@@ -0,0 +1,61 @@
+import numpy as np
+
+from cv_common.gestures import INDEX_TIP, MIDDLE_MCP, THUMB_TIP, WRIST, GestureDetector, LandmarkHistory
+
+
+def _hand(cx, cy, scale=0.1, pinch=False):
+    """(21, 3) open hand centred on (cx, cy), `scale` from wrist to middle MCP"""
+    points = np.zeros((21, 3), dtype=np.float32)
+    angles = np.linspace(-np.pi / 2, 3 * np.pi / 2, 21, endpoint=False)
+    points[:, 0] = cx + 1.5 * scale * np.cos(angles)
+    points[:, 1] = cy + 1.5 * scale * np.sin(angles)
+    points[WRIST, :2] = (cx, cy + scale)
+    points[MIDDLE_MCP, :2] = (cx, cy)
+    for tip in (8, 12, 16, 20):
+        points[tip, :2] = (cx + (tip - 14) * 0.02, cy - 2 * scale)
+    points[THUMB_TIP, :2] = points[INDEX_TIP, :2] if pinch else (cx - 2 * scale, cy)
+    return points
+
+
+def test_history_window_is_oldest_first_and_wraps():
+    history = LandmarkHistory(size=4)
+    for i in range(6):
+        history.push(np.full((21, 3), i), float(i))
+    points, times = history.window(10.0, 5.0)
+    assert times.tolist() == [2.0, 3.0, 4.0, 5.0]
+    assert points[:, 0, 0].tolist() == [2.0, 3.0, 4.0, 5.0]
+    assert history.window(1.5, 5.0)[1].tolist() == [4.0, 5.0]
+
+
+def test_swipe_left():
+    detector = GestureDetector()
+    gestures = [detector.update(_hand(0.8 - 0.05 * i, 0.5), i / 30) for i in range(10)]
+    assert "swipe_left" in gestures
+
+
+def test_still_hand_is_no_gesture():
+    detector = GestureDetector()
+    assert not any(detector.update(_hand(0.5, 0.5), i / 30) for i in range(40))
+
+
+def test_pinch_drag_reports_the_drag_vector():
+    detector = GestureDetector()
+    gestures = [detector.update(_hand(0.3 + 0.01 * i, 0.5, pinch=True), i / 30) for i in range(10)]
+    assert gestures[-1] == "pinch_drag"
+    assert detector.drag[0] > 0.06
+
+
+def test_no_hand_resets():
+    detector = GestureDetector()
+    detector.update(_hand(0.5, 0.5), 0.0)
+    assert detector.update(None, 0.1) is None
+    assert detector.history.count == 0
+
+
+def test_aspect_puts_x_in_the_same_units_as_y():
+    # 0.12 of the width on a 16:9 frame is 0.21 of the height: a swipe only once corrected
+    moves = [_hand(0.6 - 0.012 * i, 0.5) for i in range(11)]
+    square = GestureDetector()
+    wide = GestureDetector(aspect=16 / 9)
+    assert "swipe_left" not in [square.update(p, i / 30) for i, p in enumerate(moves)]
+    assert "swipe_left" in [wide.update(p, i / 30) for i, p in enumerate(moves)]
@@ -0,0 +1,36 @@
+from types import SimpleNamespace
+
+import pytest
+
+from cv_common.pinch import PinchCalibrator, pinch_ratio
+
+
+def _hand(thumb_x, index_x):
+    points = [SimpleNamespace(x=0.5, y=0.5, z=0.0) for _ in range(21)]
+    points[0] = SimpleNamespace(x=0.5, y=0.7, z=0.0)
+    points[4] = SimpleNamespace(x=thumb_x, y=0.5, z=0.0)
+    points[8] = SimpleNamespace(x=index_x, y=0.5, z=0.0)
+    return SimpleNamespace(landmark=points)
+
+
+def test_pinch_ratio_scales_x_by_the_aspect():
+    hand = _hand(0.45, 0.55)
+    assert pinch_ratio(hand) == pytest.approx(0.5)
+    assert pinch_ratio(hand, aspect=2.0) == pytest.approx(1.0)
+
+
+def test_calibration_round_trip(tmp_path):
+    path = tmp_path / "calibration.json"
+    PinchCalibrator(low=0.2, high=0.9).save(path)
+    calibrator = PinchCalibrator()
+    calibrator.load(path)
+    assert (calibrator.low, calibrator.high) == (0.2, 0.9)
+
+
+@pytest.mark.parametrize("content", ['{"low": 0.2, "hi', '{"low": 0.2}', '[1, 2]', '{"low": 0.5, "high": 0.5}'])
+def test_broken_calibration_keeps_the_defaults(tmp_path, content):
+    path = tmp_path / "calibration.json"
+    path.write_text(content)
+    calibrator = PinchCalibrator()
+    calibrator.load(path)
+    assert (calibrator.low, calibrator.high) == (0.15, 1.1)
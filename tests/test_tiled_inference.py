@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from tiled_inference import TiledDetector, _cut_by_border, nms, tile_grid
+
+
+def test_tile_grid_covers_the_frame_without_padding():
+    tiles = tile_grid(1920, 1080, tile=640, overlap=0.2)
+    assert tiles[:, 0].min() == 0 and tiles[:, 2].max() == 1920
+    assert tiles[:, 1].min() == 0 and tiles[:, 3].max() == 1080
+    assert ((tiles[:, 2] - tiles[:, 0]) == 640).all() and ((tiles[:, 3] - tiles[:, 1]) == 640).all()
+
+
+def test_small_frame_is_one_tile():
+    assert tile_grid(320, 240).tolist() == [[0, 0, 320, 240]]
+
+
+def test_nms_is_class_aware():
+    xyxy = np.array([[0, 0, 10, 10], [1, 1, 11, 11], [0, 0, 10, 10]], dtype=np.float32)
+    cls = np.array([0, 0, 1], dtype=np.float32)
+    conf = np.array([0.9, 0.8, 0.7], dtype=np.float32)
+    assert sorted(nms(xyxy, cls, conf, 0.3, 0.5).tolist()) == [0, 2]
+
+
+def test_cut_box_dropped_only_when_a_running_tile_sees_it_whole():
+    tiles = np.array([[0, 0, 100, 100], [80, 0, 180, 100]], dtype=np.int32)
+    # Tile 0's box touches its right edge; tile 1 contains it and reaches past that edge
+    xyxy = np.array([[85, 40, 99, 50]], dtype=np.float32)
+    running = np.array([True, True])
+    assert _cut_by_border(xyxy, 0, tiles, running, (180, 100), overlap_px=20).tolist() == [True]
+    # Tile 1 isn't run this frame: the partial box is all there is
+    running = np.array([True, False])
+    assert _cut_by_border(xyxy, 0, tiles, running, (180, 100), overlap_px=20).tolist() == [False]
+
+
+def test_box_at_the_frame_edge_is_kept():
+    tiles = np.array([[0, 0, 100, 100], [80, 0, 180, 100]], dtype=np.int32)
+    xyxy = np.array([[0, 40, 10, 50]], dtype=np.float32)
+    assert not _cut_by_border(xyxy, 0, tiles, np.array([True, True]), (180, 100), overlap_px=20).any()
+
+
+class _FakeModel:
+    """Finds one box in the middle of every image it is given"""
+
+    names = {0: "person"}
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, images, conf, verbose):
+        images = images if isinstance(images, list) else [images]
+        self.batches.append(len(images))
+        results = []
+        for image in images:
+            h, w = image.shape[:2]
+            boxes = SimpleNamespace(xyxy=np.array([[w / 2 - 5, h / 2 - 5, w / 2 + 5, h / 2 + 5]]),
+                                    cls=np.array([0.0]), conf=np.array([0.9]))
+            boxes.cpu = lambda boxes=boxes: SimpleNamespace(numpy=lambda: boxes)
+            results.append(SimpleNamespace(boxes=boxes, names=self.names))
+        return results
+
+
+def test_detector_returns_frame_coordinates():
+    model = _FakeModel()
+    detector = TiledDetector(model, tile=640, coarse=False)
+    result = detector(np.zeros((720, 1280, 3), dtype=np.uint8))
+    assert result.tiles_total == len(tile_grid(1280, 720)) == result.tiles_run
+    assert model.batches == [result.tiles_total]
+    centres = (result.boxes.xyxy[:, :2] + result.boxes.xyxy[:, 2:]) / 2
+    assert (centres[:, 0] > 300).all() and (centres[:, 0] < 1000).all()
+    assert set(result.speed) == {"tiles", "nms"}
+
+
+def test_warmup_runs_the_tile_batch_without_touching_state():
+    model = _FakeModel()
+    detector = TiledDetector(model, tile=640)
+    detector.warmup(np.zeros((720, 1280, 3), dtype=np.uint8))
+    # The coarse pass, then every tile in one batch
+    assert model.batches == [1, len(tile_grid(1280, 720))]
+    assert detector._frame_index == 0
@@ -0,0 +1,24 @@
+import time
+
+from cv_common.audio_backends import MockBackend
+from cv_common.volume import VolumeController
+
+
+def test_targets_are_quantised_with_a_deadband():
+    with VolumeController(MockBackend(), max_rate=100) as controller:
+        assert controller.set(40.4) == 40
+        assert controller.set(40.5) == 40
+        assert controller.set(41.2) == 41
+        assert controller.set(150) == 100
+
+
+def test_last_target_is_applied_on_close():
+    backend = MockBackend(initial=50)
+    controller = VolumeController(backend, max_rate=2)
+    controller.set(60)
+    time.sleep(0.05)
+    # Set while the worker waits out its rate limit
+    controller.set(70)
+    controller.close()
+    assert backend.level == 70
+    assert [percent for _, percent in backend.calls] == [60, 70]
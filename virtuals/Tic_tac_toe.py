@@ -1,19 +1,16 @@
 import cv2
-from google.protobuf import symbol_database, message_factory
-
-# Patch SymbolDatabase to include GetPrototype
-if not hasattr(symbol_database.Default(), "GetPrototype"):
-    def get_prototype(self, descriptor):
-        return message_factory.MessageFactory().GetPrototype(descriptor)
-    symbol_database.Default().GetPrototype = get_prototype
-
-import mediapipe as mp
 import numpy as np
 import random
+import sys
+from pathlib import Path
 
-# Initialize Mediapipe Hand and Drawing Utils
-mp_hands = mp.solutions.hands
-mp_drawing = mp.solutions.drawing_utils
+# Initialize Mediapipe Hand and Drawing Utils (shared hand service)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from cv_common.capture import open_capture
+from cv_common.frames import FrameBuffers
+from cv_common import profiles, startup, threads
+from cv_common.hands import HandService, mp_hands, mp_drawing
+from cv_common.telemetry import Telemetry
 
 # Desired display size
 display_width = 1280
@@ -165,231 +162,247 @@ def reset_game():
     canvas = np.zeros((display_height, display_width, 3), dtype=np.uint8)
     previous_x, previous_y = None, None
 
-# Initialize video capture
-video = cv2.VideoCapture(0)
-video.set(cv2.CAP_PROP_FRAME_WIDTH, display_width)
-video.set(cv2.CAP_PROP_FRAME_HEIGHT, display_height)
+if __name__ == "__main__":
+    profiles.apply()
+    threads.apply()
+    # Start loading MediaPipe in the background while the camera opens.
+    # Smoothed, latency-compensated landmarks keep the drawn strokes steady.
+    hand_service = HandService.load(max_num_hands=1, min_detection_confidence=0.8, min_tracking_confidence=0.5,
+                                    smoothing=True)
 
-# Initialize the Hand Tracker
-with mp_hands.Hands(min_detection_confidence=0.8, min_tracking_confidence=0.5) as hands:
+    # Initialize video capture (MJPG, one-frame driver queue, newest frame from a reader thread)
+    video = open_capture(0, width=display_width, height=display_height, threaded=True, resizable=False,
+                         hands_replay=True)
+    buffers = FrameBuffers()
+    telemetry = Telemetry("tic_tac_toe")
+    startup.mark("camera")
+
+    # Initialize the Hand Tracker
+    with hand_service.result() as hands:
+        startup.mark("hands")
     
-    # Symbol selection buttons
-    button_width = 150
-    button_height = 60
-    x_button_pos = (display_width // 2 - button_width - 20, 20)
-    o_button_pos = (display_width // 2 + 20, 20)
+        # Symbol selection buttons
+        button_width = 150
+        button_height = 60
+        x_button_pos = (display_width // 2 - button_width - 20, 20)
+        o_button_pos = (display_width // 2 + 20, 20)
     
-    # Track which cell we're currently in
-    current_cell = None
-
-    while video.isOpened():
-        ret, frame = video.read()
-        if not ret:
-            break
+        # Track which cell we're currently in
+        current_cell = None
 
-        # Flip the frame horizontally for a mirror view
-        frame = cv2.flip(frame, 1)
+        # A replay with CV_HANDS_REPLAY_LOOP=0 ends the game after its last frame
+        while video.isOpened() and not hands.ended:
+            # Mirrored BGR frame to draw on + read-only RGB view for MediaPipe (reused buffers)
+            with telemetry.stage("capture"):
+                ret, image_bgr, image_rgb = buffers.read(video)
+            if not ret:
+                break
 
-        # Convert the BGR image to RGB before processing
-        image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(image_rgb)
-        image_bgr = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
+            with telemetry.stage("inference"):
+                results = hands.process(image_rgb)
+            render_start = telemetry.start()
 
-        # If player hasn't chosen symbol yet
-        if player_symbol is None:
-            cv2.putText(image_bgr, "Choose Your Symbol:", (display_width // 2 - 150, 60), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+            # If player hasn't chosen symbol yet
+            if player_symbol is None:
+                cv2.putText(image_bgr, "Choose Your Symbol:", (display_width // 2 - 150, 60), 
+                            cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
             
-            # Draw X button
-            cv2.rectangle(image_bgr, x_button_pos, 
-                         (x_button_pos[0] + button_width, x_button_pos[1] + button_height), 
-                         (0, 0, 255), -1)
-            cv2.putText(image_bgr, "X", (x_button_pos[0] + 60, x_button_pos[1] + 45), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+                # Draw X button
+                cv2.rectangle(image_bgr, x_button_pos, 
+                             (x_button_pos[0] + button_width, x_button_pos[1] + button_height), 
+                             (0, 0, 255), -1)
+                cv2.putText(image_bgr, "X", (x_button_pos[0] + 60, x_button_pos[1] + 45), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
             
-            # Draw O button
-            cv2.rectangle(image_bgr, o_button_pos, 
-                         (o_button_pos[0] + button_width, o_button_pos[1] + button_height), 
-                         (0, 255, 0), -1)
-            cv2.putText(image_bgr, "O", (o_button_pos[0] + 60, o_button_pos[1] + 45), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+                # Draw O button
+                cv2.rectangle(image_bgr, o_button_pos, 
+                             (o_button_pos[0] + button_width, o_button_pos[1] + button_height), 
+                             (0, 255, 0), -1)
+                cv2.putText(image_bgr, "O", (o_button_pos[0] + 60, o_button_pos[1] + 45), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
             
-            # Check for hand pointing at buttons
-            if results.multi_hand_landmarks:
-                for hand_landmarks in results.multi_hand_landmarks:
-                    index_finger_tip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-                    pixel_coordinates = mp_drawing._normalized_to_pixel_coordinates(
-                        index_finger_tip.x, index_finger_tip.y, display_width, display_height
-                    )
+                # Check for hand pointing at buttons
+                if results.multi_hand_landmarks:
+                    for hand_landmarks in results.multi_hand_landmarks:
+                        index_finger_tip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
+                        pixel_coordinates = mp_drawing._normalized_to_pixel_coordinates(
+                            index_finger_tip.x, index_finger_tip.y, display_width, display_height
+                        )
                     
-                    if pixel_coordinates:
-                        x, y = pixel_coordinates
-                        cv2.circle(image_bgr, (x, y), 10, (255, 0, 255), -1)
+                        if pixel_coordinates:
+                            x, y = pixel_coordinates
+                            cv2.circle(image_bgr, (x, y), 10, (255, 0, 255), -1)
                         
-                        # Check X button
-                        if (x_button_pos[0] <= x <= x_button_pos[0] + button_width and 
-                            x_button_pos[1] <= y <= x_button_pos[1] + button_height):
-                            player_symbol = 'X'
-                            computer_symbol = 'O'
+                            # Check X button
+                            if (x_button_pos[0] <= x <= x_button_pos[0] + button_width and 
+                                x_button_pos[1] <= y <= x_button_pos[1] + button_height):
+                                player_symbol = 'X'
+                                computer_symbol = 'O'
                         
-                        # Check O button
-                        if (o_button_pos[0] <= x <= o_button_pos[0] + button_width and 
-                            o_button_pos[1] <= y <= o_button_pos[1] + button_height):
-                            player_symbol = 'O'
-                            computer_symbol = 'X'
+                            # Check O button
+                            if (o_button_pos[0] <= x <= o_button_pos[0] + button_width and 
+                                o_button_pos[1] <= y <= o_button_pos[1] + button_height):
+                                player_symbol = 'O'
+                                computer_symbol = 'X'
         
-        else:
-            # Draw the game grid on canvas
-            draw_grid(canvas)
+            else:
+                # Draw the game grid on canvas
+                draw_grid(canvas)
             
-            # Display current turn
-            if not game_over:
-                turn_text = f"Your Turn - Draw {player_symbol}" if current_turn == 'player' else f"Computer's Turn ({computer_symbol})"
-                cv2.putText(image_bgr, turn_text, (50, 50), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+                # Display current turn
+                if not game_over:
+                    turn_text = f"Your Turn - Draw {player_symbol}" if current_turn == 'player' else f"Computer's Turn ({computer_symbol})"
+                    cv2.putText(image_bgr, turn_text, (50, 50), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
             
-            # Handle hand detection for player's turn
-            if results.multi_hand_landmarks and current_turn == 'player' and not game_over:
-                for hand_landmarks in results.multi_hand_landmarks:
-                    # Draw hand landmarks
-                    mp_drawing.draw_landmarks(
-                        image_bgr, hand_landmarks,
-                        connections=mp_hands.HAND_CONNECTIONS,
-                        landmark_drawing_spec=mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=5),
-                        connection_drawing_spec=mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2)
-                    )
+                # Handle hand detection for player's turn
+                if results.multi_hand_landmarks and current_turn == 'player' and not game_over:
+                    for hand_landmarks in results.multi_hand_landmarks:
+                        # Draw hand landmarks
+                        mp_drawing.draw_landmarks(
+                            image_bgr, hand_landmarks,
+                            connections=mp_hands.HAND_CONNECTIONS,
+                            landmark_drawing_spec=mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=5),
+                            connection_drawing_spec=mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2)
+                        )
                     
-                    # Get index finger tip
-                    index_finger_tip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-                    pixel_coordinates = mp_drawing._normalized_to_pixel_coordinates(
-                        index_finger_tip.x, index_finger_tip.y, display_width, display_height
-                    )
+                        # Get index finger tip
+                        index_finger_tip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
+                        pixel_coordinates = mp_drawing._normalized_to_pixel_coordinates(
+                            index_finger_tip.x, index_finger_tip.y, display_width, display_height
+                        )
                     
-                    if pixel_coordinates:
-                        x, y = pixel_coordinates
+                        if pixel_coordinates:
+                            x, y = pixel_coordinates
                         
-                        # Get cell position
-                        row, col = get_cell(x, y)
+                            # Get cell position
+                            row, col = get_cell(x, y)
                         
-                        if row is not None and col is not None:
-                            # Highlight the cell
-                            cell_x = grid_offset_x + col * cell_size
-                            cell_y = grid_offset_y + row * cell_size
-                            cv2.rectangle(image_bgr, (cell_x, cell_y), 
-                                        (cell_x + cell_size, cell_y + cell_size), 
-                                        (255, 255, 0), 2)
+                            if row is not None and col is not None:
+                                # Highlight the cell
+                                cell_x = grid_offset_x + col * cell_size
+                                cell_y = grid_offset_y + row * cell_size
+                                cv2.rectangle(image_bgr, (cell_x, cell_y), 
+                                            (cell_x + cell_size, cell_y + cell_size), 
+                                            (255, 255, 0), 2)
                             
-                            # Check if entering a new cell
-                            if current_cell != (row, col):
-                                current_cell = (row, col)
-                                previous_x, previous_y = None, None
+                                # Check if entering a new cell
+                                if current_cell != (row, col):
+                                    current_cell = (row, col)
+                                    previous_x, previous_y = None, None
                             
-                            # Draw if cell is empty
-                            if board[row][col] == '':
-                                # Set drawing color based on player symbol
-                                if player_symbol == 'X':
-                                    draw_color = (0, 0, 255)  # Red for X
-                                else:
-                                    draw_color = (0, 255, 0)  # Green for O
+                                # Draw if cell is empty
+                                if board[row][col] == '':
+                                    # Set drawing color based on player symbol
+                                    if player_symbol == 'X':
+                                        draw_color = (0, 0, 255)  # Red for X
+                                    else:
+                                        draw_color = (0, 255, 0)  # Green for O
                                 
-                                # Draw on canvas with index finger
-                                if previous_x is not None and previous_y is not None:
-                                    cv2.line(canvas, (previous_x, previous_y), (x, y), draw_color, 5)
+                                    # Draw on canvas with index finger
+                                    if previous_x is not None and previous_y is not None:
+                                        cv2.line(canvas, (previous_x, previous_y), (x, y), draw_color, 5)
                                 
-                                previous_x, previous_y = x, y
-                        else:
-                            previous_x, previous_y = None, None
-                            current_cell = None
-            else:
-                previous_x, previous_y = None, None
-                current_cell = None
+                                    previous_x, previous_y = x, y
+                            else:
+                                previous_x, previous_y = None, None
+                                current_cell = None
+                else:
+                    previous_x, previous_y = None, None
+                    current_cell = None
             
-            # Overlay the canvas on the video feed
-            final_output = cv2.addWeighted(image_bgr, 1.0, canvas, 1.0, 0)
+                # Overlay the canvas on the video feed
+                final_output = cv2.add(image_bgr, canvas, dst=image_bgr)
             
-            # Computer's turn
-            if current_turn == 'computer' and not game_over:
-                cv2.imshow("Tic-Tac-Toe with Hand Gestures", final_output)
-                cv2.waitKey(500)  # Delay for visual effect
-                computer_move()
+                # Computer's turn
+                if current_turn == 'computer' and not game_over:
+                    cv2.imshow("Tic-Tac-Toe with Hand Gestures", final_output)
+                    cv2.waitKey(500)  # Delay for visual effect
+                    computer_move()
                 
-                # Draw computer's perfect symbol on canvas
-                for i in range(3):
-                    for j in range(3):
-                        if board[i][j] == computer_symbol:
-                            # Find the newly placed symbol
-                            draw_perfect_symbol(canvas, i, j, computer_symbol)
+                    # Draw computer's perfect symbol on canvas
+                    for i in range(3):
+                        for j in range(3):
+                            if board[i][j] == computer_symbol:
+                                # Find the newly placed symbol
+                                draw_perfect_symbol(canvas, i, j, computer_symbol)
                 
-                winner = check_winner()
-                if winner:
-                    game_over = True
-                else:
-                    current_turn = 'player'
+                    winner = check_winner()
+                    if winner:
+                        game_over = True
+                    else:
+                        current_turn = 'player'
             
-            # Display winner
-            if game_over:
-                if winner == 'Draw':
-                    result_text = "It's a Draw!"
-                    color = (255, 255, 0)
-                elif winner == player_symbol:
-                    result_text = "You Win!"
-                    color = (0, 255, 0)
-                else:
-                    result_text = "Computer Wins!"
-                    color = (0, 0, 255)
+                # Display winner
+                if game_over:
+                    if winner == 'Draw':
+                        result_text = "It's a Draw!"
+                        color = (255, 255, 0)
+                    elif winner == player_symbol:
+                        result_text = "You Win!"
+                        color = (0, 255, 0)
+                    else:
+                        result_text = "Computer Wins!"
+                        color = (0, 0, 255)
                 
-                # Draw semi-transparent background for winner text
-                cv2.rectangle(final_output, (display_width // 2 - 200, display_height - 150), 
-                             (display_width // 2 + 200, display_height - 50), (0, 0, 0), -1)
-                cv2.putText(final_output, result_text, (display_width // 2 - 150, display_height - 100), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 1.5, color, 3)
-                cv2.putText(final_output, "Press 'R' to Reset", (display_width // 2 - 150, display_height - 60), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+                    # Draw semi-transparent background for winner text
+                    cv2.rectangle(final_output, (display_width // 2 - 200, display_height - 150), 
+                                 (display_width // 2 + 200, display_height - 50), (0, 0, 0), -1)
+                    cv2.putText(final_output, result_text, (display_width // 2 - 150, display_height - 100), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 1.5, color, 3)
+                    cv2.putText(final_output, "Press 'R' to Reset", (display_width // 2 - 150, display_height - 60), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
             
-            # Display instructions
-            cv2.putText(final_output, "Draw in empty cells | Press 'C' to clear cell | 'Space' to confirm move", 
-                       (10, display_height - 50), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
-            cv2.putText(final_output, "Press 'Q' to Quit | 'R' to Reset", (10, display_height - 20), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+                # Display instructions
+                cv2.putText(final_output, "Draw in empty cells | Press 'C' to clear cell | 'Space' to confirm move", 
+                           (10, display_height - 50), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+                cv2.putText(final_output, "Press 'Q' to Quit | 'R' to Reset", (10, display_height - 20), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
 
-            # Display the output
-            cv2.imshow("Tic-Tac-Toe with Hand Gestures", final_output)
+                # Display the output
+                telemetry.draw_hud(final_output)
+                cv2.imshow("Tic-Tac-Toe with Hand Gestures", final_output)
         
-        # Only show this screen if not in game yet
-        if player_symbol is None:
-            cv2.imshow("Tic-Tac-Toe with Hand Gestures", image_bgr)
+            # Only show this screen if not in game yet
+            if player_symbol is None:
+                telemetry.draw_hud(image_bgr)
+                cv2.imshow("Tic-Tac-Toe with Hand Gestures", image_bgr)
+            telemetry.stop("render", render_start)
+            telemetry.frame()
 
-        # Handle key presses
-        key = cv2.waitKey(10) & 0xFF
-        if key == ord('q'):
-            break
-        elif key == ord('r'):
-            reset_game()
-        elif key == ord(' ') and current_turn == 'player' and not game_over and current_cell is not None:
-            # Confirm move with spacebar - transform drawing to perfect symbol
-            row, col = current_cell
-            if board[row][col] == '':
-                # Clear the hand-drawn content in this cell
-                clear_cell_on_canvas(row, col)
+            # Handle key presses
+            key = cv2.waitKey(10) & 0xFF
+            telemetry.handle_key(key)
+            if key == ord('q'):
+                break
+            elif key == ord('r'):
+                reset_game()
+            elif key == ord(' ') and current_turn == 'player' and not game_over and current_cell is not None:
+                # Confirm move with spacebar - transform drawing to perfect symbol
+                row, col = current_cell
+                if board[row][col] == '':
+                    # Clear the hand-drawn content in this cell
+                    clear_cell_on_canvas(row, col)
                 
-                # Draw perfect symbol
-                draw_perfect_symbol(canvas, row, col, player_symbol)
+                    # Draw perfect symbol
+                    draw_perfect_symbol(canvas, row, col, player_symbol)
                 
-                # Update board
-                board[row][col] = player_symbol
-                current_turn = 'computer'
-                winner = check_winner()
-                if winner:
-                    game_over = True
-                previous_x, previous_y = None, None
-                current_cell = None
-        elif key == ord('c') and current_turn == 'player' and not game_over and current_cell is not None:
-            # Clear current cell with 'c' key
-            row, col = current_cell
-            if board[row][col] == '':
-                clear_cell_on_canvas(row, col)
-                previous_x, previous_y = None, None
+                    # Update board
+                    board[row][col] = player_symbol
+                    current_turn = 'computer'
+                    winner = check_winner()
+                    if winner:
+                        game_over = True
+                    previous_x, previous_y = None, None
+                    current_cell = None
+            elif key == ord('c') and current_turn == 'player' and not game_over and current_cell is not None:
+                # Clear current cell with 'c' key
+                row, col = current_cell
+                if board[row][col] == '':
+                    clear_cell_on_canvas(row, col)
+                    previous_x, previous_y = None, None
 
-# Release video capture object and close display windows
-video.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+    # Release video capture object and close display windows
+    telemetry.close()
+    video.release()
+    cv2.destroyAllWindows()
@@ -1,50 +1,68 @@
 import cv2
-from google.protobuf import symbol_database, message_factory
-
-# Patch SymbolDatabase to include GetPrototype
-if not hasattr(symbol_database.Default(), "GetPrototype"):
-    def get_prototype(self, descriptor):
-        return message_factory.MessageFactory().GetPrototype(descriptor)
-    symbol_database.Default().GetPrototype = get_prototype
-
-import mediapipe as mp
 import numpy as np
-from ctypes import cast, POINTER
-from comtypes import CLSCTX_ALL
-from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from cv_common.audio_backends import select_backend
+from cv_common.capture import open_capture
+from cv_common.frames import FrameBuffers
+from cv_common import profiles, startup, threads
+from cv_common.hands import HandService, mp_hands, mp_drawing
+from cv_common.pinch import PinchCalibrator, pinch_ratio
+from cv_common.telemetry import Telemetry
+from cv_common.volume import VolumeController
+
+profiles.apply()
+threads.apply()
+
+# MediaPipe loads in the background while audio and the camera are set up.
+# Landmarks are smoothed (and predicted ahead by the pipeline latency) in the
+# service, so the pinch ratio needs no filter of its own.
+hand_service = HandService.load(max_num_hands=1, min_detection_confidence=0.8, min_tracking_confidence=0.5,
+                                smoothing=True)
 
 # ===================== AUDIO SETUP (ONCE) =====================
-devices = AudioUtilities.GetSpeakers()
-interface = devices.Activate(
-    IAudioEndpointVolume._iid_,
-    CLSCTX_ALL,
-    None
-)
-volume = cast(interface, POINTER(IAudioEndpointVolume))
-
-min_vol, max_vol, _ = volume.GetVolumeRange()
-
-# ===================== MEDIAPIPE SETUP =====================
-mp_hands = mp.solutions.hands
-mp_drawing = mp.solutions.drawing_utils
-
-cap = cv2.VideoCapture(0)
+# Backend chosen at runtime (CV_AUDIO_BACKEND=auto|pycaw|pulse|alsa|mock)
+audio_backend = select_backend()
+print(f"Audio backend: {audio_backend.name}")
+
+# OS calls are coalesced and rate-limited, only sent when the whole-percent value changes
+volume = VolumeController(audio_backend)
+
+# ===================== PINCH SETUP =====================
+# Pinch is measured relative to hand size, so it doesn't depend on camera distance.
+# CV_PINCH_3D=1 also uses MediaPipe's relative depth.
+use_z = os.environ.get("CV_PINCH_3D", "0") == "1"
+
+# Per-user range of the pinch ratio, refined while the user plays
+calibration_path = Path.home() / ".having_fun_cv" / "pinch_calibration.json"
+calibrator = PinchCalibrator()
+calibrator.load(calibration_path)
+
+# ===================== CAMERA SETUP =====================
+# Newest frame from a reader thread, so the volume follows the hand without a backlog
+cap = open_capture(0, threaded=True, hands_replay=True)
+buffers = FrameBuffers()
+telemetry = Telemetry("volume_control")
+startup.mark("camera")
 
 # ===================== MAIN LOOP =====================
-with mp_hands.Hands(
-    min_detection_confidence=0.8,
-    min_tracking_confidence=0.5
-) as hands:
+with hand_service.result() as hands:
+    startup.mark("hands")
 
-    while cap.isOpened():
-        ret, frame = cap.read()
+    # A replay with CV_HANDS_REPLAY_LOOP=0 stops after its last frame
+    while cap.isOpened() and not hands.ended:
+        with telemetry.stage("capture"):
+            ret, frame, rgb = buffers.read(cap)
         if not ret:
             break
 
-        frame = cv2.flip(frame, 1)
         h, w, _ = frame.shape
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(rgb)
+        with telemetry.stage("inference"):
+            results = hands.process(rgb)
+        render_start = telemetry.start()
 
         if results.multi_hand_landmarks:
             for hand_landmarks in results.multi_hand_landmarks:
@@ -54,51 +72,63 @@ with mp_hands.Hands(
                     mp_hands.HAND_CONNECTIONS
                 )
 
-                # Thumb & index
-                thumb = hand_landmarks.landmark[
-                    mp_hands.HandLandmark.THUMB_TIP
-                ]
-                index = hand_landmarks.landmark[
-                    mp_hands.HandLandmark.INDEX_FINGER_TIP
-                ]
-
-                x1, y1 = int(thumb.x * w), int(thumb.y * h)
-                x2, y2 = int(index.x * w), int(index.y * h)
-
-                cv2.circle(frame, (x1, y1), 8, (255, 0, 0), -1)
-                cv2.circle(frame, (x2, y2), 8, (255, 0, 0), -1)
-                cv2.line(frame, (x1, y1), (x2, y2), (0, 255, 0), 3)
-
-                # Distance
-                distance = np.hypot(x2 - x1, y2 - y1)
-                distance = np.clip(distance, 30, 250)
-
-                # Convert distance → volume
-                vol_db = np.interp(distance, [30, 250], [min_vol, max_vol])
-                volume.SetMasterVolumeLevel(vol_db, None)
-
-                # UI values
-                vol_percent = int(np.interp(distance, [30, 250], [0, 100]))
-                vol_bar = np.interp(vol_percent, [0, 100], [400, 150])
-
-                # Volume bar
-                cv2.rectangle(frame, (50, 150), (85, 400), (0, 255, 0), 2)
-                cv2.rectangle(frame, (50, int(vol_bar)), (85, 400), (0, 255, 0), -1)
-
-                cv2.putText(
-                    frame,
-                    f'Volume: {vol_percent}%',
-                    (40, 430),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.8,
-                    (255, 255, 255),
-                    2
-                )
-
+            # The first detected hand drives the volume
+            hand_landmarks = results.multi_hand_landmarks[0]
+
+            # Thumb & index
+            thumb = hand_landmarks.landmark[
+                mp_hands.HandLandmark.THUMB_TIP
+            ]
+            index = hand_landmarks.landmark[
+                mp_hands.HandLandmark.INDEX_FINGER_TIP
+            ]
+
+            x1, y1 = int(thumb.x * w), int(thumb.y * h)
+            x2, y2 = int(index.x * w), int(index.y * h)
+
+            cv2.circle(frame, (x1, y1), 8, (255, 0, 0), -1)
+            cv2.circle(frame, (x2, y2), 8, (255, 0, 0), -1)
+            cv2.line(frame, (x1, y1), (x2, y2), (0, 255, 0), 3)
+
+            # Pinch relative to hand size (from smoothed landmarks)
+            ratio = pinch_ratio(hand_landmarks, aspect=w / h, use_z=use_z)
+            if ratio is not None:
+                calibrator.update(ratio)
+
+                # Convert pinch → volume (pushed to the OS by the controller thread)
+                volume.set(100.0 * calibrator.normalize(ratio))
+            vol_percent = volume.target or 0
+
+            # UI values
+            vol_bar = np.interp(vol_percent, [0, 100], [400, 150])
+
+            # Volume bar
+            cv2.rectangle(frame, (50, 150), (85, 400), (0, 255, 0), 2)
+            cv2.rectangle(frame, (50, int(vol_bar)), (85, 400), (0, 255, 0), -1)
+
+            cv2.putText(
+                frame,
+                f'Volume: {vol_percent}%',
+                (40, 430),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.8,
+                (255, 255, 255),
+                2
+            )
+
+        telemetry.draw_hud(frame)
         cv2.imshow("Gesture Volume Control", frame)
+        telemetry.stop("render", render_start)
+        telemetry.frame()
 
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'):
             break
+        telemetry.handle_key(key)
 
+telemetry.close()
+volume.close()
+calibrator.save(calibration_path)
+print(f"Volume updates sent: {volume.updates_sent} ({volume.rate():.1f}/s)")
 cap.release()
 cv2.destroyAllWindows()
@@ -1,20 +1,19 @@
 import cv2
-from google.protobuf import symbol_database, message_factory
-
-# Patch SymbolDatabase to include GetPrototype
-if not hasattr(symbol_database.Default(), "GetPrototype"):
-    def get_prototype(self, descriptor):    
-        return message_factory.MessageFactory().GetPrototype(descriptor)
-    symbol_database.Default().GetPrototype = get_prototype
-
-import mediapipe as mp
 import numpy as np
 import random
 import json
-
-# Initialize Mediapipe Hand and Drawing Utils
-mp_hands = mp.solutions.hands
-mp_drawing = mp.solutions.drawing_utils
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from cv_common.capture import open_capture
+from cv_common.dwell import Debouncer, DwellButton
+from cv_common.frames import FrameBuffers
+from cv_common import profiles, startup, threads
+from cv_common.gestures import GestureDetector
+from cv_common.hands import HandService, mp_hands, mp_drawing
+from cv_common.telemetry import Telemetry
 
 # Desired display size
 display_width = 1280
@@ -82,10 +81,25 @@ clear_button = {"x": 80, "y": display_height - 120, "width": 150, "height": 60,
 submit_button = {"x": 280, "y": display_height - 120, "width": 150, "height": 60, "text": "SUBMIT"}
 next_button = {"x": display_width - 200, "y": 30, "width": 150, "height": 60, "text": "NEXT"}  # Moved to top right
 
-# Debounce variables
-last_key_pressed = None
-key_press_cooldown = 0
-cooldown_frames = 15
+# Dwell/debounce settings (seconds, independent of frame rate)
+key_dwell_time = 0.35
+button_dwell_time = 0.6
+press_cooldown = 0.5
+
+# Dwell-to-click widgets
+key_buttons = {}
+for i, row in enumerate(keyboard_keys):
+    for j, key in enumerate(row):
+        key_buttons[key] = DwellButton(keyboard_start_x + j * (key_size + key_padding),
+                                       keyboard_start_y + i * (key_size + key_padding),
+                                       key_size, key_size, dwell_time=key_dwell_time)
+clear_dwell = DwellButton.from_rect(clear_button, dwell_time=button_dwell_time)
+submit_dwell = DwellButton.from_rect(submit_button, dwell_time=button_dwell_time)
+next_dwell = DwellButton.from_rect(next_button, dwell_time=button_dwell_time)
+press_debounce = Debouncer(press_cooldown)
+
+# After answering, a left swipe moves on without dwelling on NEXT
+swipe_detector = GestureDetector(aspect=display_width / display_height)
 
 def get_new_riddle():
     """Get a random riddle"""
@@ -141,184 +155,171 @@ def draw_special_buttons(frame):
         cv2.putText(frame, next_button["text"], (next_button["x"] + 35, next_button["y"] + 40), 
                    cv2.FONT_HERSHEY_SIMPLEX, 1.1, (255, 255, 255), 2)
 
-def detect_key(x, y):
-    """Detect which key is being pointed at"""
-    for i, row in enumerate(keyboard_keys):
-        for j, key in enumerate(row):
-            key_x = keyboard_start_x + j * (key_size + key_padding)
-            key_y = keyboard_start_y + i * (key_size + key_padding)
-            if key_x < x < key_x + key_size and key_y < y < key_y + key_size:
-                return key
-    return None
-
-def detect_special_button(x, y):
-    """Detect if pointing at special buttons"""
-    # Check clear button
-    if (clear_button["x"] < x < clear_button["x"] + clear_button["width"] and 
-        clear_button["y"] < y < clear_button["y"] + clear_button["height"]):
-        return "CLEAR"
-    
-    # Check submit button
-    if (submit_button["x"] < x < submit_button["x"] + submit_button["width"] and 
-        submit_button["y"] < y < submit_button["y"] + submit_button["height"]):
-        return "SUBMIT"
-    
-    # Check next button (now in top right)
-    if (game_state in ["correct", "wrong"] and 
-        next_button["x"] < x < next_button["x"] + next_button["width"] and 
-        next_button["y"] < y < next_button["y"] + next_button["height"]):
-        return "NEXT"
-    
-    return None
-
 def check_answer(user_answer, correct_answer):
     """Check if the answer is correct"""
     return user_answer.upper().strip() == correct_answer.upper().strip()
 
-# Initialize video capture
-video = cv2.VideoCapture(0)
-video.set(cv2.CAP_PROP_FRAME_WIDTH, display_width)
-video.set(cv2.CAP_PROP_FRAME_HEIGHT, display_height)
-
-# Get first riddle
-current_riddle = get_new_riddle()
-current_answer = current_riddle["answer"]
-
-# Initialize the Hand Tracker
-with mp_hands.Hands(min_detection_confidence=0.8, min_tracking_confidence=0.5) as hands:
-    while video.isOpened():
-        ret, frame = video.read()
-        if not ret:
-            break
-
-        # Flip the frame horizontally for a mirror view
-        frame = cv2.flip(frame, 1)
-
-        # Convert the BGR image to RGB before processing
-        image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(image_rgb)
-        image_bgr = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
-
-        # Decrease cooldown
-        if key_press_cooldown > 0:
-            key_press_cooldown -= 1
-
-        # Draw background for riddle area
-        cv2.rectangle(image_bgr, (20, 20), (display_width - 20, 180), (50, 50, 50), -1)
-        cv2.rectangle(image_bgr, (20, 20), (display_width - 20, 180), (255, 255, 255), 2)
-
-        # Display riddle
-        riddle_text = current_riddle["sentence"]
-        # Split text if too long
-        words = riddle_text.split()
-        line1 = ""
-        line2 = ""
-        for word_text in words:
-            if len(line1 + word_text) < 50:
-                line1 += word_text + " "
-            else:
-                line2 += word_text + " "
+if __name__ == "__main__":
+    profiles.apply()
+    threads.apply()
+    # Start loading MediaPipe in the background while the camera opens
+    # Smoothed, latency-compensated fingertip for steadier key selection
+    hand_service = HandService.load(max_num_hands=1, min_detection_confidence=0.8, min_tracking_confidence=0.5,
+                                    smoothing=True)
+
+    # Initialize video capture (MJPG, one-frame driver queue, newest frame from a reader thread)
+    video = open_capture(0, width=display_width, height=display_height, threaded=True, resizable=False,
+                         hands_replay=True)
+    buffers = FrameBuffers()
+    telemetry = Telemetry("guessing_game")
+    startup.mark("camera")
+
+    # Get first riddle
+    current_riddle = get_new_riddle()
+    current_answer = current_riddle["answer"]
+
+    # Initialize the Hand Tracker
+    with hand_service.result() as hands:
+        startup.mark("hands")
+        # A replay with CV_HANDS_REPLAY_LOOP=0 ends the game after its last frame
+        while video.isOpened() and not hands.ended:
+            # Mirrored BGR frame to draw on + read-only RGB view for MediaPipe (reused buffers)
+            with telemetry.stage("capture"):
+                ret, image_bgr, image_rgb = buffers.read(video)
+            if not ret:
+                break
+
+            with telemetry.stage("inference"):
+                results = hands.process(image_rgb)
+            render_start = telemetry.start()
+
+            # Draw background for riddle area
+            cv2.rectangle(image_bgr, (20, 20), (display_width - 20, 180), (50, 50, 50), -1)
+            cv2.rectangle(image_bgr, (20, 20), (display_width - 20, 180), (255, 255, 255), 2)
+
+            # Display riddle
+            riddle_text = current_riddle["sentence"]
+            # Split text if too long
+            words = riddle_text.split()
+            line1 = ""
+            line2 = ""
+            for word_text in words:
+                if len(line1 + word_text) < 50:
+                    line1 += word_text + " "
+                else:
+                    line2 += word_text + " "
         
-        cv2.putText(image_bgr, line1, (40, 70), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-        if line2:
-            cv2.putText(image_bgr, line2, (40, 110), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-
-        # Display score
-        cv2.putText(image_bgr, f"Score: {score}/{total_questions}", (40, 150), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
-
-        # Display user's typed word
-        cv2.rectangle(image_bgr, (20, 200), (display_width - 20, 280), (40, 40, 40), -1)
-        cv2.rectangle(image_bgr, (20, 200), (display_width - 20, 280), (255, 255, 255), 2)
-        cv2.putText(image_bgr, f"Your Answer: {word}", (40, 250), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 0), 3)
-
-        # Display feedback message
-        if game_state == "correct":
-            cv2.rectangle(image_bgr, (display_width // 2 - 200, 300), 
-                         (display_width // 2 + 200, 380), (0, 200, 0), -1)
-            cv2.putText(image_bgr, "CORRECT!", (display_width // 2 - 120, 350), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
-        elif game_state == "wrong":
-            cv2.rectangle(image_bgr, (display_width // 2 - 250, 300), 
-                         (display_width // 2 + 250, 420), (0, 0, 200), -1)
-            cv2.putText(image_bgr, "WRONG!", (display_width // 2 - 100, 340), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
-            cv2.putText(image_bgr, f"Answer: {current_answer}", (display_width // 2 - 200, 400), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-
-        # Draw keyboard and buttons
-        draw_keyboard(image_bgr)
-        draw_special_buttons(image_bgr)
-
-        # Hand detection
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                # Draw hand landmarks
-                mp_drawing.draw_landmarks(
-                    image_bgr, hand_landmarks,
-                    connections=mp_hands.HAND_CONNECTIONS,
-                    landmark_drawing_spec=mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=4),
-                    connection_drawing_spec=mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2)
-                )
-
-                # Get index finger tip
-                index_finger_tip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-                index_pixel = mp_drawing._normalized_to_pixel_coordinates(
-                    index_finger_tip.x, index_finger_tip.y, display_width, display_height
-                )
-
-                if index_pixel and key_press_cooldown == 0:
-                    current_x, current_y = index_pixel
-                    
-                    # Draw pointer
-                    cv2.circle(image_bgr, (current_x, current_y), 15, (255, 0, 255), -1)
-
-                    # Check for special button press
-                    special_btn = detect_special_button(current_x, current_y)
-                    if special_btn == "CLEAR":
-                        word = ""
-                        key_press_cooldown = cooldown_frames
-                    elif special_btn == "SUBMIT" and game_state == "playing":
-                        total_questions += 1
-                        if check_answer(word, current_answer):
-                            game_state = "correct"
-                            score += 1
-                        else:
-                            game_state = "wrong"
-                        key_press_cooldown = cooldown_frames
-                    elif special_btn == "NEXT" and game_state in ["correct", "wrong"]:
-                        # Get new riddle
-                        current_riddle = get_new_riddle()
-                        current_answer = current_riddle["answer"]
-                        word = ""
-                        game_state = "playing"
-                        key_press_cooldown = cooldown_frames
-                    
-                    # Check for keyboard key press
-                    if game_state == "playing":
-                        key = detect_key(current_x, current_y)
-                        if key and key != last_key_pressed:
-                            word += key
-                            last_key_pressed = key
-                            key_press_cooldown = cooldown_frames
-
-        # Reset last key if cooldown is active
-        if key_press_cooldown == 0:
-            last_key_pressed = None
-
-        # Display instructions
-        cv2.putText(image_bgr, "Point at keys to type | CLEAR to erase | SUBMIT to check answer", 
-                   (30, display_height - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 1)
-
-        # Display the output
-        cv2.imshow("Word Guessing Game with Hand Gestures", image_bgr)
-
-        # Break the loop if 'q' is pressed
-        key_pressed = cv2.waitKey(10) & 0xFF
-        if key_pressed == ord('q'):
-            break
-
-# Release video capture object and close display windows
-video.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+            cv2.putText(image_bgr, line1, (40, 70), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+            if line2:
+                cv2.putText(image_bgr, line2, (40, 110), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+
+            # Display score
+            cv2.putText(image_bgr, f"Score: {score}/{total_questions}", (40, 150), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
+
+            # Display user's typed word
+            cv2.rectangle(image_bgr, (20, 200), (display_width - 20, 280), (40, 40, 40), -1)
+            cv2.rectangle(image_bgr, (20, 200), (display_width - 20, 280), (255, 255, 255), 2)
+            cv2.putText(image_bgr, f"Your Answer: {word}", (40, 250), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 0), 3)
+
+            # Display feedback message
+            if game_state == "correct":
+                cv2.rectangle(image_bgr, (display_width // 2 - 200, 300), 
+                             (display_width // 2 + 200, 380), (0, 200, 0), -1)
+                cv2.putText(image_bgr, "CORRECT!", (display_width // 2 - 120, 350), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+            elif game_state == "wrong":
+                cv2.rectangle(image_bgr, (display_width // 2 - 250, 300), 
+                             (display_width // 2 + 250, 420), (0, 0, 200), -1)
+                cv2.putText(image_bgr, "WRONG!", (display_width // 2 - 100, 340), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+                cv2.putText(image_bgr, f"Answer: {current_answer}", (display_width // 2 - 200, 400), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+
+            # Draw keyboard and buttons
+            draw_keyboard(image_bgr)
+            draw_special_buttons(image_bgr)
+
+            # Hand detection
+            pointer = None
+            if results.multi_hand_landmarks:
+                for hand_landmarks in results.multi_hand_landmarks:
+                    # Draw hand landmarks
+                    mp_drawing.draw_landmarks(
+                        image_bgr, hand_landmarks,
+                        connections=mp_hands.HAND_CONNECTIONS,
+                        landmark_drawing_spec=mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=4),
+                        connection_drawing_spec=mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2)
+                    )
+
+                    # Get index finger tip
+                    index_finger_tip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
+                    index_pixel = mp_drawing._normalized_to_pixel_coordinates(
+                        index_finger_tip.x, index_finger_tip.y, display_width, display_height
+                    )
+
+                    if index_pixel:
+                        pointer = index_pixel
+
+                        # Draw pointer
+                        cv2.circle(image_bgr, pointer, 15, (255, 0, 255), -1)
+
+            # Feed every widget each frame so dwell state decays when the pointer leaves;
+            # during the debounce window dwells keep timing but hold their click back,
+            # so a click is never swallowed and a key only repeats once the finger leaves it
+            now = time.monotonic()
+            swipe = swipe_detector.update(results.multi_hand_landmarks[0] if results.multi_hand_landmarks else None, now)
+            ready = press_debounce.ready(now)
+            playing = game_state == "playing"
+            clear_clicked = clear_dwell.update(pointer, now, armed=ready)
+            submit_clicked = submit_dwell.update(pointer if playing else None, now, armed=ready)
+            next_clicked = next_dwell.update(None if playing else pointer, now, armed=ready)
+            next_clicked = next_clicked or (swipe == "swipe_left" and not playing)
+            typed_key = None
+            for key, button in key_buttons.items():
+                if button.update(pointer if playing else None, now, armed=ready):
+                    typed_key = key
+
+            if clear_clicked and press_debounce.trigger(now):
+                word = ""
+            elif submit_clicked and press_debounce.trigger(now):
+                total_questions += 1
+                if check_answer(word, current_answer):
+                    game_state = "correct"
+                    score += 1
+                else:
+                    game_state = "wrong"
+            elif next_clicked and press_debounce.trigger(now):
+                # Get new riddle
+                current_riddle = get_new_riddle()
+                current_answer = current_riddle["answer"]
+                word = ""
+                game_state = "playing"
+            elif typed_key and press_debounce.trigger(now):
+                word += typed_key
+
+            # Dwell progress rings
+            for button in [clear_dwell, submit_dwell, next_dwell, *key_buttons.values()]:
+                button.draw_progress(image_bgr)
+
+            # Display instructions
+            cv2.putText(image_bgr, "Point at keys to type | CLEAR to erase | SUBMIT to check answer", 
+                       (30, display_height - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 1)
+
+            # Display the output
+            telemetry.draw_hud(image_bgr)
+            cv2.imshow("Word Guessing Game with Hand Gestures", image_bgr)
+            telemetry.stop("render", render_start)
+            telemetry.frame()
+
+            # Break the loop if 'q' is pressed
+            key_pressed = cv2.waitKey(10) & 0xFF
+            if key_pressed == ord('q'):
+                break
+            telemetry.handle_key(key_pressed)
+
+    # Release video capture object and close display windows
+    telemetry.close()
+    video.release()
+    cv2.destroyAllWindows()
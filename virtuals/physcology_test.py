@@ -1,20 +1,16 @@
 import cv2
-from google.protobuf import symbol_database, message_factory
+import sys
+import time
+from pathlib import Path
 
-# Patch SymbolDatabase to include GetPrototype
-if not hasattr(symbol_database.Default(), "GetPrototype"):
-    def get_prototype(self, descriptor):
-        return message_factory.MessageFactory().GetPrototype(descriptor)
-    symbol_database.Default().GetPrototype = get_prototype
-
-import mediapipe as mp
-
-mp_hands = mp.solutions.hands
-mp_draw = mp.solutions.drawing_utils
-
-cap = cv2.VideoCapture(0)
-cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from cv_common.capture import open_capture
+from cv_common.dwell import Debouncer, Dwell, DwellButton
+from cv_common.frames import FrameBuffers
+from cv_common import profiles, startup, threads
+from cv_common.gestures import GestureDetector
+from cv_common.hands import HandService, mp_hands, mp_drawing as mp_draw
+from cv_common.telemetry import Telemetry
 
 # Questions for the psychology game
 questions = [
@@ -39,9 +35,14 @@ answered_gesture = None  # Track what gesture was detected
 # Next button (top-right corner)
 next_button = {"x": 1050, "y": 30, "width": 200, "height": 80, "text": "NEXT"}
 
-# Cooldown for gestures
-gesture_cooldown = 0
-cooldown_frames = 30
+# Dwell/debounce for gestures (seconds, independent of frame rate)
+next_dwell = DwellButton.from_rect(next_button, dwell_time=0.8)
+thumb_up_hold = Dwell(0.3)
+thumb_down_hold = Dwell(0.3)
+gesture_debounce = Debouncer(1.0)
+
+# A left swipe is a quicker alternative to dwelling on NEXT
+swipe_detector = GestureDetector(aspect=1280 / 720)
 
 def is_thumb_up(hand_landmarks, handedness):
     """Check if thumb is pointing up"""
@@ -101,13 +102,6 @@ def is_thumb_down(hand_landmarks, handedness):
     
     return thumb_extended and fingers_folded
 
-def detect_next_button(x, y):
-    """Detect if pointing at next button"""
-    if (next_button["x"] < x < next_button["x"] + next_button["width"] and 
-        next_button["y"] < y < next_button["y"] + next_button["height"]):
-        return True
-    return False
-
 def draw_next_button(frame, hover=False):
     """Draw the NEXT button with transparency"""
     overlay = frame.copy()
@@ -155,139 +149,167 @@ def analyze_personality(answers):
     
     return result
 
-with mp_hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7) as hands:
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
+if __name__ == "__main__":
+    profiles.apply()
+    threads.apply()
+    # MediaPipe loads in the background while the camera opens
+    hand_service = HandService.load(max_num_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.7)
+
+    # MJPG at 1280x720 (the layout's size in every profile) with a one-frame driver queue, read on its own thread
+    cap = open_capture(0, width=1280, height=720, threaded=True, resizable=False, hands_replay=True)
+    buffers = FrameBuffers()
+    telemetry = Telemetry("psychology_test")
+    startup.mark("camera")
 
-        frame = cv2.flip(frame, 1)
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(rgb)
+    with hand_service.result() as hands:
+        startup.mark("hands")
+        # A replay with CV_HANDS_REPLAY_LOOP=0 ends the test after its last frame
+        while not hands.ended:
+            with telemetry.stage("capture"):
+                ret, frame, rgb = buffers.read(cap)
+            if not ret:
+                break
 
-        if gesture_cooldown > 0:
-            gesture_cooldown -= 1
+            with telemetry.stage("inference"):
+                results = hands.process(rgb)
+            render_start = telemetry.start()
 
-        # Draw UI
-        if game_state == "results":
-            overlay = frame.copy()
-            cv2.rectangle(overlay, (50, 50), (1230, 670), (50, 50, 50), -1)
-            cv2.addWeighted(overlay, 0.85, frame, 0.15, 0, frame)
-            cv2.rectangle(frame, (50, 50), (1230, 670), (255, 255, 255), 3)
+            # Draw UI
+            if game_state == "results":
+                overlay = frame.copy()
+                cv2.rectangle(overlay, (50, 50), (1230, 670), (50, 50, 50), -1)
+                cv2.addWeighted(overlay, 0.85, frame, 0.15, 0, frame)
+                cv2.rectangle(frame, (50, 50), (1230, 670), (255, 255, 255), 3)
             
-            cv2.putText(frame, "PERSONALITY ASSESSMENT RESULTS", (150, 120), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 255), 3)
+                cv2.putText(frame, "PERSONALITY ASSESSMENT RESULTS", (150, 120), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 255), 3)
             
-            result_text = analyze_personality(answers)
-            lines = result_text.split('\n')
-            y_pos = 220
-            for i, line in enumerate(lines):
-                if i == 0:
-                    cv2.putText(frame, line, (150, y_pos), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 1.3, (255, 255, 0), 3)
-                else:
-                    cv2.putText(frame, line, (150, y_pos), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 255, 255), 2)
-                y_pos += 70
+                result_text = analyze_personality(answers)
+                lines = result_text.split('\n')
+                y_pos = 220
+                for i, line in enumerate(lines):
+                    if i == 0:
+                        cv2.putText(frame, line, (150, y_pos), 
+                                   cv2.FONT_HERSHEY_SIMPLEX, 1.3, (255, 255, 0), 3)
+                    else:
+                        cv2.putText(frame, line, (150, y_pos), 
+                                   cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 255, 255), 2)
+                    y_pos += 70
             
-            cv2.putText(frame, "Press 'R' to restart or 'Q' to quit", (300, 630), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (200, 200, 200), 2)
-        else:
-            overlay = frame.copy()
-            cv2.rectangle(overlay, (30, 30), (1250, 250), (50, 50, 50), -1)
-            cv2.addWeighted(overlay, 0.75, frame, 0.25, 0, frame)
-            cv2.rectangle(frame, (30, 30), (1250, 250), (255, 255, 255), 3)
+                cv2.putText(frame, "Press 'R' to restart or 'Q' to quit", (300, 630), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 1, (200, 200, 200), 2)
+            else:
+                overlay = frame.copy()
+                cv2.rectangle(overlay, (30, 30), (1250, 250), (50, 50, 50), -1)
+                cv2.addWeighted(overlay, 0.75, frame, 0.25, 0, frame)
+                cv2.rectangle(frame, (30, 30), (1250, 250), (255, 255, 255), 3)
             
-            cv2.putText(frame, f"Question {current_question_idx + 1}/10", (50, 80), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
+                cv2.putText(frame, f"Question {current_question_idx + 1}/10", (50, 80), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
             
-            question_text = questions[current_question_idx]
-            words = question_text.split()
-            line1 = ""
-            line2 = ""
-            for word in words:
-                if len(line1) < 60:
-                    line1 += word + " "
-                else:
-                    line2 += word + " "
+                question_text = questions[current_question_idx]
+                words = question_text.split()
+                line1 = ""
+                line2 = ""
+                for word in words:
+                    if len(line1) < 60:
+                        line1 += word + " "
+                    else:
+                        line2 += word + " "
             
-            cv2.putText(frame, line1, (50, 140), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 255, 255), 2)
-            if line2:
-                cv2.putText(frame, line2, (50, 190), 
+                cv2.putText(frame, line1, (50, 140), 
                            cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 255, 255), 2)
+                if line2:
+                    cv2.putText(frame, line2, (50, 190), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 255, 255), 2)
             
-            cv2.putText(frame, "Thumbs UP = OK  |  Thumbs DOWN = Not OK", (350, 300), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.9, (200, 200, 200), 2)
-            
-            if game_state == "answered":
-                if answered_gesture == "OK":
-                    cv2.putText(frame, "Your Answer: OK", (500, 400), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 0), 4)
-                else:
-                    cv2.putText(frame, "Your Answer: NOT OK", (450, 400), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 255), 4)
-                cv2.putText(frame, "Click NEXT to continue", (470, 550), 
+                cv2.putText(frame, "Thumbs UP = OK  |  Thumbs DOWN = Not OK", (350, 300), 
                            cv2.FONT_HERSHEY_SIMPLEX, 0.9, (200, 200, 200), 2)
+            
+                if game_state == "answered":
+                    if answered_gesture == "OK":
+                        cv2.putText(frame, "Your Answer: OK", (500, 400), 
+                                   cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 0), 4)
+                    else:
+                        cv2.putText(frame, "Your Answer: NOT OK", (450, 400), 
+                                   cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 255), 4)
+                    cv2.putText(frame, "Click NEXT or swipe left to continue", (400, 550), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.9, (200, 200, 200), 2)
 
-        hover_next = False
-        thumbs_up_detected = False
-        thumbs_down_detected = False
+            pointer = None
+            thumbs_up_detected = False
+            thumbs_down_detected = False
+            now = time.monotonic()
+            swipe = swipe_detector.update(results.multi_hand_landmarks[0] if results.multi_hand_landmarks else None, now)
         
-        if results.multi_hand_landmarks and results.multi_handedness:
-            for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
-                mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-                
-                index_finger_tip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-                h, w, _ = frame.shape
-                index_x = int(index_finger_tip.x * w)
-                index_y = int(index_finger_tip.y * h)
+            if results.multi_hand_landmarks and results.multi_handedness:
+                for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
+                    mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
                 
-                cv2.circle(frame, (index_x, index_y), 15, (255, 0, 255), -1)
+                    index_finger_tip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
+                    h, w, _ = frame.shape
+                    index_x = int(index_finger_tip.x * w)
+                    index_y = int(index_finger_tip.y * h)
+                    pointer = (index_x, index_y)
                 
-                if detect_next_button(index_x, index_y):
-                    hover_next = True
-                    if game_state == "answered" and gesture_cooldown == 0:
-                        current_question_idx += 1
-                        if current_question_idx >= len(questions):
-                            game_state = "results"
-                        else:
-                            game_state = "question"
-                            answered_gesture = None
-                        gesture_cooldown = cooldown_frames
+                    cv2.circle(frame, (index_x, index_y), 15, (255, 0, 255), -1)
                 
-                if game_state == "question" and gesture_cooldown == 0:
-                    if is_thumb_up(hand_landmarks, handedness):
-                        thumbs_up_detected = True
-                    elif is_thumb_down(hand_landmarks, handedness):
-                        thumbs_down_detected = True
+                    if game_state == "question":
+                        if is_thumb_up(hand_landmarks, handedness):
+                            thumbs_up_detected = True
+                        elif is_thumb_down(hand_landmarks, handedness):
+                            thumbs_down_detected = True
         
-        if game_state == "question":
-            if thumbs_up_detected and gesture_cooldown == 0:
-                answers.append(True)
-                answered_gesture = "OK"
-                game_state = "answered"
-                gesture_cooldown = cooldown_frames
-            elif thumbs_down_detected and gesture_cooldown == 0:
-                answers.append(False)
-                answered_gesture = "NOT OK"
-                game_state = "answered"
-                gesture_cooldown = cooldown_frames
+            # Dwells keep timing during the debounce window but only fire once it has passed,
+            # so a click is never swallowed and a held gesture has to be released to repeat
+            ready = gesture_debounce.ready(now)
+            next_clicked = next_dwell.update(pointer if game_state == "answered" else None, now, armed=ready)
+            next_clicked = next_clicked or (swipe == "swipe_left" and game_state == "answered")
+            thumb_up_held = thumb_up_hold.update(thumbs_up_detected, now, armed=ready)
+            thumb_down_held = thumb_down_hold.update(thumbs_down_detected, now, armed=ready)
+            hover_next = next_dwell.active
         
-        if game_state != "results":
-            draw_next_button(frame, hover_next)
+            if next_clicked and gesture_debounce.trigger(now):
+                current_question_idx += 1
+                if current_question_idx >= len(questions):
+                    game_state = "results"
+                else:
+                    game_state = "question"
+                    answered_gesture = None
+        
+            if game_state == "question":
+                if thumb_up_held and gesture_debounce.trigger(now):
+                    answers.append(True)
+                    answered_gesture = "OK"
+                    game_state = "answered"
+                elif thumb_down_held and gesture_debounce.trigger(now):
+                    answers.append(False)
+                    answered_gesture = "NOT OK"
+                    game_state = "answered"
+        
+            if game_state != "results":
+                draw_next_button(frame, hover_next)
+                next_dwell.draw_progress(frame)
 
-        cv2.imshow("Psychology Assessment Game", frame)
+            telemetry.draw_hud(frame)
+            cv2.imshow("Psychology Assessment Game", frame)
+            telemetry.stop("render", render_start)
+            telemetry.frame()
         
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
-            break
-        elif key == ord('r') and game_state == "results":
-            current_question_idx = 0
-            answers = []
-            game_state = "question"
-            answered_gesture = None
-            gesture_cooldown = 0
+            key = cv2.waitKey(1) & 0xFF
+            telemetry.handle_key(key)
+            if key == ord('q'):
+                break
+            elif key == ord('r') and game_state == "results":
+                current_question_idx = 0
+                answers = []
+                game_state = "question"
+                answered_gesture = None
+                gesture_debounce.reset()
+                for hold in (next_dwell, thumb_up_hold, thumb_down_hold):
+                    hold.reset()
+                swipe_detector.reset()
 
-cap.release()
-cv2.destroyAllWindows()
+    telemetry.close()
+    cap.release()
+    cv2.destroyAllWindows()
@@ -1,45 +1,89 @@
-from ultralytics import YOLO
 import cv2
+import numpy as np
 import os
-
-print("=" * 50)
-print("YOLOv8 Object Detection Setup")
-print("=" * 50)
-
-# Step 1: Clean up corrupted model files
-print("\n[1/4] Checking for corrupted model files...")
-
-# Remove from current directory
-if os.path.exists('yolov8n.pt'):
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from cv_common import model_server, profiles, startup
+from cv_common.capture import open_capture, requested_size
+from cv_common.detection_render import DetectionRenderer
+from cv_common.model_lifecycle import ModelLifecycle
+from cv_common.telemetry import Telemetry
+from cv_common import threads
+from clip_recorder import ClipRecorder, detections_from_result
+from tiled_inference import TiledDetector
+
+# CV_PROFILE fills in the model, capture size, stride and render rate below
+profiles.apply()
+WEIGHTS = os.environ.get('CV_YOLO_WEIGHTS', 'yolov8n.pt')
+CACHED_WEIGHTS = os.path.expanduser(os.path.join('~/.ultralytics/weights', os.path.basename(WEIGHTS)))
+# Only the stock Ultralytics checkpoints, given by name, can be deleted and downloaded again
+DOWNLOADABLE = re.fullmatch(r'yolov8[nsmlx]\.pt', WEIGHTS) is not None
+# CV_INFERENCE_STRIDE=N runs YOLO on every Nth frame and keeps the last boxes in between
+STRIDE = max(1, int(os.environ.get('CV_INFERENCE_STRIDE', '1') or 1))
+
+
+def remove_corrupted_weights():
+    """Delete local and cached weights so Ultralytics downloads a fresh copy"""
+    for path, where in ((WEIGHTS, "current directory"), (CACHED_WEIGHTS, "cache")):
+        if os.path.exists(path):
+            try:
+                os.remove(path)
+                print(f"✓ Removed model from {where}")
+            except Exception as e:
+                print(f"⚠ Could not remove model from {where}: {e}")
+
+
+def load_model():
+    """Load YOLOv8, re-downloading only if the existing weights fail to load"""
+    if model_server.enabled():
+        return model_server.RemoteModel("yolo", weights=WEIGHTS).load()
+
+    # Imported here so torch loads on the startup thread while the webcam opens
+    from ultralytics import YOLO
+    threads.configure_torch()
     try:
-        os.remove('yolov8n.pt')
-        print("✓ Removed old model from current directory")
+        return YOLO(WEIGHTS)
     except Exception as e:
-        print(f"⚠ Could not remove local model: {e}")
+        if not DOWNLOADABLE:
+            # The user's own weights: never delete them, whatever went wrong
+            raise RuntimeError(f"Could not load YOLO weights {WEIGHTS!r} (CV_YOLO_WEIGHTS): {e}") from e
+        print(f"⚠ Could not load model ({e}); downloading a fresh copy...")
+        remove_corrupted_weights()
+        return YOLO(WEIGHTS)
 
-# Remove from cache
-cache_path = os.path.expanduser('~/.ultralytics/weights/yolov8n.pt')
-if os.path.exists(cache_path):
-    try:
-        os.remove(cache_path)
-        print("✓ Removed cached model")
-    except Exception as e:
-        print(f"⚠ Could not remove cached model: {e}")
 
-# Step 2: Download fresh model
-print("\n[2/4] Downloading YOLOv8 model...")
-try:
-    model = YOLO('yolov8n.pt')
-    print("✓ Model downloaded and loaded successfully!")
-except Exception as e:
-    print(f"✗ Error loading model: {e}")
-    print("\nPlease manually download from:")
-    print("https://github.com/ultralytics/assets/releases/download/v8.3.0/yolov8n.pt")
-    exit(1)
+def warm_up(m, width, height):
+    """Inference on a blank frame of the capture size (and the tile batch in tiled mode)"""
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    m(frame, conf=0.3, verbose=False)
+    tiled = TiledDetector.from_env(m, conf=0.3)
+    if tiled is not None:
+        tiled.warmup(frame)
 
-# Step 3: Open webcam
-print("\n[3/4] Opening webcam...")
-cap = cv2.VideoCapture(0)
+
+print("=" * 50)
+print("YOLOv8 Object Detection Setup")
+print("=" * 50)
+threads.apply()
+
+# Step 1: Load the model (downloaded on first run) in the background and warm
+# it up on a blank frame of the size the camera is asked for (the driver's
+# usual 640x480 when none is), so the first live frame isn't stalled
+print("\n[1/4] Loading YOLOv8 model in the background...")
+warmup_size = requested_size()
+warmup_size = warmup_size if all(warmup_size) else (640, 480)
+lifecycle = ModelLifecycle(
+    "yolo",
+    load=load_model,
+    warmup=lambda m: warm_up(m, *warmup_size),
+).start()
+
+# Step 2: Open webcam while the model loads
+print("\n[2/4] Opening webcam...")
+cap = open_capture(0)
 
 if not cap.isOpened():
     print("✗ Error: Could not open webcam")
@@ -58,6 +102,23 @@ if not ret:
 
 print(f"✓ Webcam opened successfully!")
 print(f"  Frame size: {test_frame.shape[1]}x{test_frame.shape[0]}")
+startup.mark("camera")
+
+# Step 3: Wait for the model
+print("\n[3/4] Waiting for the model...")
+telemetry = Telemetry("yolo_tracking")
+try:
+    model = lifecycle.result(telemetry)
+except Exception as e:
+    print(f"✗ Error loading model: {e}")
+    if DOWNLOADABLE:
+        print("\nPlease manually download from:")
+        print(f"https://github.com/ultralytics/assets/releases/download/v8.3.0/{WEIGHTS}")
+    cap.release()
+    exit(1)
+if test_frame.shape[1::-1] != warmup_size:
+    # The camera (or frame bus) gave another size than requested: warm up on that one
+    warm_up(model, test_frame.shape[1], test_frame.shape[0])
 
 # Step 4: Start detection
 print("\n[4/4] Starting object detection...")
@@ -65,16 +126,31 @@ print("\n" + "=" * 50)
 print("CONTROLS:")
 print("  - Press 'q' to quit")
 print("  - Press 'Esc' to quit")
+print("  - Press 'h' to toggle the performance HUD")
 print("=" * 50 + "\n")
 
 # Create window
 cv2.namedWindow("YOLOv8 Object Detection", cv2.WINDOW_NORMAL)
 
+# Draws on the captured frame itself; CV_RENDER_EVERY=N refreshes the window every Nth frame
+renderer = DetectionRenderer()
+
+# CV_YOLO_TILED=1: overlapping tiles for small objects in high-resolution frames
+tiled = TiledDetector.from_env(model, conf=0.3)
+if tiled is not None:
+    print(f"Tiled inference: {tiled.tile}px tiles, {tiled.overlap:.0%} overlap, coarse pass {'on' if tiled.coarse else 'off'}")
+
+# Evidence clips when CV_CLIP_CLASSES (e.g. person,car) are seen
+clips = ClipRecorder.from_env()
+if clips is not None:
+    print(f"Recording clips of {', '.join(sorted(clips.classes))} to {clips.output_dir}")
+
 frame_count = 0
 
 try:
     while cap.isOpened():
-        ret, frame = cap.read()
+        with telemetry.stage("capture"):
+            ret, frame = cap.read()
         if not ret:
             print("\n✗ Failed to grab frame from webcam")
             break
@@ -83,20 +159,41 @@ try:
         
         # Show progress every 30 frames
         if frame_count % 30 == 0:
-            print(f"Processing... Frames: {frame_count}", end='\r')
-
-        # Run YOLO detection
-        results = model(frame, conf=0.3, verbose=False)
-        annotated_frame = results[0].plot()
-        
-        # Display the frame
-        cv2.imshow("YOLOv8 Object Detection", annotated_frame)
+            print(f"Processing... Frames: {frame_count} | {telemetry.fps:.1f} FPS", end='\r')
+
+        # Run YOLO detection (Ultralytics reports its own preprocess/inference/postprocess split)
+        inferred = (frame_count - 1) % STRIDE == 0
+        if inferred:
+            with telemetry.stage("model"), lifecycle.steady():
+                results = [tiled(frame)] if tiled is not None else model(frame, conf=0.3, verbose=False)
+            for stage, ms in results[0].speed.items():
+                if ms is not None:
+                    telemetry.record(stage, ms)
+            telemetry.count("detections", len(results[0].boxes))
+
+        # Buffered before drawing, so clips show the raw frame (boxes go in the sidecar).
+        # Between strided inferences the frame has no detections of its own: None
+        if clips is not None:
+            with telemetry.stage("clips"):
+                clips.add(frame, detections_from_result(results[0]) if inferred else None)
+
+        if renderer.due(frame_count):
+            with telemetry.stage("render"):
+                renderer.draw_result(frame, results[0])
+                if clips is not None and clips.recording:
+                    cv2.putText(frame, "REC", (frame.shape[1] - 80, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+                telemetry.draw_hud(frame)
+
+                # Display the frame
+                cv2.imshow("YOLOv8 Object Detection", frame)
+        telemetry.frame()
 
         # Handle key presses
         key = cv2.waitKey(1) & 0xFF
         if key == ord('q') or key == 27:  # 'q' or 'Esc'
             print("\n\n✓ Stopping detection...")
             break
+        telemetry.handle_key(key)
 
 except KeyboardInterrupt:
     print("\n\n✓ Interrupted by user...")
@@ -107,6 +204,10 @@ except Exception as e:
 finally:
     # Clean up
     print("\nCleaning up...")
+    lifecycle.report()
+    if clips is not None:
+        clips.close()
+    telemetry.close()
     cap.release()
     cv2.destroyAllWindows()
     cv2.waitKey(1)  # Extra waitKey for cleanup
@@ -0,0 +1,205 @@
+"""
+Evidence clips for YOLO detections, including the seconds before the trigger
+
+The last `pre_seconds` of frames are kept JPEG-compressed in a ring buffer
+capped at `max_buffer_mb`. When a trigger class shows up, the buffered
+frames and everything up to `post_seconds` after the last trigger are
+handed to an encoder thread. That thread writes <time>_<class>.mp4 plus a
+<time>_<class>.json sidecar with every frame's detections.
+
+    CV_CLIP_CLASSES=person,car python "yolo webcam detection/Tracking.py"
+
+    CV_CLIP_DIR            output directory (default ~/.having_fun_cv/clips)
+    CV_CLIP_PRE_SECONDS    seconds kept before the trigger (default 5)
+    CV_CLIP_POST_SECONDS   seconds recorded after the last trigger (default 5)
+
+The detection loop only JPEG-encodes the frame and does non-blocking queue
+puts. If the encoder falls behind, frames are dropped (and counted) rather
+than stalling the camera.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import cv2
+
+DEFAULT_DIR = Path.home() / ".having_fun_cv" / "clips"
+
+
+def detections_from_result(result):
+    """JSON-ready detections from an Ultralytics Results object"""
+    boxes = result.boxes
+    return [{"class": result.names[int(c)], "confidence": round(float(conf), 3),
+             "box": [round(v, 1) for v in xyxy]}
+            for xyxy, c, conf in zip(boxes.xyxy.tolist(), boxes.cls.tolist(), boxes.conf.tolist())]
+
+
+class _Clip:
+    """One event being written by the encoder thread"""
+
+    def __init__(self, path, fps, trigger):
+        self.path = path
+        self.fps = fps
+        self.trigger = trigger
+        self.writer = None
+        self.frames = []
+        self.closing = False
+
+    def write(self, timestamp, jpeg, detections):
+        image = cv2.imdecode(jpeg, cv2.IMREAD_COLOR)
+        if self.writer is None:
+            h, w = image.shape[:2]
+            self.writer = cv2.VideoWriter(str(self.path.with_suffix(".mp4")),
+                                          cv2.VideoWriter_fourcc(*"mp4v"), self.fps, (w, h))
+        self.writer.write(image)
+        self.frames.append({"ts": timestamp, "detections": detections})
+
+    def finish(self):
+        if self.writer is not None:
+            self.writer.release()
+        sidecar = {
+            "trigger": self.trigger,
+            "fps": round(self.fps, 2),
+            "start_ts": self.frames[0]["ts"] if self.frames else None,
+            "end_ts": self.frames[-1]["ts"] if self.frames else None,
+            "frames": self.frames,
+        }
+        self.path.with_suffix(".json").write_text(json.dumps(sidecar))
+        print(f"\n✓ Saved clip {self.path.with_suffix('.mp4')} ({len(self.frames)} frames)")
+
+
+class ClipRecorder:
+    """Pre-event JPEG ring buffer plus a background MP4 encoder"""
+
+    def __init__(self, classes, output_dir=None, pre_seconds=5.0, post_seconds=5.0, max_clip_seconds=60.0,
+                 min_confidence=0.5, quality=80, max_buffer_mb=64, max_queue=512):
+        self.classes = set(classes)
+        self.output_dir = Path(output_dir or DEFAULT_DIR)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.max_clip_seconds = max_clip_seconds
+        self.min_confidence = min_confidence
+        self.max_buffer_bytes = int(max_buffer_mb * 1024 * 1024)
+        self._encode_params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+        self._ring = deque()
+        self._ring_bytes = 0
+        self._event_start = None
+        self._event_end = None
+        self._clip = None
+        self.clips = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._encode_loop, name="clip-encoder", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls):
+        """Recorder configured by CV_CLIP_*, or None when CV_CLIP_CLASSES is unset"""
+        classes = [c.strip() for c in os.environ.get("CV_CLIP_CLASSES", "").split(",") if c.strip()]
+        if not classes:
+            return None
+        return cls(classes, output_dir=os.environ.get("CV_CLIP_DIR") or None,
+                   pre_seconds=float(os.environ.get("CV_CLIP_PRE_SECONDS", 5)),
+                   post_seconds=float(os.environ.get("CV_CLIP_POST_SECONDS", 5)))
+
+    @property
+    def recording(self):
+        return self._event_start is not None
+
+    def _trigger(self, detections):
+        if detections is None:
+            return None
+        hits = [d for d in detections if d["class"] in self.classes and d["confidence"] >= self.min_confidence]
+        return max(hits, key=lambda d: d["confidence"]) if hits else None
+
+    def _buffer(self, item):
+        self._ring.append(item)
+        self._ring_bytes += item[1].nbytes
+        oldest = item[0] - self.pre_seconds
+        while self._ring and (self._ring[0][0] < oldest or self._ring_bytes > self.max_buffer_bytes):
+            self._ring_bytes -= self._ring.popleft()[1].nbytes
+
+    def _put(self, message):
+        try:
+            self._queue.put_nowait(message)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def add(self, frame, detections, timestamp=None):
+        """Buffer a frame and its detections; starts or extends a clip on a trigger
+
+        `detections=None` marks a frame the detector didn't run on: it is
+        recorded (as null in the sidecar) but can't start or extend a clip.
+        """
+        now = time.time() if timestamp is None else timestamp
+        ok, jpeg = cv2.imencode(".jpg", frame, self._encode_params)
+        if not ok:
+            return
+        item = (now, jpeg, detections)
+        self._buffer(item)
+
+        trigger = self._trigger(detections)
+        if self._event_start is None:
+            if trigger is None:
+                return
+            duration = self._ring[-1][0] - self._ring[0][0]
+            fps = (len(self._ring) - 1) / duration if duration > 0 else 30.0
+            name = time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f"_{trigger['class']}"
+            clip = _Clip(self.output_dir / name, fps, dict(trigger, ts=now))
+            # The ring's arrays are shared, not copied: they are never written to again
+            if self._put(("start", clip, list(self._ring))):
+                self._clip = clip
+                self._event_start, self._event_end = now, now + self.post_seconds
+                self.clips += 1
+            return
+
+        self._put(("frame", item))
+        if trigger is not None:
+            self._event_end = min(now + self.post_seconds, self._event_start + self.max_clip_seconds)
+        if now >= self._event_end:
+            self._finish()
+
+    def _finish(self):
+        # If the end marker is dropped, the encoder still closes the clip once
+        # it has drained the queue or a new clip starts
+        self._clip.closing = True
+        self._put(("end",))
+        self._clip = None
+        self._event_start = self._event_end = None
+
+    def _encode_loop(self):
+        clip = None
+        while True:
+            message = self._queue.get()
+            kind = message[0] if message is not None else "stop"
+            if kind == "start":
+                if clip is not None:
+                    clip.finish()
+                clip = message[1]
+                for item in message[2]:
+                    clip.write(*item)
+            elif kind == "frame" and clip is not None:
+                clip.write(*message[1])
+            if clip is not None and (kind in ("end", "stop") or (clip.closing and self._queue.empty())):
+                clip.finish()
+                clip = None
+            if kind == "stop":
+                return
+
+    def close(self):
+        """Finish any clip in progress and wait for the encoder"""
+        if self._event_start is not None:
+            self._finish()
+        # Waiting here is fine: the camera loop is over
+        self._queue.put(None)
+        self._thread.join()
+        if self.dropped:
+            print(f"⚠ Clip recorder dropped {self.dropped} frames (encoder behind)")
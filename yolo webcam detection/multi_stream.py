@@ -0,0 +1,305 @@
+"""
+YOLOv8 on several cameras / streams at once
+
+Two ways to spread the work:
+
+    process   streams are shared round-robin between worker processes, each
+              pinned to its own cores with its own model instance (default)
+    batch     one process reads every stream and runs one batched YOLO call
+              per round (micro-batching; best with a GPU)
+
+Each worker writes its annotated tile straight into a mosaic held in shared
+memory, so the display process never receives frames through a pipe.
+Detections are logged per stream as JSON lines and per-stream FPS is exported
+through the telemetry (CV_TELEMETRY_PORT / CV_TELEMETRY_JSONL).
+
+    python "yolo webcam detection/multi_stream.py" 0 1 rtsp://cam3/stream video.mp4
+    python "yolo webcam detection/multi_stream.py" 0 1 2 3 --workers 4 --log-dir logs
+    python "yolo webcam detection/multi_stream.py" 0 1 --mode batch
+"""
+
+import argparse
+import json
+import math
+import multiprocessing as mp
+import os
+import sys
+import time
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from cv_common.detection_render import DetectionRenderer
+from cv_common.frame_bus import attach_shared_memory
+from cv_common.telemetry import Telemetry
+from cv_common import profiles, threads
+
+
+def parse_source(source):
+    return int(source) if source.isdigit() else source
+
+
+def mosaic_shape(n_streams, tile_size):
+    cols = math.ceil(math.sqrt(n_streams))
+    rows = math.ceil(n_streams / cols)
+    return rows, cols, (rows * tile_size[1], cols * tile_size[0], 3)
+
+
+class StreamLog:
+    """Per-stream detection log, one JSON record per processed frame"""
+
+    def __init__(self, log_dir, stream):
+        self._file = open(Path(log_dir) / f"stream_{stream}.jsonl", "a", buffering=1) if log_dir else None
+
+    def write(self, frame_index, result):
+        if self._file is None:
+            return
+        boxes = result.boxes
+        detections = [{"class": result.names[int(c)], "confidence": round(float(conf), 3),
+                       "box": [round(v, 1) for v in xyxy]}
+                      for xyxy, c, conf in zip(boxes.xyxy.tolist(), boxes.cls.tolist(), boxes.conf.tolist())]
+        self._file.write(json.dumps({"ts": time.time(), "frame": frame_index, "detections": detections}) + "\n")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class Mosaic:
+    """Grid of stream tiles in a shared memory block"""
+
+    def __init__(self, n_streams, tile_size, name=None):
+        self.rows, self.cols, shape = mosaic_shape(n_streams, tile_size)
+        self.tile_size = tile_size
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+        else:
+            self.shm = attach_shared_memory(name)
+        self.image = np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf)
+        self._tile = np.empty((tile_size[1], tile_size[0], 3), dtype=np.uint8)
+
+    def put(self, stream, frame):
+        w, h = self.tile_size
+        y, x = (stream // self.cols) * h, (stream % self.cols) * w
+        cv2.resize(frame, self.tile_size, dst=self._tile, interpolation=cv2.INTER_AREA)
+        self.image[y:y + h, x:x + w] = self._tile
+
+    def close(self, unlink=False):
+        del self.image
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+# ---------------------------
+# Process mode
+# ---------------------------
+def worker(worker_id, streams, sources, cores, args, mosaic_name, stats, stop):
+    """Runs in a child process: own model, own cores, a subset of streams"""
+    if cores:
+        # Before torch is imported, so its pools are sized for our share of cores
+        threads.apply(cores=cores, verbose=False)
+    from ultralytics import YOLO
+    if cores:
+        threads.configure_torch()
+
+    model = YOLO(args.weights)
+    renderer = DetectionRenderer(model.names)
+    mosaic = Mosaic(len(sources), (args.tile_width, args.tile_height), mosaic_name)
+    caps = {s: cv2.VideoCapture(sources[s]) for s in streams}
+    logs = {s: StreamLog(args.log_dir, s) for s in streams}
+    frame_counts = dict.fromkeys(streams, 0)
+    last = dict.fromkeys(streams, time.monotonic())
+    print(f"Worker {worker_id}: streams {streams} on cores {sorted(cores) or 'any'}")
+
+    try:
+        while not stop.is_set() and caps:
+            for s, cap in list(caps.items()):
+                ok, frame = cap.read()
+                if not ok:
+                    print(f"Stream {s} ended")
+                    cap.release()
+                    del caps[s]
+                    continue
+                result = model(frame, conf=args.conf, verbose=False)[0]
+                mosaic.put(s, renderer.draw_result(frame, result))
+                logs[s].write(frame_counts[s], result)
+                frame_counts[s] += 1
+
+                now = time.monotonic()
+                dt, last[s] = now - last[s], now
+                stats[3 * s] = 0.9 * stats[3 * s] + 0.1 * (1.0 / dt) if stats[3 * s] else 1.0 / dt
+                stats[3 * s + 1] = frame_counts[s]
+                stats[3 * s + 2] = len(result.boxes)
+    finally:
+        for cap in caps.values():
+            cap.release()
+        for log in logs.values():
+            log.close()
+        mosaic.close()
+
+
+def start_workers(sources, args, mosaic, stats, stop):
+    ctx = mp.get_context("spawn")
+    available = threads.available_cores()
+    n_workers = max(1, min(args.workers or len(available), len(sources)))
+    processes = []
+    for w in range(n_workers):
+        streams = list(range(w, len(sources), n_workers))
+        cores = set(available[w::n_workers]) if not args.no_pin else set()
+        p = ctx.Process(target=worker, name=f"yolo-worker-{w}",
+                        args=(w, streams, sources, cores, args, mosaic.shm.name, stats, stop))
+        p.start()
+        processes.append(p)
+    return processes
+
+
+# ---------------------------
+# Batch mode
+# ---------------------------
+class BatchRunner:
+    """All streams in this process, one batched YOLO call per round"""
+
+    def __init__(self, sources, args, mosaic, stats):
+        from ultralytics import YOLO
+        threads.configure_torch()
+        self.model = YOLO(args.weights)
+        self.renderer = DetectionRenderer(self.model.names)
+        self.args = args
+        self.mosaic = mosaic
+        self.stats = stats
+        self.caps = [cv2.VideoCapture(s) for s in sources]
+        self.logs = [StreamLog(args.log_dir, s) for s in range(len(sources))]
+        self.frame_index = 0
+        self._last = time.monotonic()
+
+    def step(self):
+        frames, streams = [], []
+        for s, cap in enumerate(self.caps):
+            ok, frame = cap.read()
+            if ok:
+                frames.append(frame)
+                streams.append(s)
+        if not frames:
+            return False
+        results = self.model(frames, conf=self.args.conf, verbose=False)
+
+        now = time.monotonic()
+        fps = 1.0 / max(now - self._last, 1e-6)
+        self._last = now
+        for s, frame, result in zip(streams, frames, results):
+            self.mosaic.put(s, self.renderer.draw_result(frame, result))
+            self.logs[s].write(self.frame_index, result)
+            self.stats[3 * s] = fps
+            self.stats[3 * s + 1] = self.frame_index + 1
+            self.stats[3 * s + 2] = len(result.boxes)
+        self.frame_index += 1
+        return True
+
+    def close(self):
+        for cap in self.caps:
+            cap.release()
+        for log in self.logs:
+            log.close()
+
+
+# ---------------------------
+# Display
+# ---------------------------
+def draw_labels(image, mosaic, stats, n_streams):
+    for s in range(n_streams):
+        y, x = (s // mosaic.cols) * mosaic.tile_size[1], (s % mosaic.cols) * mosaic.tile_size[0]
+        cv2.putText(image, f"#{s}  {stats[3 * s]:.1f} FPS", (x + 8, y + 24),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+
+
+def main():
+    # CV_PROFILE's weights become the --weights default
+    profiles.apply()
+    parser = argparse.ArgumentParser(description="YOLOv8 on several streams")
+    parser.add_argument("sources", nargs="+", help="camera indexes, video files or stream URLs")
+    parser.add_argument("--mode", choices=("process", "batch"), default="process")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: one per core, at most one per stream)")
+    parser.add_argument("--no-pin", action="store_true", help="don't pin workers to cores")
+    parser.add_argument("--weights", default=os.environ.get("CV_YOLO_WEIGHTS", "yolov8n.pt"))
+    parser.add_argument("--conf", type=float, default=0.3)
+    parser.add_argument("--tile-width", type=int, default=640)
+    parser.add_argument("--tile-height", type=int, default=360)
+    parser.add_argument("--log-dir", type=Path, help="write stream_<n>.jsonl detection logs here")
+    parser.add_argument("--no-display", action="store_true")
+    args = parser.parse_args()
+
+    sources = [parse_source(s) for s in args.sources]
+    if args.log_dir:
+        args.log_dir.mkdir(parents=True, exist_ok=True)
+
+    mosaic = Mosaic(len(sources), (args.tile_width, args.tile_height))
+    mosaic.image.fill(0)
+    stats = mp.get_context("spawn").Array("d", 3 * len(sources), lock=False)
+    stop = mp.get_context("spawn").Event()
+    telemetry = Telemetry("yolo_multi_stream")
+
+    # Pins to CV_CPU_AFFINITY if set; process-mode workers share out what is left
+    threads.apply()
+    processes, runner = [], None
+    if args.mode == "process":
+        processes = start_workers(sources, args, mosaic, stats, stop)
+    else:
+        runner = BatchRunner(sources, args, mosaic, stats)
+
+    print("Press 'q' to quit, 'h' for the performance HUD")
+    display = None
+    try:
+        while True:
+            if runner is not None:
+                with telemetry.stage("batch"):
+                    if not runner.step():
+                        break
+            elif not any(p.is_alive() for p in processes):
+                break
+            else:
+                time.sleep(1 / 30)
+
+            total = 0.0
+            for s in range(len(sources)):
+                telemetry.set_gauge(f"stream{s}_fps", round(stats[3 * s], 2))
+                telemetry.set_gauge(f"stream{s}_detections", int(stats[3 * s + 2]))
+                total += stats[3 * s]
+            telemetry.set_gauge("total_fps", round(total, 2))
+
+            if not args.no_display:
+                if display is None:
+                    display = np.empty_like(mosaic.image)
+                np.copyto(display, mosaic.image)
+                draw_labels(display, mosaic, stats, len(sources))
+                telemetry.draw_hud(display)
+                cv2.imshow("YOLOv8 Multi-Stream", display)
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('q') or key == 27:
+                    break
+                telemetry.handle_key(key)
+            elif telemetry.frames % 30 == 0:
+                print(f"Total {total:.1f} FPS over {len(sources)} streams", end="\r")
+            telemetry.frame()
+
+    except KeyboardInterrupt:
+        print("\nStopping...")
+
+    finally:
+        stop.set()
+        for p in processes:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+        if runner is not None:
+            runner.close()
+        telemetry.close()
+        mosaic.close(unlink=True)
+        cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Tiled (sliced) YOLO inference for small objects in high-resolution frames
+
+A 1080p or 4K frame shrunk to 640 px loses anything only a few pixels
+wide. TiledDetector cuts the frame into overlapping tiles at roughly model
+resolution, runs them through the model as one batch, shifts the boxes
+back to frame coordinates and merges duplicates across tile borders with
+class-aware NMS (cv2.dnn.NMSBoxesBatched). Boxes cut off by an inner tile
+border are dropped when the object is small enough to lie whole in the
+overlap and the neighbouring tile is run this frame, so NMS doesn't have to
+merge half boxes.
+
+To keep the cost bounded, an optional coarse full-frame pass runs first
+at a low confidence. Only tiles that overlap a coarse box, or that found
+something on the previous frame, are run; every `refresh_every` frames all
+tiles run, so objects the coarse pass can't see at all are still found.
+
+    CV_YOLO_TILED=1 python "yolo webcam detection/Tracking.py"
+
+    CV_YOLO_TILE           tile size in pixels (default 640)
+    CV_YOLO_TILE_OVERLAP   fraction of a tile shared with its neighbour (default 0.2)
+    CV_YOLO_COARSE         1 = coarse pass and empty-tile skipping (default 1)
+
+The detector returns an object with the parts of an Ultralytics Results the
+modules use (.boxes.xyxy/.cls/.conf, .names, .speed), so drawing, logging
+and clip recording work unchanged.
+"""
+
+import os
+import time
+
+import cv2
+import numpy as np
+
+
+def tile_grid(width, height, tile=640, overlap=0.2):
+    """(n, 4) x0, y0, x1, y1 of overlapping tiles covering the frame
+
+    The last row and column are shifted back to end at the frame edge, so
+    no tile is padded. A frame smaller than a tile is one tile.
+    """
+    def starts(size):
+        if size <= tile:
+            return [0]
+        stride = max(1, int(tile * (1 - overlap)))
+        positions = list(range(0, size - tile, stride))
+        return positions + [size - tile]
+
+    tw, th = min(tile, width), min(tile, height)
+    return np.array([(x, y, x + tw, y + th) for y in starts(height) for x in starts(width)], dtype=np.int32)
+
+
+def nms(xyxy, cls, conf, conf_threshold, iou_threshold):
+    """Indices kept by class-aware NMS"""
+    xywh = np.concatenate([xyxy[:, :2], xyxy[:, 2:] - xyxy[:, :2]], axis=1)
+    if hasattr(cv2.dnn, "NMSBoxesBatched"):
+        keep = cv2.dnn.NMSBoxesBatched(xywh.tolist(), conf.tolist(), cls.astype(np.int32).tolist(),
+                                       conf_threshold, iou_threshold)
+    else:
+        # OpenCV < 4.7: shift each class far apart so boxes of different classes never overlap
+        shifted = xywh.copy()
+        shifted[:, :2] += cls[:, None] * (xyxy.max() + 1)
+        keep = cv2.dnn.NMSBoxes(shifted.tolist(), conf.tolist(), conf_threshold, iou_threshold)
+    return np.asarray(keep, dtype=np.int64).ravel()
+
+
+def _cut_by_border(xyxy, index, tiles, running, frame_size, overlap_px, margin=2):
+    """Boxes of tile `index` (tile-local) that an inner tile edge cuts off and
+    that another running tile sees whole
+
+    A box is only dropped when it is small enough to fit in the overlap and a
+    tile that is actually being run this frame contains it and reaches past
+    every edge it touches; otherwise this tile's partial box is all there is.
+    """
+    x0, y0, x1, y1 = tiles[index]
+    w, h = frame_size
+    left = (xyxy[:, 0] <= margin) & (x0 > 0)
+    right = (xyxy[:, 2] >= x1 - x0 - margin) & (x1 < w)
+    top = (xyxy[:, 1] <= margin) & (y0 > 0)
+    bottom = (xyxy[:, 3] >= y1 - y0 - margin) & (y1 < h)
+    small = ((xyxy[:, 2] - xyxy[:, 0]) < overlap_px) & ((xyxy[:, 3] - xyxy[:, 1]) < overlap_px)
+    cut = (left | right | top | bottom) & small
+
+    others = np.flatnonzero(running)
+    others = tiles[others[others != index]]
+    if not cut.any() or len(others) == 0:
+        return np.zeros(len(xyxy), dtype=bool)
+    boxes = xyxy + np.array([x0, y0, x0, y0], dtype=xyxy.dtype)
+    o = others[None].astype(np.float32)
+    contains = ((o[..., 0] <= boxes[:, None, 0]) & (o[..., 1] <= boxes[:, None, 1]) &
+                (o[..., 2] >= boxes[:, None, 2]) & (o[..., 3] >= boxes[:, None, 3]))
+    past = ((~left[:, None] | (o[..., 0] < x0)) & (~right[:, None] | (o[..., 2] > x1)) &
+            (~top[:, None] | (o[..., 1] < y0)) & (~bottom[:, None] | (o[..., 3] > y1)))
+    return cut & (contains & past).any(axis=1)
+
+
+def _overlaps(tiles, boxes):
+    """(n_tiles,) bool: which tiles intersect any of the (m, 4) boxes"""
+    if len(boxes) == 0:
+        return np.zeros(len(tiles), dtype=bool)
+    return ((tiles[:, None, 0] < boxes[:, 2]) & (tiles[:, None, 2] > boxes[:, 0]) &
+            (tiles[:, None, 1] < boxes[:, 3]) & (tiles[:, None, 3] > boxes[:, 1])).any(axis=1)
+
+
+class _Boxes:
+    """NumPy boxes with the Ultralytics Boxes attributes used by the modules"""
+
+    def __init__(self, xyxy, cls, conf):
+        self.xyxy, self.cls, self.conf = xyxy, cls, conf
+
+    def __len__(self):
+        return len(self.xyxy)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self
+
+
+class TiledResult:
+    def __init__(self, xyxy, cls, conf, names, speed, tiles_run, tiles_total):
+        self.boxes = _Boxes(xyxy, cls, conf)
+        self.names = names
+        self.speed = speed
+        self.tiles_run = tiles_run
+        self.tiles_total = tiles_total
+
+
+def _arrays(result):
+    boxes = result.boxes.cpu().numpy()
+    return (np.asarray(boxes.xyxy, dtype=np.float32).reshape(-1, 4),
+            np.asarray(boxes.cls, dtype=np.float32).ravel(), np.asarray(boxes.conf, dtype=np.float32).ravel())
+
+
+class TiledDetector:
+    """Wraps a YOLO model (local or RemoteModel): `detector(frame)` -> TiledResult"""
+
+    def __init__(self, model, tile=640, overlap=0.2, coarse=True, coarse_conf=0.1, conf=0.3, iou=0.5,
+                 refresh_every=15):
+        self.model = model
+        self.tile = tile
+        self.overlap = overlap
+        self.coarse = coarse
+        self.coarse_conf = coarse_conf
+        self.conf = conf
+        self.iou = iou
+        self.refresh_every = refresh_every
+        self.names = getattr(model, "names", None) or {}
+        self._grid = None
+        self._grid_size = None
+        self._previous = None
+        self._frame_index = 0
+
+    @classmethod
+    def from_env(cls, model, conf=0.3):
+        """Detector configured by CV_YOLO_TILE*, or None when CV_YOLO_TILED is not 1"""
+        if os.environ.get("CV_YOLO_TILED", "0") != "1":
+            return None
+        return cls(model, tile=int(os.environ.get("CV_YOLO_TILE", 640)),
+                   overlap=float(os.environ.get("CV_YOLO_TILE_OVERLAP", 0.2)),
+                   coarse=os.environ.get("CV_YOLO_COARSE", "1") == "1", conf=conf)
+
+    def _tiles(self, width, height):
+        if self._grid_size != (width, height):
+            self._grid = tile_grid(width, height, self.tile, self.overlap)
+            self._grid_size = (width, height)
+            self._previous = np.ones(len(self._grid), dtype=bool)
+        return self._grid
+
+    def _predict(self, images, conf):
+        results = self.model(images, conf=conf, verbose=False)
+        if not self.names:
+            self.names = results[0].names
+        return results
+
+    def warmup(self, frame):
+        """Run the coarse pass and one full tile batch on `frame`, leaving the
+        tile-skipping state alone"""
+        h, w = frame.shape[:2]
+        tiles = tile_grid(w, h, self.tile, self.overlap)
+        if self.coarse and len(tiles) > 1:
+            self._predict(frame, self.coarse_conf)
+        self._predict([frame[y0:y1, x0:x1] for x0, y0, x1, y1 in tiles], self.conf)
+
+    def __call__(self, frame):
+        h, w = frame.shape[:2]
+        tiles = self._tiles(w, h)
+        speed = {}
+        parts = []
+
+        active = np.ones(len(tiles), dtype=bool)
+        refresh = self._frame_index % self.refresh_every == 0
+        if self.coarse and len(tiles) > 1:
+            start = time.perf_counter()
+            xyxy, cls, conf = _arrays(self._predict(frame, self.coarse_conf)[0])
+            speed["coarse"] = (time.perf_counter() - start) * 1000
+            # Confident coarse boxes are kept; the faint ones only pick tiles to look at
+            keep = conf >= self.conf
+            parts.append((xyxy[keep], cls[keep], conf[keep]))
+            if not refresh:
+                active = _overlaps(tiles, xyxy) | self._previous
+
+        start = time.perf_counter()
+        found = np.zeros(len(tiles), dtype=bool)
+        run = np.flatnonzero(active)
+        if len(run):
+            crops = [frame[y0:y1, x0:x1] for x0, y0, x1, y1 in tiles[run]]
+            overlap_px = self.tile - max(1, int(self.tile * (1 - self.overlap)))
+            for index, result in zip(run, self._predict(crops, self.conf)):
+                xyxy, cls, conf = _arrays(result)
+                keep = ~_cut_by_border(xyxy, index, tiles, active, (w, h), overlap_px)
+                xyxy, cls, conf = xyxy[keep], cls[keep], conf[keep]
+                xyxy += np.tile(tiles[index, :2], 2).astype(np.float32)
+                parts.append((xyxy, cls, conf))
+                found[index] = len(xyxy) > 0
+        speed["tiles"] = (time.perf_counter() - start) * 1000
+        self._previous = found
+        self._frame_index += 1
+
+        start = time.perf_counter()
+        xyxy, cls, conf = (np.concatenate(p) for p in zip(*parts)) if parts else (
+            np.empty((0, 4), np.float32), np.empty(0, np.float32), np.empty(0, np.float32))
+        if len(xyxy):
+            keep = nms(xyxy, cls, conf, self.conf, self.iou)
+            xyxy, cls, conf = xyxy[keep], cls[keep], conf[keep]
+        speed["nms"] = (time.perf_counter() - start) * 1000
+        return TiledResult(xyxy, cls, conf, self.names, speed, len(run), len(tiles))